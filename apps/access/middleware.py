@@ -28,15 +28,20 @@ class ACLMiddleware(object):
                 request.amo_user = None
                 return
 
-            amo.set_user(amo_user)
-            request.user._profile_cache = request.amo_user = amo_user
-            request.groups = request.amo_user.groups.all()
-
-            if acl.action_allowed(request, 'Admin', '%'):
-                request.user.is_staff = True
+            self.set_user(request, amo_user, amo_user.groups.all())
         else:
             request.amo_user = None
 
+    def set_user(self, request, amo_user, groups):
+        """Attach an already loaded user and their groups to the request."""
+        request.check_ownership = partial(acl.check_ownership, request)
+        amo.set_user(amo_user)
+        request.user._profile_cache = request.amo_user = amo_user
+        request.groups = groups
+
+        if acl.action_allowed(request, 'Admin', '%'):
+            request.user.is_staff = True
+
     def process_response(self, request, response):
         amo.set_user(None)
         return response
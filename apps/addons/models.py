@@ -43,6 +43,7 @@ import sharing.utils as sharing
 from stats.models import AddonShareCountTotal
 from translations.fields import (TranslatedField, PurifiedField,
                                  LinkifiedField, Translation)
+from translations.models import trans_cache_key
 from translations.query import order_by_translation
 from users.models import UserProfile, UserForeignKey
 from users.utils import find_users
@@ -1264,10 +1265,13 @@ class Addon(amo.models.OnChangeMixin, amo.models.ModelBase):
     def remove_locale(self, locale):
         """NULLify strings in this locale for the add-on and versions."""
         for o in itertools.chain([self], self.versions.all()):
-            ids = [getattr(o, f.attname) for f in o._meta.translated_fields]
-            qs = Translation.objects.filter(id__in=filter(None, ids),
-                                            locale=locale)
+            ids = filter(None, [getattr(o, f.attname)
+                                for f in o._meta.translated_fields])
+            qs = Translation.objects.filter(id__in=ids, locale=locale)
             qs.update(localized_string=None, localized_string_clean=None)
+            # The update doesn't send post_save, forget the cached strings.
+            cache.delete_many([trans_cache_key(id, loc) for id in ids
+                               for loc in (locale, None)])
 
     def app_perf_results(self):
         """Generator of (AppVersion, [list of perf results contexts]).
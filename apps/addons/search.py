@@ -22,6 +22,10 @@ from mkt.webapps.models import Installed
 
 log = logging.getLogger('z.es')
 
+# Translated fields returned by the marketplace search API.
+API_TRANSLATED_FIELDS = ('name', 'description', 'summary', 'homepage',
+                         'support_email', 'support_url', 'privacy_policy')
+
 
 def extract(addon):
     """Extract indexable attributes from an add-on."""
@@ -86,6 +90,20 @@ def extract(addon):
         d['app_type'] = (amo.ADDON_WEBAPP_PACKAGED if addon.is_packaged else
                          amo.ADDON_WEBAPP_HOSTED)
 
+        # The search API serializes its results straight from these, see
+        # mkt.search.api.SearchResource.
+        d['default_locale'] = addon.default_locale
+        d['icons'] = dict((str(size), addon.get_icon_url(size))
+                          for size in amo.ADDON_ICON_SIZES)
+        d['api_translations'] = {}
+        for name in API_TRANSLATED_FIELDS:
+            field = addon._meta.get_field(name)
+            # Run the strings through the field's Translation class so
+            # purified fields are stored the way the API would output them.
+            d['api_translations'][name] = dict(
+                (locale.lower(), unicode(field.rel.to(localized_string=s)))
+                for locale, s in translations[getattr(addon, field.attname)])
+
     else:
         # Boost by the number of users on a logarithmic scale. The maximum
         # boost (11,000,000 users for adblock) is about 5x.
@@ -135,6 +153,9 @@ def setup_mapping(index=None, aliased=True):
             'platforms': {'type': 'integer', 'index_name': 'platform'},
             'appversion': {'properties': dict((app.id, appver)
                                               for app in amo.APP_USAGE)},
+            # Only kept in _source for the search API, never searched on.
+            'icons': {'type': 'object', 'enabled': False},
+            'api_translations': {'type': 'object', 'enabled': False},
         },
     }
     # Add room for language-specific indexes.
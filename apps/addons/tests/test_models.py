@@ -1764,6 +1764,17 @@ class TestRemoveLocale(amo.tests.TestCase):
         eq_(sorted(qs.filter(id=a.name_id)), ['en-US'])
         eq_(sorted(qs.filter(id=a.description_id)), ['en-US', 'he'])
 
+    def test_remove_cached(self):
+        a = Addon.objects.create(type=1)
+        a.name = {'en-US': 'woo', 'el': 'yeah'}
+        a.save()
+        self.addCleanup(translation.deactivate)
+        translation.activate('el')
+        with self.settings(TRANSLATIONS_CACHE_TIMEOUT=60):
+            eq_(unicode(Addon.objects.no_cache().get(id=a.id).name), 'yeah')
+            a.remove_locale('el')
+            eq_(unicode(Addon.objects.no_cache().get(id=a.id).name), 'woo')
+
     def test_remove_version_locale(self):
         addon = Addon.objects.create(type=amo.ADDON_THEME)
         version = Version.objects.create(addon=addon)
@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime, timedelta
 from email import utils
+import threading
 import urllib
 import urlparse
 
 from django.db import connection
 from django.utils.encoding import smart_str
 
+import mock
 from nose.tools import eq_
+from sqlalchemy import exc
 
 import amo
 import amo.tests
@@ -16,6 +19,7 @@ from addons.models import (Addon, CompatOverride, CompatOverrideRange,
 from applications.models import Application, AppVersion
 from files.models import File
 from services import update
+from services import utils as services_utils
 import settings_local
 from versions.models import ApplicationsVersions, Version
 
@@ -817,3 +821,101 @@ class TestResponse(amo.tests.TestCase):
         data['appVersion'] = '5.0.1'
         upd = self.get(data)
         eq_(upd.get_rdf(), upd.get_no_updates_rdf())
+
+
+class TestUpdateSQL(amo.tests.TestCase):
+
+    def setUp(self):
+        update.update_sql.clear()
+        self.addCleanup(update.update_sql.clear)
+
+    def get_sql(self, compat_mode='strict', d2c_max=False, **data):
+        return update.Update(data, compat_mode).get_update_sql(d2c_max)
+
+    def test_reused(self):
+        sql = self.get_sql()
+        assert self.get_sql() is sql
+        assert self.get_sql('nonsense') is sql
+        eq_(len(update.update_sql), 1)
+
+    def test_shapes(self):
+        assert 'OR files.platform_id = %(appOS)s' in self.get_sql(appOS=2)
+        assert 'incompatible_versions' in self.get_sql('normal')
+        assert 'd2c_max_version' in self.get_sql('normal', True)
+        eq_(len(update.update_sql), 3)
+
+
+class TestServicesPool(amo.tests.TestCase):
+
+    def setUp(self):
+        self.conn = mock.Mock()
+        self.record = mock.Mock(info={})
+
+    def test_fresh_not_pinged(self):
+        services_utils.on_checkout(self.conn, self.record, None)
+        assert not self.conn.cursor.called
+
+    def test_idle_pinged(self):
+        services_utils.on_checkin(self.conn, self.record)
+        services_utils.on_checkout(self.conn, self.record, None)
+        assert not self.conn.cursor.called
+
+        self.record.info['checkin'] -= (
+            services_utils.settings.SERVICES_DATABASE_PING)
+        services_utils.on_checkout(self.conn, self.record, None)
+        self.conn.cursor().execute.assert_called_with('SELECT 1')
+
+    def test_stale(self):
+        self.record.info['checkin'] = 0
+        self.conn.cursor().execute.side_effect = (
+            services_utils.mysql.OperationalError)
+        with self.assertRaises(exc.DisconnectionError):
+            services_utils.on_checkout(self.conn, self.record, None)
+
+    @mock.patch('services.utils.statsd')
+    @mock.patch('services.utils.mypool')
+    def test_connect(self, mypool, statsd):
+        mypool.checkedout.return_value = 3
+        mypool.overflow.return_value = -2
+        eq_(services_utils.connect(), mypool.connect.return_value)
+        statsd.gauge.assert_any_call('services.pool.checkedout', 3)
+        statsd.gauge.assert_any_call('services.pool.overflow', 0)
+
+    @mock.patch('services.utils.statsd')
+    @mock.patch('services.utils.mypool')
+    def test_exhausted(self, mypool, statsd):
+        mypool.connect.side_effect = exc.TimeoutError
+        with self.assertRaises(exc.TimeoutError):
+            services_utils.connect()
+        statsd.incr.assert_called_with('services.pool.exhausted')
+
+
+class TestAdmission(amo.tests.TestCase):
+
+    def setUp(self):
+        self.environ = {'QUERY_STRING': ''}
+        self.start_response = mock.Mock()
+
+    def status(self):
+        return self.start_response.call_args[0][0]
+
+    @mock.patch.object(update, 'pending', threading.BoundedSemaphore(1))
+    def test_rejected(self):
+        update.pending.acquire()
+        try:
+            eq_(update.application(self.environ, self.start_response), [''])
+        finally:
+            update.pending.release()
+        eq_(self.status(), '503 Service Unavailable')
+        headers = dict(self.start_response.call_args[0][1])
+        eq_(headers['Retry-After'],
+            str(settings_local.SERVICES_UPDATE_RETRY_AFTER))
+
+    @mock.patch.object(update, 'pending', threading.BoundedSemaphore(1))
+    @mock.patch('services.update.connect')
+    def test_released(self, connect):
+        connect.side_effect = exc.TimeoutError
+        update.application(self.environ, self.start_response)
+        eq_(self.status(), '503 Service Unavailable')
+        assert update.pending.acquire(False)
+        update.pending.release()
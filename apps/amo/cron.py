@@ -1,10 +1,12 @@
 import itertools
 from datetime import datetime, timedelta
 from subprocess import Popen, PIPE
+import time
 
 from django.conf import settings
 from django.utils import translation
-from django.db import connection, transaction
+from django.db import connection, connections, transaction
+from django.db.models import Max, Min
 
 import cronjobs
 import commonware.log
@@ -31,9 +33,6 @@ def gc(test_result=True):
 
     log.debug('Collecting data to delete')
 
-    logs = (ActivityLog.objects.filter(created__lt=days_ago(90))
-            .exclude(action__in=amo.LOG_KEEP).values_list('id', flat=True))
-
     # Paypal only keeps retrying to verify transactions for up to 3 days. If we
     # still have an unverified transaction after 6 days, we might as well get
     # rid of it.
@@ -45,8 +44,6 @@ def gc(test_result=True):
             created__lt=days_ago(2), type=amo.COLLECTION_ANONYMOUS)
             .values_list('id', flat=True))
 
-    for chunk in chunked(logs, 100):
-        tasks.delete_logs.delay(chunk)
     for chunk in chunked(contributions_to_delete, 100):
         tasks.delete_stale_contributions.delay(chunk)
     for chunk in chunked(collections_to_delete, 100):
@@ -54,6 +51,9 @@ def gc(test_result=True):
     # Incomplete addons cannot be deleted here because when an addon is
     # rejected during a review it is marked as incomplete. See bug 670295.
 
+    log.debug('Deleting old activity logs.')
+    purge_activity_logs(days_ago(90))
+
     log.debug('Cleaning up sharing services.')
     service_names = [s.shortname for s in SERVICES_LIST]
     # collect local service names
@@ -115,6 +115,80 @@ def gc(test_result=True):
             log.debug(line)
 
 
+def purge_activity_logs(before):
+    """
+    Delete the activity logs created before `before`, except the ones in
+    amo.LOG_KEEP, along with every row pointing at them.
+
+    This is done in SQL over windows of ids so the logs are never loaded.
+    The window shrinks while the slaves are lagging and grows back once
+    they have caught up. If a slave isn't replicating, this stops until
+    the next run. Returns the number of logs deleted.
+    """
+    bounds = (ActivityLog.objects.filter(created__lt=before)
+              .aggregate(low=Min('id'), high=Max('id')))
+    if bounds['low'] is None:
+        return 0
+
+    where = 'a.id BETWEEN %s AND %s AND a.created < %s'
+    if amo.LOG_KEEP:
+        where += ' AND a.action NOT IN (%s)' % ','.join(map(str,
+                                                            amo.LOG_KEEP))
+    table = ActivityLog._meta.db_table
+    statements = ['DELETE r FROM %s r INNER JOIN %s a ON a.id = r.%s '
+                  'WHERE %s' % (rel.model._meta.db_table, table,
+                                rel.field.column, where)
+                  for rel in ActivityLog._meta.get_all_related_objects()]
+    statements.append('DELETE a FROM %s a WHERE %s' % (table, where))
+
+    cursor = connection.cursor()
+    batch, low, total = settings.LOG_GC_BATCH_SIZE, bounds['low'], 0
+    while low <= bounds['high']:
+        high = low + batch - 1
+        for sql in statements:
+            cursor.execute(sql, [low, high, before])
+        total += cursor.rowcount
+        transaction.commit_unless_managed()
+        low = high + 1
+
+        lag = _replication_lag()
+        if lag is None:
+            log.warning('A slave is not replicating, stopping log deletion.')
+            break
+        elif lag > settings.LOG_GC_MAX_LAG:
+            batch = max(batch / 2, settings.LOG_GC_MIN_BATCH_SIZE)
+            log.info('Slaves are %ss behind, pausing log deletion.' % lag)
+            time.sleep(min(lag, settings.LOG_GC_MAX_LAG))
+        else:
+            batch = min(batch * 2, settings.LOG_GC_MAX_BATCH_SIZE)
+
+    log.info('Deleted %s activity logs.' % total)
+    return total
+
+
+def _replication_lag():
+    """
+    How many seconds the slowest slave is behind the master, or None if a
+    slave isn't replicating.
+    """
+    lag = 0
+    for alias in settings.SLAVE_DATABASES:
+        cursor = connections[alias].cursor()
+        try:
+            cursor.execute('SHOW SLAVE STATUS')
+        except Exception:
+            log.warning('Could not get the status of slave %s.' % alias,
+                        exc_info=True)
+            continue
+        row = cursor.fetchone()
+        if row:
+            status = dict(zip([c[0] for c in cursor.description], row))
+            if status.get('Seconds_Behind_Master') is None:
+                return None
+            lag = max(lag, status['Seconds_Behind_Master'])
+    return lag
+
+
 @cronjobs.register
 def expired_resetcode():
     """
@@ -0,0 +1,240 @@
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from optparse import make_option
+from StringIO import StringIO
+from urllib import urlencode
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+import amo
+
+SERVICES = ('update', 'verify', 'pfs')
+
+
+class CountingCursor(object):
+    """Counts the queries run through a DB-API cursor."""
+
+    def __init__(self, cursor, counter):
+        self.cursor = cursor
+        self.counter = counter
+
+    def execute(self, *args, **kw):
+        self.counter[0] += 1
+        return self.cursor.execute(*args, **kw)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+class CountingConnection(object):
+
+    def __init__(self, conn, counter):
+        self.conn = conn
+        self.counter = counter
+
+    def cursor(self):
+        return CountingCursor(self.conn.cursor(), self.counter)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+
+def percentile(values, pct):
+    """The `pct` percentile of the sorted list `values`."""
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * pct / 100.0))]
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--requests', action='store',
+                    default=os.path.join(settings.ROOT, 'services',
+                                         'bench.json'),
+                    help='The recorded requests to replay.'),
+        make_option('-n', action='store', type='int', dest='count',
+                    default=2000, help='How many requests to make.'),
+        make_option('--warmup', action='store', type='int', default=200,
+                    help='Requests made before measuring.'),
+        make_option('--seed', action='store', type='int', default=0,
+                    help='Seed for picking the requests.'),
+        make_option('--baseline', action='store',
+                    help='Fail if the results regress from the ones in '
+                         'this file.'),
+        make_option('--tolerance', action='store', type='float', default=20,
+                    help='How many percent slower than the baseline is '
+                         'still a pass.'),
+        make_option('--save', action='store',
+                    help='Write the results to this file, to be used as a '
+                         'baseline.'),
+    )
+    help = ('Benchmark the update, verify and pfs services with recorded '
+            'requests, against a fresh test database.')
+
+    def handle(self, *args, **options):
+        with open(options['requests']) as fp:
+            recording = json.load(fp)
+
+        # Importing the services configures them, so wait until needed.
+        from services import pfs, update, utils, verify
+        self.apps = {'update': update.application,
+                     'verify': verify.application,
+                     'pfs': pfs.application}
+
+        old_name = settings.DATABASES['default']['NAME']
+        name = connection.creation.create_test_db(verbosity=0,
+                                                  autoclobber=True)
+        old_services_db = utils.settings.SERVICES_DATABASE
+        db = connection.settings_dict
+        utils.settings.SERVICES_DATABASE = {
+            'NAME': name, 'HOST': db['HOST'], 'USER': db['USER'],
+            'PASSWORD': db['PASSWORD']}
+
+        self.counter = [0]
+        connect = utils.connect
+
+        def counting_connect():
+            return CountingConnection(connect(), self.counter)
+        update.connect = verify.connect = counting_connect
+
+        try:
+            call_command('loaddata', *recording['fixtures'], verbosity=0)
+            requests = [self.prepare(r) for r in recording['requests']]
+            results, failures = self.run(requests, options)
+        finally:
+            update.connect = verify.connect = connect
+            utils.settings.SERVICES_DATABASE = old_services_db
+            utils.mypool.dispose()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.report(results)
+        if options['save']:
+            with open(options['save'], 'w') as fp:
+                json.dump(results, fp, indent=2, sort_keys=True)
+        if options['baseline']:
+            with open(options['baseline']) as fp:
+                failures.extend(self.compare(results, json.load(fp),
+                                             options['tolerance']))
+        if failures:
+            raise CommandError('\n'.join(failures))
+
+    def prepare(self, request):
+        """Makes the WSGI environ, and any data needed, for `request`."""
+        service = request['service']
+        if service not in SERVICES:
+            raise CommandError('Unknown service: %s' % service)
+        environ = {'REQUEST_METHOD': 'GET',
+                   'QUERY_STRING': urlencode(request.get('query', {}))}
+        if service == 'verify':
+            environ.update(REQUEST_METHOD='POST', PATH_INFO='/verify/',
+                           body=self.receipt(request['receipt']))
+        return dict(request, environ=environ)
+
+    def receipt(self, data):
+        """
+        Makes a receipt for an install of the `addon` by the `user` in
+        `data`, purchased if it's `premium`. Without `data`, the receipt is
+        garbage.
+        """
+        if not data:
+            return 'not-a-receipt'
+        from market.models import AddonPurchase
+        from mkt.receipts.utils import create_receipt
+        from mkt.webapps.models import Installed
+
+        installed, _ = Installed.objects.get_or_create(
+            addon_id=data['addon'], user_id=data['user'])
+        if data.get('premium'):
+            installed.update(premium_type=amo.ADDON_PREMIUM)
+            AddonPurchase.objects.get_or_create(addon_id=data['addon'],
+                                                user_id=data['user'])
+        return create_receipt(installed.pk)
+
+    def call(self, request):
+        """
+        Serves `request`, returning how long that took, how many queries
+        it ran and the response status.
+        """
+        environ = dict(request['environ'])
+        if 'body' in environ:
+            environ['wsgi.input'] = StringIO(environ.pop('body'))
+        status = []
+
+        def start_response(code, headers):
+            status.append(code)
+
+        self.counter[0] = 0
+        start = time.time()
+        ''.join(self.apps[request['service']](environ, start_response))
+        return time.time() - start, self.counter[0], status[0]
+
+    def run(self, requests, options):
+        rng = random.Random(options['seed'])
+        population = [r for r in requests for i in range(r['weight'])]
+
+        for i in range(options['warmup']):
+            self.call(rng.choice(population))
+
+        times, queries = defaultdict(list), defaultdict(int)
+        failures = []
+        for i in range(options['count']):
+            request = rng.choice(population)
+            service = request['service']
+            elapsed, count, status = self.call(request)
+            times[service].append(elapsed)
+            queries[service] += count
+            data = json.dumps(request.get('query', request.get('receipt')))
+            if not status.startswith('200'):
+                failures.append('%s: %s for %s' % (service, status, data))
+            if count > request['queries']:
+                failures.append('%s: %s queries instead of %s for %s'
+                                % (service, count, request['queries'], data))
+
+        results = {}
+        for service, values in times.items():
+            values.sort()
+            results[service] = {
+                'requests': len(values),
+                'rps': len(values) / sum(values),
+                'p50': percentile(values, 50) * 1000,
+                'p90': percentile(values, 90) * 1000,
+                'p99': percentile(values, 99) * 1000,
+                'queries': float(queries[service]) / len(values),
+            }
+        return results, sorted(set(failures))
+
+    def report(self, results):
+        print '%-8s %8s %8s %8s %8s %8s %8s' % (
+            'service', 'requests', 'req/s', 'p50 ms', 'p90 ms', 'p99 ms',
+            'queries')
+        for service in SERVICES:
+            if service in results:
+                print ('%(service)-8s %(requests)8d %(rps)8.1f %(p50)8.2f '
+                       '%(p90)8.2f %(p99)8.2f %(queries)8.2f'
+                       % dict(results[service], service=service))
+
+    def compare(self, results, baseline, tolerance):
+        """Lists how the `results` regressed from the `baseline`."""
+        failures = []
+        slack = 1 + tolerance / 100.0
+        for service, base in baseline.items():
+            result = results.get(service)
+            if not result:
+                continue
+            if result['rps'] * slack < base['rps']:
+                failures.append('%s: %.1f req/s, down from %.1f'
+                                % (service, result['rps'], base['rps']))
+            if result['p99'] > base['p99'] * slack:
+                failures.append('%s: p99 of %.2f ms, up from %.2f'
+                                % (service, result['p99'], base['p99']))
+            if result['queries'] > base['queries'] + 0.01:
+                failures.append('%s: %.2f queries per request, up from %.2f'
+                                % (service, result['queries'],
+                                   base['queries']))
+        return failures
@@ -6,14 +6,17 @@ import unittest
 from django.conf import settings
 from django.core.cache import cache
 from django.core.validators import ValidationError
+from django.test.client import RequestFactory
+from django.utils.http import http_date
 from django.utils import translation
 
 import mock
 from nose.tools import eq_, assert_raises, raises
 
 from amo.utils import (cache_ns_key, escape_all, find_language,
-                       LocalFileStorage, no_translation, resize_image,
-                       rm_local_tmp_dir, slugify, slug_validator, to_language)
+                       HttpResponseSendFile, LocalFileStorage, no_translation,
+                       resize_image, rm_local_tmp_dir, slugify, slug_validator,
+                       to_language)
 from product_details import product_details
 
 u = u'Ελληνικά'
@@ -247,3 +250,87 @@ def test_escape_all():
     ]
     for val, expected in s:
         yield check, val, expected
+
+
+class TestHttpResponseSendFile(unittest.TestCase):
+
+    def setUp(self):
+        self.file = tempfile.NamedTemporaryFile()
+        self.file.write('0123456789')
+        self.file.flush()
+        patcher = mock.patch.object(settings, 'XSENDFILE', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def send(self, **headers):
+        request = RequestFactory().get('/', **headers)
+        return HttpResponseSendFile(request, self.file.name, etag='abc')
+
+    def test_offloaded(self):
+        with mock.patch.object(settings, 'XSENDFILE', True):
+            res = self.send(HTTP_RANGE='bytes=2-4')
+            eq_(res.status_code, 200)
+            eq_(res[settings.XSENDFILE_HEADER], self.file.name)
+            eq_(''.join(res), '')
+
+    def test_whole_file(self):
+        res = self.send()
+        eq_(res.status_code, 200)
+        eq_(res['Content-Length'], '10')
+        eq_(res['Accept-Ranges'], 'bytes')
+        eq_(''.join(res), '0123456789')
+
+    def test_range(self):
+        res = self.send(HTTP_RANGE='bytes=2-4')
+        eq_(res.status_code, 206)
+        eq_(res['Content-Range'], 'bytes 2-4/10')
+        eq_(res['Content-Length'], '3')
+        eq_(''.join(res), '234')
+
+    def test_open_range(self):
+        res = self.send(HTTP_RANGE='bytes=7-')
+        eq_(res['Content-Range'], 'bytes 7-9/10')
+        eq_(''.join(res), '789')
+
+    def test_suffix_range(self):
+        res = self.send(HTTP_RANGE='bytes=-4')
+        eq_(res['Content-Range'], 'bytes 6-9/10')
+        eq_(''.join(res), '6789')
+
+    def test_range_past_end(self):
+        res = self.send(HTTP_RANGE='bytes=8-20')
+        eq_(res['Content-Range'], 'bytes 8-9/10')
+        eq_(''.join(res), '89')
+
+    def test_unsatisfiable(self):
+        res = self.send(HTTP_RANGE='bytes=10-')
+        eq_(res.status_code, 416)
+        eq_(res['Content-Range'], 'bytes */10')
+        eq_(''.join(res), '')
+
+    def test_several_ranges(self):
+        res = self.send(HTTP_RANGE='bytes=0-1,4-5')
+        eq_(res.status_code, 200)
+        eq_(''.join(res), '0123456789')
+
+    def test_if_range_etag(self):
+        eq_(self.send(HTTP_RANGE='bytes=2-4',
+                      HTTP_IF_RANGE='"abc"').status_code, 206)
+        eq_(self.send(HTTP_RANGE='bytes=2-4',
+                      HTTP_IF_RANGE='"def"').status_code, 200)
+
+    def test_if_range_date(self):
+        mtime = os.path.getmtime(self.file.name)
+        eq_(self.send(HTTP_RANGE='bytes=2-4',
+                      HTTP_IF_RANGE=http_date(mtime)).status_code, 206)
+        eq_(self.send(HTTP_RANGE='bytes=2-4',
+                      HTTP_IF_RANGE=http_date(mtime - 60)).status_code, 200)
+
+    @mock.patch('amo.utils.statsd')
+    def test_metrics(self, statsd):
+        res = self.send(HTTP_RANGE='bytes=2-4')
+        ''.join(res)
+        res.close()
+        statsd.incr.assert_called_with(
+            'sendfile.application_octet-stream.bytes', 3)
+        eq_(statsd.timing.call_args[0][0], 'sendfile.application_octet-stream')
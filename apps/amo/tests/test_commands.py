@@ -0,0 +1,54 @@
+import json
+import os
+
+from django.conf import settings
+
+import mock
+from nose.tools import eq_
+
+import amo.tests
+from amo.management.commands.bench_services import (Command,
+                                                    CountingConnection,
+                                                    percentile)
+
+
+class TestBenchServices(amo.tests.TestCase):
+
+    def setUp(self):
+        self.base = {'update': {'rps': 100.0, 'p99': 10.0, 'queries': 2.0}}
+
+    def result(self, **kw):
+        return {'update': dict(self.base['update'], **kw)}
+
+    def test_recording(self):
+        with open(os.path.join(settings.ROOT, 'services', 'bench.json')) as fp:
+            recording = json.load(fp)
+        eq_(set(r['service'] for r in recording['requests']),
+            set(['update', 'verify', 'pfs']))
+
+    def test_percentile(self):
+        values = range(100)
+        eq_(percentile(values, 50), 50)
+        eq_(percentile(values, 99), 99)
+        eq_(percentile([], 99), 0)
+
+    def test_counting(self):
+        counter = [0]
+        conn = CountingConnection(mock.Mock(), counter)
+        cursor = conn.cursor()
+        cursor.execute('SELECT 1')
+        cursor.execute('SELECT 2')
+        cursor.fetchone()
+        eq_(counter, [2])
+
+    def test_compare_pass(self):
+        eq_(Command().compare(self.result(rps=90.0, p99=11.0), self.base,
+                              20), [])
+
+    def test_compare_slower(self):
+        eq_(len(Command().compare(self.result(rps=50.0, p99=20.0),
+                                  self.base, 20)), 2)
+
+    def test_compare_queries(self):
+        eq_(len(Command().compare(self.result(queries=2.5), self.base, 20)),
+            1)
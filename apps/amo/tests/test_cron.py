@@ -1,9 +1,17 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+
+from mock import patch
 from nose.tools import eq_
 
+import amo
 import amo.tests
-from amo.cron import gc
+from addons.models import Addon
+from amo.cron import _replication_lag, gc, purge_activity_logs
 from bandwagon.models import Collection
-from devhub.models import ActivityLog
+from devhub.models import ActivityLog, AddonLog, UserLog
+from users.models import UserProfile
 from stats.models import AddonShareCount, Contribution
 
 
@@ -21,3 +29,80 @@ class GarbageTest(amo.tests.TestCase):
         eq_(ActivityLog.objects.all().count(), 0)
         eq_(AddonShareCount.objects.all().count(), 0)
         eq_(Contribution.objects.all().count(), 0)
+
+
+class TestPurgeActivityLogs(amo.tests.TestCase):
+    fixtures = ['base/addon_3615', 'base/users']
+
+    def setUp(self):
+        self.addon = Addon.objects.get(pk=3615)
+        self.user = UserProfile.objects.get(email='regular@mozilla.com')
+        self.cutoff = datetime.now() - timedelta(days=90)
+
+    def log(self, action, days):
+        amo.log(action, self.addon, user=self.user)
+        log = ActivityLog.objects.latest('id')
+        log.update(created=datetime.now() - timedelta(days=days))
+        return log
+
+    def test_purge(self):
+        old = self.log(amo.LOG.EDIT_PROPERTIES, 100)
+        kept = self.log(amo.LOG.CREATE_ADDON, 100)
+        new = self.log(amo.LOG.EDIT_PROPERTIES, 1)
+        eq_(purge_activity_logs(self.cutoff), 1)
+        ids = ActivityLog.objects.values_list('id', flat=True)
+        eq_(sorted(ids), [kept.id, new.id])
+        assert not AddonLog.objects.filter(activity_log=old).exists()
+        assert not UserLog.objects.filter(activity_log=old).exists()
+        assert AddonLog.objects.filter(activity_log=kept).exists()
+
+    def test_windows(self):
+        for i in range(5):
+            self.log(amo.LOG.EDIT_PROPERTIES, 100)
+        with self.settings(LOG_GC_BATCH_SIZE=1, LOG_GC_MAX_BATCH_SIZE=2):
+            eq_(purge_activity_logs(self.cutoff), 5)
+        eq_(ActivityLog.objects.count(), 0)
+
+    @patch('amo.cron.time.sleep')
+    @patch('amo.cron._replication_lag')
+    def test_lagging(self, lag, sleep):
+        lag.return_value = 30
+        for i in range(3):
+            self.log(amo.LOG.EDIT_PROPERTIES, 100)
+        with self.settings(LOG_GC_BATCH_SIZE=1, LOG_GC_MIN_BATCH_SIZE=1):
+            eq_(purge_activity_logs(self.cutoff), 3)
+        eq_(sleep.call_count, 3)
+        sleep.assert_called_with(settings.LOG_GC_MAX_LAG)
+
+    @patch('amo.cron.time.sleep')
+    @patch('amo.cron._replication_lag')
+    def test_not_replicating(self, lag, sleep):
+        lag.return_value = None
+        for i in range(3):
+            self.log(amo.LOG.EDIT_PROPERTIES, 100)
+        with self.settings(LOG_GC_BATCH_SIZE=1):
+            eq_(purge_activity_logs(self.cutoff), 1)
+        eq_(ActivityLog.objects.count(), 2)
+        assert not sleep.called
+
+    @patch('amo.cron.connections')
+    def test_replication_lag(self, connections):
+        cursor = connections.__getitem__.return_value.cursor.return_value
+        cursor.description = [('Slave_IO_State',), ('Seconds_Behind_Master',)]
+        statuses = [('', 3), ('', 10)]
+        cursor.fetchone.side_effect = lambda: statuses.pop(0)
+        with self.settings(SLAVE_DATABASES=['a', 'b']):
+            eq_(_replication_lag(), 10)
+
+    @patch('amo.cron.connections')
+    def test_replication_stopped(self, connections):
+        cursor = connections.__getitem__.return_value.cursor.return_value
+        cursor.description = [('Slave_IO_State',), ('Seconds_Behind_Master',)]
+        cursor.fetchone.return_value = ('', None)
+        with self.settings(SLAVE_DATABASES=['a']):
+            eq_(_replication_lag(), None)
+
+    def test_nothing_to_purge(self):
+        self.log(amo.LOG.EDIT_PROPERTIES, 1)
+        eq_(purge_activity_logs(self.cutoff), 0)
+        eq_(ActivityLog.objects.count(), 1)
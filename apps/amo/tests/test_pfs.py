@@ -1,5 +1,9 @@
+import mock
+from nose.tools import eq_
+
 import amo
 import amo.tests
+from services import pfs
 from services.pfs import get_output
 
 from  pyquery import PyQuery as pq
@@ -7,6 +11,14 @@ from  pyquery import PyQuery as pq
 
 class TestPfs(amo.tests.TestCase):
 
+    def setUp(self):
+        pfs.responses.clear()
+        self.addCleanup(pfs.responses.clear)
+        self.data = {'mimetype': 'application/x-shockwave-flash',
+                     'appID': '{ec8030f7-c20a-464f-9b0e-13a3a9e97384}',
+                     'appVersion': '20130101', 'clientOS': 'Windows NT 6.1',
+                     'chromeLocale': 'en-US'}
+
     def test_xss(self):
         for k in ['name', 'mimetype', 'guid', 'version', 'iconUrl',
                   'InstallerLocation', 'InstallerHash', 'XPILocation',
@@ -14,3 +26,29 @@ class TestPfs(amo.tests.TestCase):
                   'licenseURL', 'needsRestart']:
             res = get_output({k: 'fooo<script>alert("foo")</script>;'})
             assert not pq(res)('script')
+
+    def test_cached(self):
+        hits = pfs.cache_stats['hits']
+        res = get_output(self.data)
+        assert 'Adobe Flash Player' in res
+        self.data.update(appVersion='21', appID='foo', extra='bar')
+        with mock.patch('services.pfs.get_plugin') as get_plugin:
+            eq_(get_output(self.data), res)
+        assert not get_plugin.called
+        eq_(pfs.cache_stats['hits'], hits + 1)
+
+    def test_cache_key(self):
+        get_output(self.data)
+        self.data['clientOS'] = 'Linux x86_64'
+        assert 'Adobe Flash Player' not in get_output(self.data)
+        del self.data['appID']
+        eq_(pfs.cache_key(self.data), (self.data['mimetype'],))
+        assert 'Adobe Flash Player' not in get_output(self.data)
+        eq_(len(pfs.responses), 3)
+
+    @mock.patch.object(pfs.settings, 'PFS_CACHE_SIZE', 1)
+    def test_cache_size(self):
+        get_output(self.data)
+        self.data['chromeLocale'] = 'fr'
+        get_output(self.data)
+        eq_(pfs.responses.keys(), [pfs.cache_key(self.data)])
@@ -6,6 +6,7 @@ import datetime
 import functools
 import hashlib
 import itertools
+import mmap
 import operator
 import os
 import random
@@ -34,6 +35,7 @@ from django.template import Context, loader
 from django.utils import translation
 from django.utils.functional import Promise
 from django.utils.encoding import smart_str, smart_unicode
+from django.utils.http import http_date, parse_http_date_safe
 
 import bleach
 from cef import log_cef as _log_cef
@@ -585,37 +587,128 @@ def get_locale_from_lang(lang):
     return Locale(translation.to_locale(lang))
 
 
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
 class HttpResponseSendFile(http.HttpResponse):
+    """
+    Serves the file at `path`, through the frontend if XSENDFILE is set.
+
+    Otherwise the file is read here, with single byte ranges supported so
+    that interrupted downloads can resume. Each response records its size
+    and how long it took per content type.
+    """
+    chunk_size = 2 ** 16
 
     def __init__(self, request, path, content=None, status=None,
                  content_type='application/octet-stream', etag=None):
         self.request = request
         self.path = path
+        self.range = None
+        self.length = None
+        self.started = time.time()
+        self.stat_key = re.sub(r'[^\w-]', '_', content_type.split(';')[0])
         super(HttpResponseSendFile, self).__init__('', status=status,
                                                    content_type=content_type)
-        if settings.XSENDFILE:
-            self[settings.XSENDFILE_HEADER] = path
+        self['Accept-Ranges'] = 'bytes'
         if etag:
             self['ETag'] = '"%s"' % etag
+        if settings.XSENDFILE:
+            # The frontend serves the file, ranges included.
+            self[settings.XSENDFILE_HEADER] = path
+            statsd.incr('sendfile.offloaded.%s' % self.stat_key)
+        else:
+            self._set_range()
+
+    def _set_range(self):
+        try:
+            size = os.path.getsize(self.path)
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return  # Opening it will raise the error.
+        self['Last-Modified'] = http_date(mtime)
+        self.range = (0, size)
+        self.length = size
+        self['Content-Length'] = size
+
+        if (self.status_code != 200 or 'HTTP_RANGE' not in self.request.META
+            or not self._if_range(mtime)):
+            return
+        match = RANGE_RE.match(self.request.META['HTTP_RANGE'].strip())
+        if not match:
+            # Several ranges or another unit: send the whole file.
+            return
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if last and int(last) < start:
+                return  # Invalid, so ignored.
+        elif last:
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            return
+
+        if start >= size:
+            self.status_code = 416
+            self['Content-Range'] = 'bytes */%s' % size
+            self.range = (0, 0)
+        else:
+            self.status_code = 206
+            self['Content-Range'] = 'bytes %s-%s/%s' % (start, end, size)
+            self.range = (start, end + 1)
+        self.length = self.range[1] - self.range[0]
+        self['Content-Length'] = self.length
+
+    def _if_range(self, mtime):
+        """Whether the range should be sent, given If-Range."""
+        if_range = self.request.META.get('HTTP_IF_RANGE')
+        if not if_range:
+            return True
+        if if_range.startswith(('"', 'W/')):
+            return if_range == self.get('ETag')
+        return parse_http_date_safe(if_range) == int(mtime)
 
     def __iter__(self):
-        if settings.XSENDFILE:
+        if settings.XSENDFILE or self.status_code == 416:
             return iter([])
 
-        chunk = 4096
         fp = open(self.path, 'rb')
-        if 'wsgi.file_wrapper' in self.request.META:
-            return self.request.META['wsgi.file_wrapper'](fp, chunk)
-        else:
-            self['Content-Length'] = os.path.getsize(self.path)
-
-            def wrapper():
-                while 1:
-                    data = fp.read(chunk)
-                    if not data:
-                        break
-                    yield data
-            return wrapper()
+        if (self.status_code != 206 and
+            'wsgi.file_wrapper' in self.request.META):
+            # The server can send the whole file without reading it here.
+            return self.request.META['wsgi.file_wrapper'](fp, self.chunk_size)
+        return self._read(fp, *self.range)
+
+    def _read(self, fp, start, end):
+        """Yields the bytes of `fp` from `start` to `end`, mapped if we can."""
+        try:
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, EnvironmentError):
+            data = None
+            fp.seek(start)
+        try:
+            while start < end:
+                size = min(self.chunk_size, end - start)
+                if data is None:
+                    chunk = fp.read(size)
+                else:
+                    chunk = data[start:start + size]
+                if not chunk:
+                    break  # The file was truncated.
+                yield chunk
+                start += len(chunk)
+        finally:
+            if data is not None:
+                data.close()
+            fp.close()
+
+    def close(self):
+        super(HttpResponseSendFile, self).close()
+        if self.length is not None:
+            statsd.timing('sendfile.%s' % self.stat_key,
+                          (time.time() - self.started) * 1000)
+            statsd.incr('sendfile.%s.bytes' % self.stat_key, self.length)
 
 
 def memoize_key(prefix, *args, **kwargs):
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import base64
+import hashlib
 import json
 import logging
 import os
@@ -28,6 +29,7 @@ from applications.models import Application, AppVersion
 from devhub import perf
 from files.helpers import copyfileobj
 from files.models import FileUpload, File, FileValidation
+from files.utils import cached_validation, package_revision
 
 from PIL import Image
 
@@ -134,12 +136,36 @@ def run_validator(file_path, for_appversions=None, test_all_tiers=False,
     compatibility tests.
     """
 
-    from validator.validate import validate
+    import validator
 
     apps = dump_apps.Command.JSON_PATH
     if not os.path.exists(apps):
         call_command('dump_apps')
 
+    def validate():
+        return _run_validator(file_path, apps, for_appversions,
+                              test_all_tiers, overrides, compat)
+
+    # Anything that can change the result is part of the cache key.
+    return cached_validation(file_path, validate, 'amo',
+                             package_revision(validator),
+                             _apps_digest(apps), for_appversions,
+                             test_all_tiers, overrides, compat)
+
+
+def _apps_digest(apps):
+    """The digest of the approved applications the validator is given."""
+    try:
+        with open(apps) as fp:
+            return hashlib.md5(fp.read()).hexdigest()
+    except IOError:
+        return None
+
+
+def _run_validator(file_path, apps, for_appversions, test_all_tiers,
+                   overrides, compat):
+    from validator.validate import validate
+
     path = file_path
     if path and not os.path.exists(path) and storage.exists(path):
         path = tempfile.mktemp(suffix='_' + os.path.basename(file_path))
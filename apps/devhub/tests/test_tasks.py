@@ -118,6 +118,53 @@ class TestValidator(amo.tests.TestCase):
         assert error.startswith('Traceback (most recent call last)'), error
 
 
+class TestRunValidator(amo.tests.TestCase):
+
+    def setUp(self):
+        self.xpi = os.path.join(settings.ROOT,
+                                'apps/files/fixtures/files/firefm.xpi')
+        patcher = mock.patch('validator.validate.validate')
+        self.validate = patcher.start()
+        self.validate.return_value = '{"errors": 0}'
+        self.addCleanup(patcher.stop)
+
+    def test_no_cache(self):
+        with self.settings(VALIDATION_CACHE_TIMEOUT=0):
+            tasks.run_validator(self.xpi)
+            tasks.run_validator(self.xpi)
+        eq_(self.validate.call_count, 2)
+
+    def test_cached(self):
+        with self.settings(VALIDATION_CACHE_TIMEOUT=60):
+            eq_(tasks.run_validator(self.xpi), '{"errors": 0}')
+            eq_(tasks.run_validator(self.xpi), '{"errors": 0}')
+        eq_(self.validate.call_count, 1)
+
+    def test_cached_by_contents(self):
+        copy = tempfile.NamedTemporaryFile(suffix='.xpi')
+        shutil.copyfile(self.xpi, copy.name)
+        with self.settings(VALIDATION_CACHE_TIMEOUT=60):
+            tasks.run_validator(self.xpi)
+            tasks.run_validator(copy.name)
+        eq_(self.validate.call_count, 1)
+
+    def test_options_in_key(self):
+        with self.settings(VALIDATION_CACHE_TIMEOUT=60):
+            tasks.run_validator(self.xpi)
+            tasks.run_validator(self.xpi, test_all_tiers=True)
+            tasks.run_validator(self.xpi, overrides={'foo': 'bar'})
+        eq_(self.validate.call_count, 3)
+
+    @mock.patch('devhub.tasks.package_revision')
+    def test_revision_in_key(self, package_revision):
+        with self.settings(VALIDATION_CACHE_TIMEOUT=60):
+            package_revision.return_value = 'old'
+            tasks.run_validator(self.xpi)
+            package_revision.return_value = 'new'
+            tasks.run_validator(self.xpi)
+        eq_(self.validate.call_count, 2)
+
+
 class TestFlagBinary(amo.tests.TestCase):
     fixtures = ['base/addon_3615']
 
@@ -0,0 +1,40 @@
+import commonware.log
+import cronjobs
+from celery.task.sets import TaskSet
+
+from amo.utils import chunked
+from editors.models import (leaderboard_active, REVIEW_QUEUES,
+                            ReviewerLeaderboard, ReviewQueueEntry)
+from editors.tasks import update_queue_entries
+
+log = commonware.log.getLogger('z.cron')
+
+
+@cronjobs.register
+def rebuild_review_queues():
+    """
+    Reconcile the materialised `editors_queue` table with the queue views.
+
+    The table is maintained from signals; this catches anything they missed
+    (raw SQL updates, lost tasks) and fills the table the first time.
+    """
+    ids = set()
+    for view in REVIEW_QUEUES.values():
+        ids.update(row.id for row in view.objects.all())
+    stale = (set(ReviewQueueEntry.objects.values_list('addon', flat=True))
+             - ids)
+    ids.update(stale)
+
+    log.info('Rebuilding editor queue entries for %s add-ons.' % len(ids))
+    ts = [update_queue_entries.subtask(args=[chunk])
+          for chunk in chunked(sorted(ids), 100)]
+    TaskSet(ts).apply_async()
+
+
+@cronjobs.register
+def rebuild_reviewer_leaderboards():
+    """Reload the redis reviewer leaderboards from `reviewer_scores`."""
+    if not leaderboard_active():
+        return
+    log.info('Rebuilding reviewer leaderboards.')
+    ReviewerLeaderboard().rebuild()
@@ -4,6 +4,7 @@ import commonware.log
 import django_tables as tables
 import jinja2
 from django.conf import settings
+from django.core.cache import cache
 from django.template import Context, loader
 from django.utils.datastructures import SortedDict
 from jingo import register
@@ -319,6 +320,39 @@ def send_mail(template, subject, emails, context, perm_setting=None):
                   use_blacklist=False, perm_setting=perm_setting)
 
 
+def viewing_key(addon_id):
+    return '%s:review_viewing:%s' % (settings.CACHE_PREFIX, addon_id)
+
+
+def claim_viewing(addon_id, user_id):
+    """
+    Mark `user_id` as viewing `addon_id` unless someone else already is, and
+    return the id of the user viewing it.
+
+    The claim is made with an atomic cache add so two reviewers opening the
+    same add-on at once can't both think they got it.
+    """
+    key = viewing_key(addon_id)
+    # We want to save it for twice as long as the ping interval,
+    # just to account for latency and the like.
+    timeout = amo.EDITOR_VIEWING_INTERVAL * 2
+    if cache.add(key, user_id, timeout):
+        return user_id
+    current = cache.get(key)
+    if current is None or current == user_id:
+        # Refresh our own claim, or take over one that just expired.
+        cache.set(key, user_id, timeout)
+        return user_id
+    return current
+
+
+def get_viewing(addon_ids):
+    """Return {addon_id: user id} for each of `addon_ids` being viewed."""
+    keys = dict((viewing_key(addon_id), addon_id) for addon_id in addon_ids)
+    return dict((keys[key], user_id)
+                for key, user_id in cache.get_many(keys.keys()).items())
+
+
 def get_position(addon):
     version = addon.latest_version
 
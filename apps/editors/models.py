@@ -1,11 +1,12 @@
 import copy
 import datetime
 
+import redisutils
 import waffle
 
 from django.conf import settings
 from django.core.cache import cache
-from django.db import connection, models
+from django.db import connection, models, transaction
 from django.db.models import Sum
 from django.template import Context, loader
 from django.utils.datastructures import SortedDict
@@ -17,9 +18,10 @@ from amo.urlresolvers import reverse
 from amo.utils import cache_ns_key, send_mail
 from addons.models import Addon
 from editors.sql_model import RawSQLModel
+from files.models import File
 from translations.fields import TranslatedField
 from users.models import UserProfile
-from versions.models import version_uploaded
+from versions.models import Version, version_uploaded
 
 import commonware.log
 
@@ -290,6 +292,93 @@ class ViewFastTrackQueue(VersionSpecificQueue):
         return q
 
 
+# The queues mirrored in the `editors_queue` table, by the name used in
+# `editors.views.queue_counts`.
+REVIEW_QUEUES = SortedDict([
+    ('pending', ViewPendingQueue),
+    ('nominated', ViewFullReviewQueue),
+    ('prelim', ViewPreliminaryQueue),
+    ('fast_track', ViewFastTrackQueue),
+])
+
+
+class ReviewQueueEntry(models.Model):
+    """
+    Materialised membership of the editor review queues.
+
+    There is one row per add-on and queue it is currently waiting in, kept
+    up to date from the file, version and add-on signals below so counting a
+    queue is a cheap indexed query instead of the full `ViewQueue` SQL.
+    """
+    addon = models.ForeignKey(Addon)
+    queue = models.CharField(max_length=20)
+    waiting_since = models.DateTimeField()
+
+    class Meta:
+        db_table = 'editors_queue'
+        unique_together = ('addon', 'queue')
+
+    @classmethod
+    def refresh(cls, addon_id):
+        """Rebuild the queue rows of a single add-on from the queue views."""
+        now = datetime.datetime.now()
+        waiting = {}
+        for name, view in REVIEW_QUEUES.items():
+            for row in view.objects.filter(id=addon_id):
+                waiting[name] = now - datetime.timedelta(
+                    minutes=row.waiting_time_min)
+
+        cls.objects.filter(addon=addon_id).exclude(
+            queue__in=waiting.keys()).delete()
+        if waiting:
+            # Several refreshes of the same add-on can run at once, so the
+            # rows are upserted rather than looked up and then created.
+            cursor = connection.cursor()
+            cursor.executemany(
+                'INSERT INTO editors_queue (addon_id, queue, waiting_since) '
+                'VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE '
+                'waiting_since = VALUES(waiting_since)',
+                [(addon_id, name, since) for name, since in waiting.items()])
+            transaction.commit_unless_managed()
+
+    @classmethod
+    def count(cls, queue, days_min=None, days_max=None):
+        """
+        Number of add-ons in `queue`, with the same `days_min`/`days_max`
+        semantics as filtering the queue views on `waiting_time_days`.
+        """
+        qs = cls.objects.filter(queue=queue)
+        now = datetime.datetime.now()
+        if days_min:
+            qs = qs.filter(
+                waiting_since__lte=now - datetime.timedelta(days=days_min))
+        if days_max:
+            qs = qs.filter(
+                waiting_since__gt=now - datetime.timedelta(days=days_max + 1))
+        return qs.count()
+
+    @classmethod
+    def waiting_days(cls, queues):
+        """
+        Return {queue: {days waiting: number of add-ons}} for `queues` in a
+        single query.
+        """
+        rv = dict((q, {}) for q in queues)
+        if not queues:
+            return rv
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT queue, TIMESTAMPDIFF(DAY, waiting_since, NOW()) AS days,
+                   COUNT(*)
+            FROM editors_queue
+            WHERE queue IN (%s)
+            GROUP BY queue, days""" % ', '.join(['%s'] * len(queues)),
+            list(queues))
+        for queue, days, total in cursor.fetchall():
+            rv[queue][int(days)] = int(total)
+        return rv
+
+
 class PerformanceGraph(ViewQueue):
     id = models.IntegerField()
     yearmonth = models.CharField(max_length=7)
@@ -447,6 +536,8 @@ class ReviewerScore(amo.models.ModelBase):
             cls.objects.create(user=user, addon=addon, score=score,
                                note_key=event)
             cls.get_key(invalidate=True)
+            if leaderboard_active():
+                ReviewerLeaderboard().add(user, score)
             user_log.info(
                 u'Awarding %s points to user %s for "%s" for addon %s' % (
                     score, user, amo.REVIEWED_CHOICES[event], addon.id))
@@ -460,6 +551,8 @@ class ReviewerScore(amo.models.ModelBase):
         score = amo.REVIEWED_SCORES.get(event)
         cls.objects.create(user=user, addon=addon, score=score, note_key=event)
         cls.get_key(invalidate=True)
+        if leaderboard_active():
+            ReviewerLeaderboard().add(user, score)
         user_log.info(
             u'Awarding %s points to user %s for "%s" for review %s' % (
                 score, user, amo.REVIEWED_CHOICES[event], review_id))
@@ -578,6 +671,9 @@ class ReviewerScore(amo.models.ModelBase):
         elements instead of the normal 3.
 
         """
+        if leaderboard_active():
+            return ReviewerLeaderboard().get_leaderboards(user, days=days)
+
         key = cls.get_key('get_leaderboards:%s' % user.id)
         val = cache.get(key)
         if val is not None:
@@ -636,14 +732,16 @@ class ReviewerScore(amo.models.ModelBase):
         """
         Returns reviewers ordered by highest total points first.
         """
-        sql = cls._leaderboard_query()
+        if leaderboard_active():
+            rows = ReviewerLeaderboard().all_users()
+        else:
+            cursor = connection.cursor()
+            cursor.execute(cls._leaderboard_query())
+            rows = cursor.fetchall()
+
         scores = []
         prev = None
-
-        cursor = connection.cursor()
-        cursor.execute(sql)
-
-        for row in cursor.fetchall():
+        for row in rows:
             user_id, name, total = row
             user_level = len(amo.REVIEWED_LEVELS) - 1
             for i, level in enumerate(amo.REVIEWED_LEVELS):
@@ -668,6 +766,150 @@ class ReviewerScore(amo.models.ModelBase):
         return scores
 
 
+def leaderboard_active():
+    return waffle.switch_is_active('reviewer-leaderboard-redis')
+
+
+class ReviewerLeaderboard(object):
+    """
+    Reviewer point totals kept in redis sorted sets, so ranks, the top N and
+    a reviewer's neighbours are O(log n) lookups instead of a GROUP BY over
+    all of `reviewer_scores`.
+
+    There is one set per day and one for all time, updated as points are
+    awarded. The rolling window used by the leaderboards is the union of the
+    day sets it covers, built on first use each day and then updated in
+    place by `add`. Staff and admins are left out when points are added;
+    `rebuild` (run from cron) catches group membership changes.
+    """
+    excluded_groups = ('Staff', 'Admins')
+    # The rolling windows, in days, kept up to date by `add`.
+    windows = (7,)
+    # Day sets are kept long enough for any window we build.
+    keep_days = 32
+
+    def __init__(self, redis=None):
+        self.redis = redis or redisutils.connections['master']
+        # AMO and the marketplace may share a redis.
+        self.prefix = 'editors:leaderboard:%s' % settings.WAFFLE_TABLE_SUFFIX
+
+    def _all_key(self):
+        return '%s:all' % self.prefix
+
+    def _day_key(self, day):
+        return '%s:day:%s' % (self.prefix, day.isoformat())
+
+    def _window_key(self, days, today):
+        return '%s:window:%s:%s' % (self.prefix, days, today.isoformat())
+
+    def _window(self, days):
+        """Return the key of the set for the past `days` days."""
+        if days is None:
+            return self._all_key()
+        today = datetime.date.today()
+        key = self._window_key(days, today)
+        if not self.redis.exists(key):
+            # Same range as `created >= today - days` in SQL.
+            self.redis.zunionstore(
+                key, [self._day_key(today - datetime.timedelta(days=i))
+                      for i in range(days + 1)])
+            # Windows `add` doesn't update are only good for a minute.
+            self.redis.expire(key, 60 * 60 * 24 if days in self.windows
+                                   else 60)
+        return key
+
+    def add(self, user, score):
+        if user.groups.filter(name__in=self.excluded_groups).exists():
+            return
+        today = datetime.date.today()
+        day_key = self._day_key(today)
+        pipe = self.redis.pipeline()
+        pipe.zincrby(day_key, user.id, score)
+        pipe.expire(day_key, self.keep_days * 60 * 60 * 24)
+        pipe.zincrby(self._all_key(), user.id, score)
+        pipe.execute()
+        # Windows already built today cover today too.
+        for days in self.windows:
+            key = self._window_key(days, today)
+            if self.redis.exists(key):
+                self.redis.zincrby(key, user.id, score)
+
+    def rank(self, user_id, days=None):
+        """1-based rank of the user, or 0 if they have no points."""
+        rank = self.redis.zrevrank(self._window(days), user_id)
+        return 0 if rank is None else rank + 1
+
+    def slice(self, start, end, days=None):
+        """Return [(user_id, total)] for ranks `start` to `end` (0-based,
+        inclusive)."""
+        return [(int(user_id), int(total)) for user_id, total in
+                self.redis.zrevrange(self._window(days), start, end,
+                                     withscores=True)]
+
+    def _names(self, user_ids):
+        return dict(UserProfile.objects.filter(id__in=user_ids)
+                                       .values_list('id', 'display_name'))
+
+    def _scores(self, rows, first_rank):
+        names = self._names([user_id for user_id, total in rows])
+        return [{'user_id': user_id, 'name': names.get(user_id),
+                 'rank': rank, 'total': total}
+                for rank, (user_id, total) in enumerate(rows, first_rank)]
+
+    def get_leaderboards(self, user, days=7):
+        """Same as `ReviewerScore.get_leaderboards`."""
+        user_rank = self.rank(user.id, days=days)
+        if not user_rank or user_rank <= 5:
+            rows, near = self.slice(0, 4, days=days), []
+        else:
+            rows = self.slice(0, 2, days=days)
+            near = self.slice(user_rank - 2, user_rank, days=days)
+        scores = self._scores(rows + near, 1)
+        # Ranks of the neighbours continue from the user's.
+        for i, score in enumerate(scores[len(rows):]):
+            score['rank'] = user_rank - 1 + i
+        return {'leader_top': scores[:len(rows)],
+                'leader_near': scores[len(rows):],
+                'user_rank': user_rank}
+
+    def all_users(self):
+        """Return [(user_id, name, total)] ordered by total, for all time."""
+        rows = self.slice(0, -1)
+        names = self._names([user_id for user_id, total in rows])
+        return [(user_id, names.get(user_id), total)
+                for user_id, total in rows]
+
+    def rebuild(self):
+        """Reload every set from `reviewer_scores`."""
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT `rs`.`user_id`, DATE(`rs`.`created`) AS `day`,
+                   SUM(`rs`.`score`)
+            FROM `reviewer_scores` AS `rs`
+            WHERE `rs`.`user_id` NOT IN (
+                SELECT DISTINCT `user_id`
+                FROM `groups_users` AS `gu`
+                JOIN `groups` ON `gu`.`group_id`=`groups`.`id`
+                WHERE `groups`.`name` IN ('Staff', 'Admins'))
+            GROUP BY `rs`.`user_id`, `day`""")
+
+        today = datetime.date.today()
+        first_day = today - datetime.timedelta(days=self.keep_days)
+        pipe = self.redis.pipeline()
+        pipe.delete(self._all_key())
+        for i in range(self.keep_days + 1):
+            pipe.delete(self._day_key(today - datetime.timedelta(days=i)))
+        for days in self.windows:
+            pipe.delete(self._window_key(days, today))
+        for user_id, day, total in cursor.fetchall():
+            pipe.zincrby(self._all_key(), user_id, int(total))
+            if day >= first_day:
+                pipe.zincrby(self._day_key(day), user_id, int(total))
+                pipe.expire(self._day_key(day),
+                            self.keep_days * 60 * 60 * 24)
+        pipe.execute()
+
+
 class EscalationQueue(amo.models.ModelBase):
     addon = models.ForeignKey(Addon)
 
@@ -689,3 +931,59 @@ class RereviewQueue(amo.models.ModelBase):
                     details={'comments': message})
         else:
             amo.log(event, addon, addon.current_version)
+
+
+def queue_table_active():
+    return waffle.switch_is_active('editors-queue-table')
+
+
+def _refresh_queue_entries(addon_id):
+    from editors import tasks
+    tasks.update_queue_entries.delay([addon_id])
+
+
+def update_queue_on_file_change(old_attr, new_attr, instance, sender, **kw):
+    created = not old_attr.get('id')
+    if kw.get('raw') or (not created and
+                         old_attr.get('status') == new_attr.get('status')):
+        return
+    if queue_table_active():
+        try:
+            _refresh_queue_entries(instance.version.addon_id)
+        except models.ObjectDoesNotExist:
+            pass
+
+
+def update_queue_on_file_delete(sender, instance, **kw):
+    if not kw.get('raw') and queue_table_active():
+        try:
+            _refresh_queue_entries(instance.version.addon_id)
+        except models.ObjectDoesNotExist:
+            pass
+
+
+def update_queue_on_version_change(sender, instance, **kw):
+    if not kw.get('raw') and queue_table_active():
+        _refresh_queue_entries(instance.addon_id)
+
+
+def update_queue_on_addon_change(old_attr, new_attr, instance, sender, **kw):
+    fields = ('status', 'disabled_by_user')
+    if kw.get('raw') or instance.type == amo.ADDON_WEBAPP:
+        return
+    if (any(old_attr.get(f) != new_attr.get(f) for f in fields) and
+        queue_table_active()):
+        _refresh_queue_entries(instance.pk)
+
+
+File.on_change(update_queue_on_file_change)
+Addon.on_change(update_queue_on_addon_change)
+models.signals.post_delete.connect(
+    update_queue_on_file_delete, sender=File,
+    dispatch_uid='editors_queue_file_delete')
+models.signals.post_save.connect(
+    update_queue_on_version_change, sender=Version,
+    dispatch_uid='editors_queue_version_save')
+models.signals.post_delete.connect(
+    update_queue_on_version_change, sender=Version,
+    dispatch_uid='editors_queue_version_delete')
@@ -5,7 +5,9 @@ import celery.task
 from celeryutils import task
 from hera.contrib.django_utils import flush_urls
 
+from amo.decorators import write
 from devhub.models import ActivityLog, CommentLog, VersionLog
+from editors.models import ReviewQueueEntry
 from versions.models import Version
 
 log = commonware.log.getLogger('z.task')
@@ -50,3 +52,12 @@ def add_versionlog(items, **kw):
                 vl.created = al.created
                 vl.save()
 
+
+@task
+@write
+def update_queue_entries(ids, **kw):
+    log.info('[%s@%s] Updating editor queue entries for add-ons: %s' %
+             (len(ids), update_queue_entries.rate_limit, ids[0]))
+
+    for id in ids:
+        ReviewQueueEntry.refresh(id)
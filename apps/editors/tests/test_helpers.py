@@ -2,6 +2,7 @@
 from datetime import datetime, timedelta
 
 from django.core import mail
+from django.core.cache import cache
 from django.core.files.storage import default_storage as storage
 from django.conf import settings
 
@@ -769,6 +770,25 @@ def test_send_email_autoescape():
     eq_(mail.outbox[0].body.count(s), len(ctx))
 
 
+class TestViewing(amo.tests.TestCase):
+
+    def test_claim(self):
+        eq_(helpers.claim_viewing(3615, 1), 1)
+        eq_(helpers.claim_viewing(3615, 2), 1)
+        eq_(helpers.claim_viewing(3615, 1), 1)
+
+    def test_claim_expired(self):
+        helpers.claim_viewing(3615, 1)
+        cache.delete(helpers.viewing_key(3615))
+        eq_(helpers.claim_viewing(3615, 2), 2)
+
+    def test_get_viewing(self):
+        helpers.claim_viewing(3615, 1)
+        helpers.claim_viewing(5299, 2)
+        eq_(helpers.get_viewing([3615, 5299, 1234]), {3615: 1, 5299: 2})
+        eq_(helpers.get_viewing([]), {})
+
+
 class TestCompareLink(amo.tests.TestCase):
     fixtures = ['base/addon_3615', 'base/platforms']
 
@@ -4,6 +4,7 @@ import time
 
 from django.core import mail
 
+import mock
 from nose.tools import eq_
 
 import amo
@@ -12,8 +13,10 @@ from addons.models import Addon
 from versions.models import Version, version_uploaded, ApplicationsVersions
 from files.models import Platform, File
 from applications.models import Application, AppVersion
-from editors.models import (EditorSubscription, RereviewQueue, ReviewerScore,
-                            send_notifications, ViewFastTrackQueue,
+from editors.models import (EditorSubscription, RereviewQueue,
+                            ReviewerLeaderboard, ReviewerScore,
+                            ReviewQueueEntry, send_notifications,
+                            ViewFastTrackQueue,
                             ViewFullReviewQueue, ViewPendingQueue,
                             ViewPreliminaryQueue)
 from users.models import UserProfile
@@ -272,6 +275,67 @@ class TestFastTrackQueue(TestQueue):
         eq_(self.query(), ['full'])
 
 
+class TestReviewQueueEntry(amo.tests.TestCase):
+
+    def setUp(self):
+        self.create_switch('editors-queue-table')
+
+    def queues(self, addon):
+        return sorted(ReviewQueueEntry.objects.filter(addon=addon)
+                                      .values_list('queue', flat=True))
+
+    def test_new_file(self):
+        addon = create_addon_file('Pending', '0.1', amo.STATUS_PUBLIC,
+                                  amo.STATUS_UNREVIEWED)['addon']
+        eq_(self.queues(addon), ['pending'])
+
+    def test_addon_status_change(self):
+        addon = create_addon_file('Nominated', '0.1', amo.STATUS_NOMINATED,
+                                  amo.STATUS_UNREVIEWED)['addon']
+        eq_(self.queues(addon), ['nominated'])
+        addon.update(status=amo.STATUS_DISABLED)
+        eq_(self.queues(addon), [])
+
+    def test_file_reviewed(self):
+        res = create_addon_file('Pending', '0.1', amo.STATUS_PUBLIC,
+                                amo.STATUS_UNREVIEWED)
+        res['file'].update(status=amo.STATUS_PUBLIC)
+        eq_(self.queues(res['addon']), [])
+
+    def test_count(self):
+        create_addon_file('Pending', '0.1', amo.STATUS_PUBLIC,
+                          amo.STATUS_UNREVIEWED)
+        create_addon_file('Old', '0.1', amo.STATUS_PUBLIC,
+                          amo.STATUS_UNREVIEWED)
+        ReviewQueueEntry.objects.filter(addon__name__localized_string='Old') \
+                        .update(waiting_since=datetime.datetime.now() -
+                                              datetime.timedelta(days=12))
+        eq_(ReviewQueueEntry.count('pending'), 2)
+        eq_(ReviewQueueEntry.count('pending', days_max=4), 1)
+        eq_(ReviewQueueEntry.count('pending', days_min=11), 1)
+        eq_(ReviewQueueEntry.waiting_days(['pending', 'prelim']),
+            {'pending': {0: 1, 12: 1}, 'prelim': {}})
+
+    def test_refresh_existing(self):
+        addon = create_addon_file('Pending', '0.1', amo.STATUS_PUBLIC,
+                                  amo.STATUS_UNREVIEWED)['addon']
+        old = datetime.datetime(2000, 1, 1)
+        ReviewQueueEntry.objects.filter(addon=addon).update(waiting_since=old)
+        ReviewQueueEntry.refresh(addon.pk)
+        ReviewQueueEntry.refresh(addon.pk)
+        entries = ReviewQueueEntry.objects.filter(addon=addon)
+        eq_(len(entries), 1)
+        assert entries[0].waiting_since > old
+
+    def test_switch_off(self):
+        self.create_switch('editors-queue-table', active=False)
+        addon = create_addon_file('Pending', '0.1', amo.STATUS_PUBLIC,
+                                  amo.STATUS_UNREVIEWED)['addon']
+        eq_(self.queues(addon), [])
+        ReviewQueueEntry.refresh(addon.pk)
+        eq_(self.queues(addon), ['pending'])
+
+
 class TestEditorSubscription(amo.tests.TestCase):
     fixtures = ['base/addon_3615', 'base/users']
 
@@ -334,6 +398,7 @@ class TestReviewerScore(amo.tests.TestCase):
 
     def setUp(self):
         self.create_switch(name='reviewer-incentive-points')
+        self.create_switch(name='reviewer-leaderboard-redis', active=False)
         self.addon = amo.tests.addon_factory(status=amo.STATUS_NOMINATED)
         self.user = UserProfile.objects.get(email='editor@mozilla.com')
 
@@ -555,3 +620,52 @@ class TestReviewerScore(amo.tests.TestCase):
             ReviewerScore.get_leaderboards(self.user)
         with self.assertNumQueries(1):
             ReviewerScore.get_breakdown(self.user)
+
+
+class TestReviewerLeaderboard(amo.tests.TestCase):
+    fixtures = ['base/users']
+
+    def setUp(self):
+        self.redis = mock.Mock()
+        self.redis.exists.return_value = True
+        self.board = ReviewerLeaderboard(redis=self.redis)
+        self.user = UserProfile.objects.get(email='editor@mozilla.com')
+        self.admin = UserProfile.objects.get(email='admin@mozilla.com')
+
+    def test_add(self):
+        self.board.add(self.user, 60)
+        pipe = self.redis.pipeline.return_value
+        eq_([c[0][1:] for c in pipe.zincrby.call_args_list],
+            [(self.user.id, 60), (self.user.id, 60)])
+        assert pipe.execute.called
+        # The 7 day window exists, so it's kept up to date as well.
+        eq_(self.redis.zincrby.call_args[0][1:], (self.user.id, 60))
+
+    def test_add_skips_staff(self):
+        self.board.add(self.admin, 60)
+        assert not self.redis.pipeline.called
+
+    def test_leaderboards_top(self):
+        self.redis.zrevrank.return_value = None
+        self.redis.zrevrange.return_value = [(str(self.admin.id), 120.0),
+                                             (str(self.user.id), 60.0)]
+        leaders = self.board.get_leaderboards(self.user)
+        eq_(leaders['user_rank'], 0)
+        eq_(leaders['leader_near'], [])
+        eq_([(l['rank'], l['user_id'], l['total'], l['name'])
+             for l in leaders['leader_top']],
+            [(1, self.admin.id, 120, self.admin.display_name),
+             (2, self.user.id, 60, self.user.display_name)])
+        eq_(self.redis.zrevrange.call_args[0][1:], (0, 4))
+
+    def test_leaderboards_near(self):
+        self.redis.zrevrank.return_value = 9
+        top = [(str(i), 100.0 - i) for i in range(3)]
+        near = [(str(self.admin.id), 50.0), (str(self.user.id), 40.0)]
+        self.redis.zrevrange.side_effect = [top, near]
+        leaders = self.board.get_leaderboards(self.user)
+        eq_(leaders['user_rank'], 10)
+        eq_([l['rank'] for l in leaders['leader_top']], [1, 2, 3])
+        eq_([(l['rank'], l['user_id']) for l in leaders['leader_near']],
+            [(9, self.admin.id), (10, self.user.id)])
+        eq_(self.redis.zrevrange.call_args[0][1:], (8, 10))
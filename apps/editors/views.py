@@ -6,7 +6,6 @@ import time
 
 from django import http
 from django.conf import settings
-from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.db.models import Q
 from django.shortcuts import redirect, get_object_or_404
@@ -27,10 +26,10 @@ from amo.urlresolvers import reverse
 from devhub.models import ActivityLog, CommentLog
 from editors import forms
 from editors.models import (AddonCannedResponse, EditorSubscription, EventLog,
-                            PerformanceGraph, ReviewerScore,
-                            ViewFastTrackQueue, ViewFullReviewQueue,
-                            ViewPendingQueue, ViewPreliminaryQueue)
-from editors.helpers import (ViewFastTrackQueueTable, ViewFullReviewQueueTable,
+                            PerformanceGraph, queue_table_active,
+                            REVIEW_QUEUES, ReviewerScore, ReviewQueueEntry)
+from editors.helpers import (claim_viewing, get_viewing,
+                             ViewFastTrackQueueTable, ViewFullReviewQueueTable,
                              ViewPendingQueueTable, ViewPreliminaryQueueTable)
 from reviews.forms import ReviewFlagFormSet
 from reviews.models import Review, ReviewFlag
@@ -132,15 +131,32 @@ def home(request):
     return jingo.render(request, 'editors/home.html', data)
 
 
+def _queue_table_progress(types):
+    """The `_editor_progress` buckets from one query on the queue table."""
+    buckets = {'new': (0, 4), 'med': (5, 10), 'old': (11, None),
+               'week': (0, 7)}
+    waiting = ReviewQueueEntry.waiting_days(types)
+    progress = dict((b, dict((t, 0) for t in types)) for b in buckets)
+    for t in types:
+        for days, total in waiting[t].items():
+            for b, (low, high) in buckets.items():
+                if days >= low and (high is None or days <= high):
+                    progress[b][t] += total
+    return progress
+
+
 def _editor_progress():
     """Return the progress (number of add-ons still unreviewed for a given
        period of time) and the percentage (out of all add-ons of that type)."""
 
     types = ['nominated', 'prelim', 'pending']
-    progress = {'new': queue_counts(types, days_max=4),
-                'med': queue_counts(types, days_min=5, days_max=10),
-                'old': queue_counts(types, days_min=11),
-                'week': queue_counts(types, days_max=7)}
+    if queue_table_active():
+        progress = _queue_table_progress(types)
+    else:
+        progress = {'new': queue_counts(types, days_max=4),
+                    'med': queue_counts(types, days_min=5, days_max=10),
+                    'old': queue_counts(types, days_min=11),
+                    'week': queue_counts(types, days_max=7)}
 
     # Return the percent of (p)rogress out of (t)otal.
     pct = lambda p, t: (p / float(t)) * 100 if p > 0 else 0
@@ -351,12 +367,18 @@ def _queue(request, TableObj, tab, qs=None):
 
 
 def queue_counts(type=None, **kw):
-    def construct_query(query_type, days_min=None, days_max=None):
+    use_table = queue_table_active()
+
+    def construct_query(name, days_min=None, days_max=None):
         def apply_query(query, *args):
             query = query.having(*args)
             return query
 
-        query = query_type.objects
+        if use_table:
+            return functools.partial(ReviewQueueEntry.count, name,
+                                     days_min=days_min, days_max=days_max)
+
+        query = REVIEW_QUEUES[name].objects
 
         if days_min:
             query = apply_query(query, 'waiting_time_days >=', days_min)
@@ -365,10 +387,10 @@ def queue_counts(type=None, **kw):
 
         return query.count
 
-    counts = {'pending': construct_query(ViewPendingQueue, **kw),
-              'nominated': construct_query(ViewFullReviewQueue, **kw),
-              'prelim': construct_query(ViewPreliminaryQueue, **kw),
-              'fast_track': construct_query(ViewFastTrackQueue, **kw),
+    counts = {'pending': construct_query('pending', **kw),
+              'nominated': construct_query('nominated', **kw),
+              'prelim': construct_query('prelim', **kw),
+              'fast_track': construct_query('fast_track', **kw),
               'moderated': (
                   Review.objects.exclude(addon__type=amo.ADDON_WEBAPP)
                                 .filter(reviewflag__isnull=False,
@@ -582,22 +604,13 @@ def review_viewing(request):
 
     addon_id = request.POST['addon_id']
     user_id = request.amo_user.id
-    current_name = ''
-    is_user = 0
-    key = '%s:review_viewing:%s' % (settings.CACHE_PREFIX, addon_id)
     interval = amo.EDITOR_VIEWING_INTERVAL
 
-    # Check who is viewing.
-    currently_viewing = cache.get(key)
-
-    # If nobody is viewing or current user is, set current user as viewing
-    if not currently_viewing or currently_viewing == user_id:
-        # We want to save it for twice as long as the ping interval,
-        # just to account for latency and the like.
-        cache.set(key, user_id, interval * 2)
-        currently_viewing = user_id
+    # Claim the add-on if nobody else is viewing it.
+    currently_viewing = claim_viewing(addon_id, user_id)
+    is_user = int(currently_viewing == user_id)
+    if is_user:
         current_name = request.amo_user.name
-        is_user = 1
     else:
         current_name = UserProfile.objects.get(pk=currently_viewing).name
 
@@ -614,19 +627,16 @@ def queue_viewing(request):
     if 'addon_ids' not in request.POST:
         return {}
 
-    viewing = {}
     user_id = request.amo_user.id
-
-    for addon_id in request.POST['addon_ids'].split(','):
-        addon_id = addon_id.strip()
-        key = '%s:review_viewing:%s' % (settings.CACHE_PREFIX, addon_id)
-        currently_viewing = cache.get(key)
-        if currently_viewing and currently_viewing != user_id:
-            viewing[addon_id] = (UserProfile.objects
-                                            .get(id=currently_viewing)
-                                            .display_name)
-
-    return viewing
+    addon_ids = [i.strip() for i in request.POST['addon_ids'].split(',')]
+    viewers = dict((addon_id, viewer) for addon_id, viewer
+                   in get_viewing(filter(None, addon_ids)).items()
+                   if viewer != user_id)
+    names = dict(UserProfile.objects.filter(id__in=set(viewers.values()))
+                                    .values_list('id', 'display_name'))
+
+    return dict((addon_id, names.get(viewer))
+                for addon_id, viewer in viewers.items())
 
 
 @json_view
@@ -10,6 +10,7 @@ from django.core.cache import cache
 import cronjobs
 import commonware.log
 
+from files import mirror
 from files.models import FileValidation
 
 log = commonware.log.getLogger('z.cron')
@@ -67,3 +68,12 @@ def cleanup_watermarked_file():
 
         if not os.listdir(folder):
             shutil.rmtree(folder)
+
+
+@cronjobs.register
+def sync_mirrors(dry_run=False):
+    """
+    Move disabled files to the guarded path and enabled ones out of it, and
+    keep the mirror staging path in line with the public files.
+    """
+    mirror.sync(dry_run=bool(dry_run))
@@ -0,0 +1,195 @@
+"""
+Keeps the public, guarded and mirror staging directories in sync with the
+files in the database.
+
+`plan_sync` compares what each directory should hold with what it holds in
+one pass: a single query for the files and one directory listing per add-on.
+`apply_sync` then runs the moves, copies and deletes that fix the
+differences in parallel. Anything that can't be fixed, such as files that
+are missing everywhere or that no File knows of, is reported as drift.
+"""
+import collections
+import logging
+import os
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+from django.conf import settings
+from django.core.files.storage import default_storage as storage
+from django.utils.encoding import smart_str
+
+from django_statsd.clients import statsd
+
+import amo
+from amo.storage_utils import copy_stored_file, move_stored_file
+from files.models import File
+
+log = logging.getLogger('z.files.mirror')
+
+Action = collections.namedtuple('Action', 'kind src dest')
+
+
+def scan(root):
+    """The set of (addon id, filename) pairs of the files under `root`."""
+    found = set()
+    if not storage.exists(root):
+        return found
+    for dirname in storage.listdir(root)[0]:
+        try:
+            addon = int(dirname)
+        except ValueError:
+            continue
+        for filename in storage.listdir(os.path.join(root, dirname))[1]:
+            found.add((addon, smart_str(filename)))
+    return found
+
+
+def expected_files():
+    """
+    Returns the sets of (addon id, filename) pairs that should be public,
+    guarded and on the mirrors.
+    """
+    public, guarded, mirrored = set(), set(), set()
+    qs = (File.uncached.exclude(filename='')
+          .values_list('filename', 'status', 'version__addon',
+                       'version__addon__status',
+                       'version__addon__disabled_by_user',
+                       'version__addon__premium_type'))
+    for filename, status, addon, addon_status, disabled, premium in qs:
+        key = (addon, smart_str(filename))
+        if (disabled or amo.STATUS_DISABLED in (status, addon_status)):
+            guarded.add(key)
+            continue
+        public.add(key)
+        if (status in amo.MIRROR_STATUSES and
+            addon_status in amo.MIRROR_STATUSES and
+            premium not in amo.ADDON_PREMIUMS):
+            mirrored.add(key)
+    return public, guarded, mirrored
+
+
+def path(root, key):
+    """The path of the (addon id, filename) pair `key` under `root`."""
+    return os.path.join(root, str(key[0]), key[1])
+
+
+def plan_sync():
+    """
+    Returns a list of the Actions that bring the file directories in line
+    with the database, and a dict of how many files of each kind of drift
+    were found.
+    """
+    public, guarded, mirrored = expected_files()
+    on_public = scan(settings.ADDONS_PATH)
+    on_guarded = scan(settings.GUARDED_ADDONS_PATH)
+    on_mirror = scan(settings.MIRROR_STAGE_PATH)
+
+    actions = []
+    # Disabled files that are still public, and the other way round.
+    hide = guarded & on_public
+    unhide = (public & on_guarded) - on_public
+    for key in sorted(hide):
+        actions.append(Action('move', path(settings.ADDONS_PATH, key),
+                              path(settings.GUARDED_ADDONS_PATH, key)))
+    for key in sorted(unhide):
+        actions.append(Action('move', path(settings.GUARDED_ADDONS_PATH, key),
+                              path(settings.ADDONS_PATH, key)))
+
+    # Once moved, the public files are copied to the mirrors and the
+    # disabled ones taken off them.
+    for key in sorted((mirrored & (on_public | unhide)) - on_mirror):
+        actions.append(Action('copy', path(settings.ADDONS_PATH, key),
+                              path(settings.MIRROR_STAGE_PATH, key)))
+    for key in sorted(guarded & on_mirror):
+        actions.append(Action('delete', path(settings.MIRROR_STAGE_PATH, key),
+                              None))
+
+    drift = {
+        'hidden': len(hide),
+        'unhidden': len(unhide),
+        'missing': len((public | guarded) - on_public - on_guarded),
+        'orphaned': len((on_public | on_guarded) - public - guarded),
+        'duplicated': len(public & on_public & on_guarded),
+        'unmirrored': len((mirrored & on_public) - on_mirror),
+        'unexpected_mirror': len(on_mirror - mirrored - guarded),
+    }
+    return actions, drift
+
+
+class _Throttle(object):
+    """Lets at most `rate` callers through `wait` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.next = time.time()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.time()
+            delay = self.next - now
+            self.next = max(self.next, now) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _apply(action):
+    try:
+        if action.kind == 'move':
+            log.info('Moving file: %s => %s' % (action.src, action.dest))
+            move_stored_file(action.src, action.dest)
+        elif action.kind == 'copy':
+            log.info('Mirroring file: %s => %s' % (action.src, action.dest))
+            copy_stored_file(action.src, action.dest)
+        elif action.kind == 'delete':
+            log.info('Unmirroring file: %s' % action.src)
+            storage.delete(action.src)
+        return True
+    except Exception:
+        log.error('Could not %s file: %s' % (action.kind, action.src),
+                  exc_info=True)
+        return False
+
+
+def apply_sync(actions, workers=None, rate=None):
+    """
+    Applies `actions` with `workers` threads, at most `rate` per second.
+    Moves go first since copies to the mirrors may depend on them.
+
+    Returns a tuple of the number of actions done and failed.
+    """
+    workers = workers or settings.MIRROR_SYNC_WORKERS
+    throttle = _Throttle(settings.MIRROR_SYNC_RATE if rate is None else rate)
+
+    def run(action):
+        throttle.wait()
+        return _apply(action)
+
+    moves = [a for a in actions if a.kind == 'move']
+    others = [a for a in actions if a.kind != 'move']
+    results = []
+    pool = ThreadPool(workers)
+    try:
+        for phase in (moves, others):
+            results.extend(pool.map(run, phase))
+    finally:
+        pool.close()
+        pool.join()
+    done = results.count(True)
+    return done, len(results) - done
+
+
+def sync(dry_run=False):
+    """Plans and applies the sync, reporting the drift found."""
+    actions, drift = plan_sync()
+    for kind, count in sorted(drift.items()):
+        statsd.gauge('files.mirror.drift.%s' % kind, count)
+    log.info('File drift: %s' % ', '.join('%s %s' % (count, kind)
+                                          for kind, count in
+                                          sorted(drift.items())))
+    if dry_run or not actions:
+        return drift
+    done, failed = apply_sync(actions)
+    log.info('Applied %s file actions, %s failed.' % (done, failed))
+    return drift
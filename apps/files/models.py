@@ -6,7 +6,6 @@ import posixpath
 import re
 import unicodedata
 import uuid
-import shutil
 import stat
 import time
 import zipfile
@@ -31,7 +30,7 @@ from amo.urlresolvers import reverse
 from applications.models import Application, AppVersion
 from apps.amo.utils import memoize
 import devhub.signals
-from files.utils import RDF, SafeUnzip
+from files.utils import RDF, rewrite_zip, SafeUnzip, stream_zip
 from versions.compare import version_int as vint
 
 log = commonware.log.getLogger('z.files')
@@ -450,11 +449,16 @@ class File(amo.models.OnChangeMixin, amo.models.ModelBase):
         if not os.path.exists(directory):
             os.makedirs(directory)
 
-        shutil.copyfile(self.file_path, dest)
-        outzip = SafeUnzip(dest, mode='a')
-        outzip.is_valid()
-        outzip.zip.writestr('install.rdf', str(data))
-        outzip.close()
+        with open(dest, 'wb') as fp:
+            rewrite_zip(self.file_path, fp, {'install.rdf': str(data)})
+
+    def watermark_stream(self, user):
+        """
+        Returns an iterator over the chunks of the addon watermarked for the
+        user, without writing it anywhere.
+        """
+        data = self.watermark_install_rdf(user)
+        return stream_zip(self.file_path, {'install.rdf': str(data)})
 
     def watermark(self, user):
         """
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import default_storage as storage
+
+import mock
+from nose.tools import eq_
+
+import amo
+import amo.tests
+from addons.models import Addon
+from files import mirror
+from files.models import File, Platform
+from versions.models import Version
+
+
+class TestMirrorSync(amo.tests.TestCase):
+
+    def setUp(self):
+        for name in ('ADDONS_PATH', 'GUARDED_ADDONS_PATH',
+                     'MIRROR_STAGE_PATH'):
+            root = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, root)
+            patcher = mock.patch.object(settings, name, root)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.addon = Addon.objects.create(type=amo.ADDON_EXTENSION,
+                                          status=amo.STATUS_PUBLIC)
+        version = Version.objects.create(addon=self.addon)
+        platform = Platform.objects.create(id=amo.PLATFORM_ALL.id)
+        self.public = File.objects.create(version=version, filename='a.xpi',
+                                          platform=platform,
+                                          status=amo.STATUS_PUBLIC)
+        self.disabled = File.objects.create(version=version, filename='b.xpi',
+                                            platform=platform,
+                                            status=amo.STATUS_PUBLIC)
+        # Skip the signal handlers, they'd move the file themselves.
+        File.objects.filter(pk=self.disabled.pk).update(
+            status=amo.STATUS_DISABLED)
+
+    def touch(self, path):
+        with storage.open(path, 'w') as fp:
+            fp.write('xpi')
+
+    def test_in_sync(self):
+        self.touch(self.public.file_path)
+        self.touch(self.public.mirror_file_path)
+        self.touch(self.disabled.guarded_file_path)
+        actions, drift = mirror.plan_sync()
+        eq_(actions, [])
+        eq_(sum(drift.values()), 0)
+
+    def test_hide(self):
+        self.touch(self.public.file_path)
+        self.touch(self.public.mirror_file_path)
+        self.touch(self.disabled.file_path)
+        self.touch(self.disabled.mirror_file_path)
+        drift = mirror.sync()
+        eq_(drift['hidden'], 1)
+        assert not storage.exists(self.disabled.file_path)
+        assert storage.exists(self.disabled.guarded_file_path)
+        assert not storage.exists(self.disabled.mirror_file_path)
+        assert storage.exists(self.public.file_path)
+
+    def test_unhide(self):
+        self.touch(self.public.guarded_file_path)
+        self.touch(self.disabled.guarded_file_path)
+        drift = mirror.sync()
+        eq_(drift['unhidden'], 1)
+        assert storage.exists(self.public.file_path)
+        assert storage.exists(self.public.mirror_file_path)
+        assert not storage.exists(self.public.guarded_file_path)
+        assert storage.exists(self.disabled.guarded_file_path)
+
+    def test_premium_not_mirrored(self):
+        self.addon.update(premium_type=amo.ADDON_PREMIUM)
+        self.touch(self.public.file_path)
+        self.touch(self.disabled.guarded_file_path)
+        eq_(mirror.plan_sync()[0], [])
+
+    def test_drift(self):
+        self.touch(os.path.join(settings.ADDONS_PATH, str(self.addon.pk),
+                                'orphan.xpi'))
+        actions, drift = mirror.plan_sync()
+        eq_(actions, [])
+        eq_(drift['missing'], 2)
+        eq_(drift['orphaned'], 1)
+
+    def test_dry_run(self):
+        self.touch(self.disabled.file_path)
+        eq_(mirror.sync(dry_run=True)['hidden'], 1)
+        assert storage.exists(self.disabled.file_path)
+
+    @mock.patch('files.mirror.move_stored_file')
+    def test_failures_counted(self, move_stored_file):
+        move_stored_file.side_effect = IOError
+        self.touch(self.disabled.file_path)
+        eq_(mirror.apply_sync(mirror.plan_sync()[0], workers=2, rate=0),
+            (0, 1))
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from cStringIO import StringIO
 from datetime import datetime
 import hashlib
 import json
@@ -32,7 +33,8 @@ from files.cron import cleanup_watermarked_file
 from files.models import File, FileUpload, FileValidation, Platform, nfd_str
 from files.helpers import copyfileobj
 from files.utils import parse_addon, parse_xpi, check_rdf, JetpackUpgrader
-from files.utils import SafeUnzip, RDF
+from files.utils import (package_revision, rewrite_zip, SafeUnzip, RDF,
+                         stream_zip)
 from users.models import UserProfile
 from versions.models import Version
 
@@ -884,6 +886,78 @@ class TestZip(amo.tests.TestCase, amo.tests.AMOPaths):
         finally:
             rm_local_tmp_dir(dest)
 
+    def test_read_member(self):
+        zip = SafeUnzip(self.xpi_path('firefm'))
+        zip.is_valid()
+        assert zip.read_member('install.rdf').startswith('<?xml')
+
+    def test_read_missing_member(self):
+        zip = SafeUnzip(self.xpi_path('firefm'))
+        zip.is_valid()
+        with self.assertRaises(KeyError):
+            zip.read_member('nope.rdf')
+
+    def test_read_member_wrong_size(self):
+        zip = SafeUnzip(self.xpi_path('firefm'))
+        zip.is_valid()
+        zip.members['install.rdf'].file_size -= 1
+        with self.assertRaises(forms.ValidationError):
+            zip.read_member('install.rdf')
+
+    def test_rewrite_zip(self):
+        dest = StringIO()
+        rewrite_zip(self.xpi_path('firefm'), dest,
+                    {'icon.png': None, 'META-INF/ids.json': '{}'})
+        original = zipfile.ZipFile(self.xpi_path('firefm'))
+        rewritten = zipfile.ZipFile(StringIO(dest.getvalue()))
+        eq_(rewritten.testzip(), None)
+        eq_(rewritten.namelist()[-1], 'META-INF/ids.json')
+        eq_(rewritten.read('META-INF/ids.json'), '{}')
+        assert 'icon.png' not in rewritten.namelist()
+        eq_(rewritten.read('install.rdf'), original.read('install.rdf'))
+
+    def test_rewrite_zip_duplicates(self):
+        source = StringIO()
+        with zipfile.ZipFile(source, 'w') as z:
+            z.writestr('install.rdf', 'original')
+            z.writestr('chrome.manifest', 'manifest')
+            z.writestr('install.rdf', 'duplicate')
+        dest = StringIO()
+        rewrite_zip(StringIO(source.getvalue()), dest,
+                    {'install.rdf': 'watermarked'})
+        rewritten = zipfile.ZipFile(StringIO(dest.getvalue()))
+        eq_(rewritten.namelist(), ['install.rdf', 'chrome.manifest'])
+        eq_(rewritten.read('install.rdf'), 'watermarked')
+
+    def test_stream_zip(self):
+        chunks = list(stream_zip(self.xpi_path('firefm'), {}, chunk_size=1024))
+        assert len(chunks) > 1
+        rewritten = zipfile.ZipFile(StringIO(''.join(chunks)))
+        eq_(rewritten.namelist(),
+            zipfile.ZipFile(self.xpi_path('firefm')).namelist())
+
+    def test_glob(self):
+        zip = SafeUnzip(self.xpi_path('dictionary-test'))
+        zip.is_valid()
+        eq_(zip.glob('dictionaries/*.dic'), ['dictionaries/ar.dic'])
+        eq_(zip.glob('*.dic'), [])
+
+
+class TestPackageRevision(amo.tests.TestCase):
+
+    def package(self, source):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        with open(os.path.join(root, '__init__.py'), 'w') as fp:
+            fp.write(source)
+        return mock.Mock(__file__=os.path.join(root, '__init__.pyc'))
+
+    def test_revision(self):
+        eq_(package_revision(self.package('a = 1')),
+            package_revision(self.package('a = 1')))
+        assert (package_revision(self.package('a = 1')) !=
+                package_revision(self.package('a = 2')))
+
 
 class TestParseSearch(amo.tests.TestCase, amo.tests.AMOPaths):
 
@@ -936,6 +1010,14 @@ def test_parse_xpi():
     eq_(rdf['name'], 'Fire.fm')
 
 
+@mock.patch('files.utils.extract_xpi')
+def test_parse_xpi_no_extraction(extract_mock):
+    firefm = os.path.join(settings.ROOT,
+                          'apps/files/fixtures/files/firefm.xpi')
+    eq_(parse_xpi(open(firefm))['name'], 'Fire.fm')
+    assert not extract_mock.called
+
+
 class TestCheckJetpackVersion(amo.tests.TestCase):
     fixtures = ['base/addon_3615']
 
@@ -1077,6 +1159,25 @@ class TestWatermark(amo.tests.TestCase, amo.tests.AMOPaths):
         encoded = urllib.quote_plus(self.user.email)
         assert encoded in self.get_updateURL(self.get_rdf(self.dest))
 
+    def test_write_watermarked_replaces(self):
+        data = self.file.watermark_install_rdf(self.user)
+        self.file.write_watermarked_addon(self.dest, data)
+        original = zipfile.ZipFile(self.file.file_path)
+        watermarked = zipfile.ZipFile(self.dest)
+        eq_(watermarked.namelist(), original.namelist())
+        for name in original.namelist():
+            if name != 'install.rdf':
+                eq_(watermarked.read(name), original.read(name))
+
+    def test_watermark_stream(self):
+        data = ''.join(self.file.watermark_stream(self.user))
+        unzip = SafeUnzip(StringIO(data))
+        unzip.is_valid()
+        rdf = RDF(unzip.extract_path('install.rdf'))
+        encoded = urllib.quote_plus(self.user.email)
+        assert encoded in self.get_updateURL(rdf)
+        assert not os.path.exists(self.dest)
+
     def test_watermark(self):
         tmp = self.file.watermark(self.user)
         encoded = urllib.quote_plus(self.user.email)
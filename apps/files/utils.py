@@ -1,13 +1,16 @@
 import collections
+import fnmatch
 import glob
 import hashlib
 import json
 import logging
 import os
+import posixpath
 import re
 import shutil
 import stat
 import StringIO
+import struct
 import tempfile
 import zipfile
 from datetime import datetime
@@ -83,10 +86,19 @@ class Extractor(object):
     App = collections.namedtuple('App', 'appdata id min max')
     manifest = u'urn:mozilla:install-manifest'
 
-    def __init__(self, path):
+    def __init__(self, path, archive=None):
+        """
+        `path` is the directory the add-on was extracted to. If `archive` is
+        given, the install.rdf and the files are read from that SafeUnzip
+        instead, nothing needs to be extracted and `path` can be None.
+        """
         self.path = path
-        self.rdf = rdflib.Graph().parse(open(os.path.join(path,
-                                                          'install.rdf')))
+        self.archive = archive
+        if archive:
+            rdf = StringIO.StringIO(archive.read_member('install.rdf'))
+        else:
+            rdf = open(os.path.join(path, 'install.rdf'))
+        self.rdf = rdflib.Graph().parse(rdf)
         self.find_root()
         self.data = {
             'guid': self.find('id'),
@@ -101,8 +113,8 @@ class Extractor(object):
         }
 
     @classmethod
-    def parse(cls, install_rdf):
-        return cls(install_rdf).data
+    def parse(cls, install_rdf, archive=None):
+        return cls(install_rdf, archive=archive).data
 
     def find_type(self):
         # If the extension declares a type that we know about, use
@@ -113,13 +125,18 @@ class Extractor(object):
             return self.TYPES[declared_type]
 
         # Look for Complete Themes.
-        if self.path.endswith('.jar') or self.find('internalName'):
+        if ((self.path and self.path.endswith('.jar')) or
+                self.find('internalName')):
             return amo.ADDON_THEME
 
         # Look for dictionaries.
-        dic = os.path.join(self.path, 'dictionaries')
-        if os.path.exists(dic) and glob.glob('%s/*.dic' % dic):
-            return amo.ADDON_DICT
+        if self.archive:
+            if self.archive.glob('dictionaries/*.dic'):
+                return amo.ADDON_DICT
+        else:
+            dic = os.path.join(self.path, 'dictionaries')
+            if os.path.exists(dic) and glob.glob('%s/*.dic' % dic):
+                return amo.ADDON_DICT
 
         # Consult <em:type>.
         return self.TYPES.get(declared_type, amo.ADDON_EXTENSION)
@@ -276,6 +293,7 @@ class SafeUnzip(object):
     def __init__(self, source, mode='r'):
         self.source = source
         self.info = None
+        self.members = None
         self.mode = mode
 
     def is_valid(self, fatal=True):
@@ -306,6 +324,7 @@ class SafeUnzip(object):
                 raise forms.ValidationError(_('Invalid archive.'))
 
         self.info = _info
+        self.members = dict((info.filename, info) for info in _info)
         self.zip = zip
         return True
 
@@ -340,7 +359,43 @@ class SafeUnzip(object):
 
     def extract_path(self, path):
         """Given a path, extracts the content at path."""
-        return self.zip.read(path)
+        return self.read_member(path)
+
+    def glob(self, pattern):
+        """
+        Names of the members matching `pattern`, like glob.glob() would on
+        the extracted archive.
+        """
+        dirname, basename = posixpath.split(pattern)
+        return sorted(name for name in self.members
+                      if posixpath.dirname(name) == dirname
+                      and fnmatch.fnmatch(posixpath.basename(name), basename))
+
+    def open_member(self, path):
+        """
+        Returns a file-like object to stream the member at `path` from the
+        archive, without extracting it anywhere.
+        """
+        if path not in self.members:
+            raise KeyError('There is no item named %r in the archive' % path)
+        return self.zip.open(self.members[path])
+
+    def read_member(self, path):
+        """
+        Reads the member at `path` straight from the archive, checking that
+        its size is the one its header claims.
+        """
+        info = self.members.get(path)
+        if info is None:
+            raise KeyError('There is no item named %r in the archive' % path)
+        # Never read more than the header says, plus a byte to tell if the
+        # member lied about its size.
+        data = self.open_member(path).read(info.file_size + 1)
+        if len(data) != info.file_size:
+            log.error('Extraction error, uncompressed size: %s, %s not %s'
+                      % (self.source, len(data), info.file_size))
+            raise forms.ValidationError(_('Invalid archive.'))
+        return data
 
     def extract_info_to_dest(self, info, dest):
         """Extracts the given info to a directory and checks the file size."""
@@ -363,9 +418,118 @@ class SafeUnzip(object):
         self.zip.close()
 
 
-def extract_zip(source, remove=False, fatal=True):
-    """Extracts the zip file. If remove is given, removes the source file."""
-    tempdir = tempfile.mkdtemp()
+class _ZipWriter(object):
+    """
+    Lets zipfile write an archive to `fp`, or to a buffer that the caller
+    empties with `read`, without ever seeking back in it.
+    """
+
+    def __init__(self, fp=None):
+        self.fp = fp
+        self.position = 0
+        self.pending = []
+
+    def write(self, data):
+        self.position += len(data)
+        if self.fp is None:
+            self.pending.append(data)
+        else:
+            self.fp.write(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        if self.fp is not None:
+            self.fp.flush()
+
+    def read(self):
+        data = ''.join(self.pending)
+        self.pending = []
+        return data
+
+
+def _rewrite_zip(source, out, entries, chunk_size):
+    """
+    Writes the archive `source` to the _ZipWriter `out`, with the members
+    named in `entries` replaced by their data, or dropped if it's None.
+    Entries that aren't in `source` are added at the end. The other members
+    are copied through still compressed. Yields after every chunk written.
+    """
+    inzip = SafeUnzip(source)
+    inzip.is_valid()
+    entries = dict(entries)
+    # Any later member with a replaced name would be read instead of the
+    # replacement, so they are all dropped.
+    replaced = set()
+    outzip = zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED)
+    try:
+        fp = inzip.zip.fp
+        for info in inzip.info:
+            if info.filename in replaced:
+                continue
+            if info.filename in entries:
+                replaced.add(info.filename)
+                data = entries.pop(info.filename)
+                if data is not None:
+                    outzip.writestr(info, data)
+                    yield
+                continue
+            # Skip the local header, its sizes may be in a data descriptor.
+            fp.seek(info.header_offset)
+            header = struct.unpack(zipfile.structFileHeader,
+                                   fp.read(zipfile.sizeFileHeader))
+            fp.seek(header[zipfile._FH_FILENAME_LENGTH] +
+                    header[zipfile._FH_EXTRA_FIELD_LENGTH], os.SEEK_CUR)
+            info.flag_bits &= ~0x08
+            info.header_offset = out.tell()
+            out.write(info.FileHeader())
+            remaining = info.compress_size
+            while remaining > 0:
+                data = fp.read(min(chunk_size, remaining))
+                if not data:
+                    raise forms.ValidationError(_('Invalid archive.'))
+                out.write(data)
+                remaining -= len(data)
+                yield
+            outzip.filelist.append(info)
+            outzip.NameToInfo[info.filename] = info
+        for name, data in sorted(entries.items()):
+            if data is not None:
+                outzip.writestr(name, data)
+                yield
+    finally:
+        outzip.close()
+        inzip.close()
+    yield
+
+
+def rewrite_zip(source, dest, entries, chunk_size=2 ** 16):
+    """
+    Writes the archive `source` to the file object `dest`, replacing, adding
+    or, for None, dropping the members in the `entries` dict of names to
+    data. Only those members are compressed again.
+    """
+    for step in _rewrite_zip(source, _ZipWriter(dest), entries, chunk_size):
+        pass
+
+
+def stream_zip(source, entries, chunk_size=2 ** 16):
+    """Like rewrite_zip, but yields the new archive in chunks."""
+    out = _ZipWriter()
+    for step in _rewrite_zip(source, out, entries, chunk_size):
+        data = out.read()
+        if data:
+            yield data
+
+
+def extract_zip(source, remove=False, fatal=True, dest_dir=None):
+    """
+    Extracts the zip file. If remove is given, removes the source file.
+    The files are extracted to a new temporary directory in `dest_dir`, or
+    in the default temporary directory if it isn't given.
+    """
+    tempdir = tempfile.mkdtemp(dir=dest_dir)
 
     zip = SafeUnzip(source)
     try:
@@ -382,13 +546,15 @@ def extract_zip(source, remove=False, fatal=True):
 
 def copy_over(source, dest):
     """
-    Copies from the source to the destination, removing the destination
-    if it exists and is a directory.
+    Moves the source to the destination, removing the destination if it
+    exists and is a directory. On the same filesystem this is a rename, so
+    nothing gets copied.
     """
     if os.path.exists(dest) and os.path.isdir(dest):
         shutil.rmtree(dest)
-    shutil.copytree(source, dest)
-    shutil.rmtree(source)
+    elif os.path.exists(dest):
+        os.remove(dest)
+    shutil.move(source, dest)
 
 
 def extract_xpi(xpi, path, expand=False):
@@ -402,7 +568,11 @@ def extract_xpi(xpi, path, expand=False):
     it will create a folder, foo.jar, with an image inside.
     """
     expand_whitelist = ['.jar', '.xpi']
-    tempdir = extract_zip(xpi)
+    # Extract next to the destination so moving it into place is a rename.
+    parent = os.path.dirname(os.path.normpath(path))
+    if parent and not os.path.exists(parent):
+        os.makedirs(parent)
+    tempdir = extract_zip(xpi, dest_dir=parent or None)
 
     if expand:
         for x in xrange(0, 10):
@@ -412,7 +582,8 @@ def extract_xpi(xpi, path, expand=False):
                     if os.path.splitext(name)[1] in expand_whitelist:
                         src = os.path.join(root, name)
                         if not os.path.isdir(src):
-                            dest = extract_zip(src, remove=True, fatal=False)
+                            dest = extract_zip(src, remove=True, fatal=False,
+                                               dest_dir=root)
                             if dest:
                                 copy_over(dest, src)
                                 flag = True
@@ -423,13 +594,13 @@ def extract_xpi(xpi, path, expand=False):
 
 
 def parse_xpi(xpi, addon=None):
-    """Extract and parse an XPI."""
-    # Extract to /tmp
-    path = tempfile.mkdtemp()
+    """Parse an XPI, reading what's needed straight from the archive."""
+    archive = None
     try:
         xpi = get_file(xpi)
-        extract_xpi(xpi, path)
-        rdf = Extractor.parse(path)
+        archive = SafeUnzip(xpi)
+        archive.is_valid()
+        rdf = Extractor.parse(None, archive=archive)
     except forms.ValidationError:
         raise
     except IOError as e:
@@ -443,7 +614,8 @@ def parse_xpi(xpi, addon=None):
         log.error('XPI parse error', exc_info=True)
         raise forms.ValidationError(_('Could not parse install.rdf.'))
     finally:
-        rm_local_tmp_dir(path)
+        if archive and archive.info is not None:
+            archive.close()
 
     return check_rdf(rdf, addon)
 
@@ -507,6 +679,66 @@ def get_sha256(filename, **kw):
     return _get_hash(filename, hash=hashlib.sha256, **kw)
 
 
+_revisions = {}
+
+
+def package_revision(module):
+    """
+    A digest of the python source of the package `module`, which changes
+    with every revision of it that gets installed, pinned by git sha or not.
+    """
+    root = os.path.dirname(os.path.abspath(module.__file__))
+    if root not in _revisions:
+        hash_ = hashlib.sha1()
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.endswith('.py'):
+                    path = os.path.join(dirpath, name)
+                    hash_.update(path[len(root):])
+                    with open(path, 'rb') as fp:
+                        hash_.update(fp.read())
+        _revisions[root] = hash_.hexdigest()
+    return _revisions[root]
+
+
+def validation_cache_key(file_path, *args):
+    """
+    The key of the validation of `file_path` with `args`, which should
+    hold anything that may change the result, such as the validator version
+    and its options. The file is identified by the sha256 of its contents,
+    read locally or from storage, so identical uploads share a key.
+    """
+    if os.path.exists(file_path):
+        fp = open(file_path, 'rb')
+    else:
+        fp = storage.open(file_path)
+    hash_ = hashlib.sha256()
+    with fp:
+        for chunk in iter(lambda: fp.read(2 ** 20), ''):
+            hash_.update(chunk)
+    args = hashlib.md5(json.dumps(args, sort_keys=True)).hexdigest()
+    return 'files:validation:%s:%s' % (hash_.hexdigest(), args)
+
+
+def cached_validation(file_path, validate, *args):
+    """
+    Returns the validation of `file_path`, calling `validate()` to get it if
+    the same file wasn't already validated with the same `args`.
+    """
+    timeout = settings.VALIDATION_CACHE_TIMEOUT
+    if not timeout or not file_path:
+        return validate()
+    key = validation_cache_key(file_path, *args)
+    result = cache.get(key)
+    if result is None:
+        result = validate()
+        cache.set(key, result, timeout)
+    else:
+        log.info('Using the cached validation of %s' % file_path)
+    return result
+
+
 def find_jetpacks(minver, maxver, from_builder_only=False):
     """
     Find all jetpack files that aren't disabled.
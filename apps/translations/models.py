@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.db import models, connection
 from django.utils import encoding
 
@@ -159,3 +160,25 @@ def delete_translation(obj, fieldname):
     obj.update(**{field.name: None})
     if trans:
         Translation.objects.filter(id=trans.id).delete()
+
+
+def trans_cache_key(id, locale):
+    """Cache key of a translation used by `transformer.get_trans`.
+
+    `locale` is None for the "any locale" fallback of fields that don't
+    require one.
+    """
+    return 'translations:%s:%s' % (id,
+                                   '*' if locale is None else locale.lower())
+
+
+def invalidate_trans_cache(sender, instance, **kw):
+    if isinstance(instance, Translation) and instance.id is not None:
+        cache.delete_many([trans_cache_key(instance.id, instance.locale),
+                           trans_cache_key(instance.id, None)])
+
+
+models.signals.post_save.connect(invalidate_trans_cache,
+                                 dispatch_uid='translations_cache_save')
+models.signals.post_delete.connect(invalidate_trans_cache,
+                                   dispatch_uid='translations_cache_delete')
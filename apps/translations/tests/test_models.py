@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from django.conf import settings
+from django.core.cache import cache
 from django import test
 from django.utils import translation
 from django.utils.functional import lazy
@@ -10,7 +11,7 @@ from test_utils import ExtraAppTestCase, trans_eq
 
 from testapp.models import TranslatedModel, UntranslatedModel, FancyModel
 from translations.models import (Translation, PurifiedTranslation,
-                                 TranslationSequence)
+                                 TranslationSequence, trans_cache_key)
 from translations import widgets
 from translations.query import order_by_translation
 
@@ -254,6 +255,17 @@ class TranslationTestCase(ExtraAppTestCase):
 
         del TranslatedModel.get_fallback
 
+    def test_empty_fallback_locale(self):
+        field = TranslatedModel._meta.get_field('default_locale')
+        TranslatedModel.get_fallback = classmethod(lambda cls: field)
+        self.addCleanup(delattr, TranslatedModel, 'get_fallback')
+        TranslatedModel.objects.filter(id=4).update(default_locale='')
+
+        # An empty default locale matches no translation, not any of them.
+        translation.activate('fr')
+        o = TranslatedModel.objects.no_cache().get(id=4)
+        eq_(o.name, None)
+
     def test_new_purified_field(self):
         # This is not a full test of the html sanitizing.  We expect the
         # underlying bleach library to have full tests.
@@ -347,6 +359,39 @@ class TranslationTestCase(ExtraAppTestCase):
         eq_(obj.no_locale.locale, 'fr')
 
 
+class CachedTranslationTestCase(TranslationTestCase):
+    """Run the translation tests again through the cached transformer."""
+
+    def setUp(self):
+        super(CachedTranslationTestCase, self).setUp()
+        self.cache_timeout = settings.TRANSLATIONS_CACHE_TIMEOUT
+        settings.TRANSLATIONS_CACHE_TIMEOUT = 60
+        cache.clear()
+
+    def tearDown(self):
+        super(CachedTranslationTestCase, self).tearDown()
+        settings.TRANSLATIONS_CACHE_TIMEOUT = self.cache_timeout
+
+    def test_served_from_cache(self):
+        o = TranslatedModel.objects.no_cache().get(id=1)
+        trans_eq(o.name, 'some name', 'en-US')
+        assert cache.get(trans_cache_key(o.name_id, 'en-us'))
+
+        # A queryset update skips the signals, so the cached value sticks.
+        Translation.objects.filter(id=o.name_id).update(
+            localized_string='other name')
+        o = TranslatedModel.objects.no_cache().get(id=1)
+        trans_eq(o.name, 'some name', 'en-US')
+
+    def test_save_invalidates(self):
+        o = TranslatedModel.objects.no_cache().get(id=1)
+        o.name.localized_string = 'new name'
+        o.name.save()
+        assert cache.get(trans_cache_key(o.name_id, 'en-us')) is None
+        o = TranslatedModel.objects.no_cache().get(id=1)
+        trans_eq(o.name, 'new name', 'en-US')
+
+
 def test_translation_bool():
     t = lambda s: Translation(localized_string=s)
 
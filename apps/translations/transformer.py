@@ -1,10 +1,11 @@
 from django.conf import settings
+from django.core.cache import cache
 from django.db import connections, models
 from django.utils import translation
 
 import multidb
 
-from translations.models import Translation
+from translations.models import trans_cache_key, Translation
 from translations.fields import TranslatedField
 
 isnull = """IF(!ISNULL({t1}.localized_string), {t1}.{col}, {t2}.{col})
@@ -67,6 +68,9 @@ def get_trans(items):
     if not items:
         return
 
+    if settings.TRANSLATIONS_CACHE_TIMEOUT:
+        return get_trans_cached(items)
+
     connection = connections[multidb.get_slave()]
     cursor = connection.cursor()
 
@@ -85,3 +89,63 @@ def get_trans(items):
             t = Translation(*row[start:start+step])
             if t.id is not None and t.localized_string is not None:
                 setattr(item, field.name, t)
+
+
+def get_trans_cached(items):
+    """
+    Same as `get_trans`, but look up every (translation id, locale) the items
+    need with a single `cache.get_many` and only go to the database, with
+    one query, for the misses.
+    """
+    model = items[0].__class__
+    fallback = (model.get_fallback() if hasattr(model, 'get_fallback')
+                else settings.LANGUAGE_CODE)
+    lang = translation.get_language()
+
+    # (item, field, translation id, locale, fallback locale) for each field
+    # to fill in. A fallback locale of None means any locale will do.
+    wanted = []
+    for item in items:
+        for field in getattr(model._meta, 'translated_fields', []):
+            trans_id = getattr(item, field.attname)
+            if trans_id is None:
+                continue
+            if not field.require_locale:
+                fallback_locale = None
+            elif isinstance(fallback, models.Field):
+                # No locale matches an empty one, like a NULL in the join.
+                fallback_locale = getattr(item, fallback.attname) or ''
+            else:
+                fallback_locale = fallback
+            wanted.append((item, field, trans_id, lang, fallback_locale))
+
+    keys = {}
+    for item, field, trans_id, locale, fallback_locale in wanted:
+        for loc in (locale, fallback_locale):
+            keys[trans_cache_key(trans_id, loc)] = trans_id, loc
+    found = cache.get_many(keys.keys())
+
+    missing = set(key for key in keys if key not in found)
+    if missing:
+        ids = set(keys[key][0] for key in missing)
+        rows = (Translation.objects.using(multidb.get_slave()).no_cache()
+                .filter(id__in=ids).values_list(*trans_fields))
+        # Empty tuples are cached for translations that don't exist so we
+        # don't keep asking the database for them.
+        fetched = dict((key, ()) for key in missing)
+        for row in rows:
+            values = dict(zip(trans_fields, row))
+            if values['localized_string'] is None:
+                continue
+            fetched[trans_cache_key(values['id'], values['locale'])] = row
+            fetched[trans_cache_key(values['id'], None)] = row
+        fetched = dict((k, v) for k, v in fetched.items() if k in missing)
+        cache.set_many(fetched, settings.TRANSLATIONS_CACHE_TIMEOUT)
+        found.update(fetched)
+
+    for item, field, trans_id, locale, fallback_locale in wanted:
+        row = (found.get(trans_cache_key(trans_id, locale)) or
+               found.get(trans_cache_key(trans_id, fallback_locale)))
+        if row:
+            setattr(item, field.name, Translation(**dict(zip(trans_fields,
+                                                             row))))
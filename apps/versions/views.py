@@ -112,6 +112,11 @@ def download_watermarked(request, file_id):
                       % (file_id, user.id))
             raise PermissionDenied
 
+    if waffle.switch_is_active('stream-watermarks'):
+        log.debug('Streaming watermarked file: %s, %s' % (file_id, user.id))
+        return http.HttpResponse(file.watermark_stream(user),
+                                 content_type='application/xp-install')
+
     dest = file.watermark(user)
     if not dest:
         # TODO(andym): the watermarking is already in progress and we've
@@ -0,0 +1,33 @@
+from django.core.cache import cache
+
+import commonware.log
+import cronjobs
+import waffle
+
+from zadmin.models import ValidationResult
+from zadmin.tasks import run_validation_job
+
+log = commonware.log.getLogger('z.cron')
+
+RUNNER_LOCK = 'zadmin:run-validation-jobs'
+# A run that takes longer than this is assumed dead.
+RUNNER_LOCK_TIMEOUT = 60 * 60 * 24
+
+
+@cronjobs.register
+def run_validation_jobs():
+    """Validate the pending files of every unfinished bulk validation job."""
+    if not waffle.switch_is_active('bulk-validation-runner'):
+        return
+    if not cache.add(RUNNER_LOCK, 1, RUNNER_LOCK_TIMEOUT):
+        log.info('Bulk validation is already running.')
+        return
+    try:
+        jobs = (ValidationResult.objects.filter(completed=None,
+                                                validation_job__completed=None)
+                .values_list('validation_job', flat=True)
+                .order_by('validation_job').distinct())
+        for job_id in list(jobs):
+            run_validation_job(job_id)
+    finally:
+        cache.delete(RUNNER_LOCK)
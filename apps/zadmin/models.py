@@ -252,29 +252,54 @@ class ValidationJobTally(object):
         msg_ids = ['.'.join(msg['id']) for msg in msgs]
         cache.set('validation.job_id:%s' % self.job_id, msg_ids)
         for msg, key in zip(msgs, msg_ids):
-            if isinstance(msg['description'], list):
-                des = []
-                for _m in msg['description']:
-                    if isinstance(_m, list):
-                        for x in _m:
-                            des.append(x)
-                    else:
-                        des.append(_m)
-                des = '; '.join(des)
-            else:
-                des = msg['description']
-            cache.set('validation.msg_key:' + key,
-                      {'long_message': des,
-                       'message': msg['message'],
-                       'type': msg.get('compatibility_type',
-                                       msg.get('type'))
-                       })
-            aa = ('validation.job_id:%s.msg_key:%s:addons_affected'
-                  % (self.job_id, key))
-            try:
-                cache.incr(aa)
-            except ValueError:
-                cache.set(aa, 1)
+            self._save_message(key, msg)
+            self._incr_affected(key, 1)
+
+    def add_messages(self, msgs):
+        """Tallies the messages of any number of files at once.
+
+        Unlike save_messages, message keys already found by the job are
+        kept.
+        """
+        counts = {}
+        for msg in msgs:
+            key = '.'.join(msg['id'])
+            if key not in counts:
+                counts[key] = 0
+                self._save_message(key, msg)
+            counts[key] += 1
+        job_key = 'validation.job_id:%s' % self.job_id
+        msg_ids = cache.get(job_key) or []
+        cache.set(job_key, msg_ids + [k for k in counts if k not in msg_ids])
+        for key, count in counts.items():
+            self._incr_affected(key, count)
+
+    def _save_message(self, key, msg):
+        if isinstance(msg['description'], list):
+            des = []
+            for _m in msg['description']:
+                if isinstance(_m, list):
+                    for x in _m:
+                        des.append(x)
+                else:
+                    des.append(_m)
+            des = '; '.join(des)
+        else:
+            des = msg['description']
+        cache.set('validation.msg_key:' + key,
+                  {'long_message': des,
+                   'message': msg['message'],
+                   'type': msg.get('compatibility_type',
+                                   msg.get('type'))
+                   })
+
+    def _incr_affected(self, key, count):
+        aa = ('validation.job_id:%s.msg_key:%s:addons_affected'
+              % (self.job_id, key))
+        try:
+            cache.incr(aa, count)
+        except ValueError:
+            cache.set(aa, count)
 
 
 class SiteEvent(models.Model):
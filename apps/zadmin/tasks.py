@@ -1,9 +1,12 @@
 import collections
 from datetime import datetime
+import itertools
 import json
 import logging
+import multiprocessing
 import os
 import re
+import socket
 import sys
 import textwrap
 import traceback
@@ -12,13 +15,17 @@ import urlparse
 
 from django import forms
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import connection
+from django.core.management import call_command
+from django.db import connection, transaction
 from django.template import Context, Template
 from django.utils.translation import trans_real as translation
 
 from celeryutils import task
+from django_statsd.clients import statsd
 import requests
+import waffle
 
 from addons.models import Addon, AddonUser
 import amo
@@ -27,7 +34,8 @@ from amo import set_user
 from amo.decorators import write
 from amo.helpers import absolutify
 from amo.urlresolvers import reverse
-from amo.utils import send_mail
+from amo.utils import chunked, send_mail
+from applications.management.commands import dump_apps
 from devhub.tasks import run_validator
 from files.models import FileUpload, Platform
 from files.utils import parse_addon
@@ -79,6 +87,18 @@ def tally_job_results(job_id, **kw):
                       recipient_list=[job.finish_email])
 
 
+def _run_bulk_validator(file_path, app_guid, version):
+    ver = {app_guid: [version]}
+    # Set min/max so the validator only tests for compatibility with
+    # the target version. Note that previously we explicitly checked
+    # for compatibility with older versions. See bug 675306 for
+    # the old behavior.
+    overrides = {'targetapp_minVersion': {app_guid: version},
+                 'targetapp_maxVersion': {app_guid: version}}
+    return run_validator(file_path, for_appversions=ver, test_all_tiers=True,
+                         overrides=overrides, compat=True)
+
+
 @task(rate_limit='6/s')
 @write
 def bulk_validate_file(result_id, **kw):
@@ -90,18 +110,9 @@ def bulk_validate_file(result_id, **kw):
         log.info('[1@None] Validating file %s (%s) for result_id %s'
                  % (res.file, file_base, res.id))
         target = res.validation_job.target_version
-        ver = {target.application.guid: [target.version]}
-        # Set min/max so the validator only tests for compatibility with
-        # the target version. Note that previously we explicitly checked
-        # for compatibility with older versions. See bug 675306 for
-        # the old behavior.
-        overrides = {'targetapp_minVersion':
-                                {target.application.guid: target.version},
-                     'targetapp_maxVersion':
-                                {target.application.guid: target.version}}
-        validation = run_validator(res.file.file_path, for_appversions=ver,
-                                   test_all_tiers=True, overrides=overrides,
-                                   compat=True)
+        validation = _run_bulk_validator(res.file.file_path,
+                                         target.application.guid,
+                                         target.version)
     except:
         task_error = sys.exc_info()
         log.error(u"bulk_validate_file exception on file %s (%s): %s: %s"
@@ -147,6 +158,8 @@ def add_validation_jobs(pks, job_pk, **kw):
     curr_ver = job.curr_max_version.version_int
     target_ver = job.target_version.version_int
     prelim_app = list(amo.STATUS_UNDER_REVIEW) + [amo.STATUS_BETA]
+    use_runner = waffle.switch_is_active('bulk-validation-runner')
+    file_ids = []
     for addon in Addon.objects.filter(pk__in=pks):
         ids = []
         base = addon.versions.filter(apps__application=job.application.id,
@@ -195,11 +208,134 @@ def add_validation_jobs(pks, job_pk, **kw):
         ids = set(ids)  # Just in case.
         log.info('Adding %s files for validation for '
                  'addon: %s for job: %s' % (len(ids), addon.pk, job_pk))
+        if use_runner:
+            file_ids.extend(ids)
+            continue
         for id in set(ids):
             result = ValidationResult.objects.create(validation_job_id=job_pk,
                                                      file_id=id)
             bulk_validate_file.delay(result.pk)
 
+    if file_ids:
+        # The run_validation_jobs cron picks these up.
+        ValidationResult.objects.bulk_create(
+            [ValidationResult(validation_job_id=job_pk, file_id=id)
+             for id in file_ids])
+
+
+def _reset_clients():
+    """
+    Drops the connections a forked process would otherwise share with its
+    parent, they reconnect when next used.
+    """
+    connection.close()
+    if hasattr(cache, 'close'):
+        cache.close()
+    sock = getattr(statsd, '_sock', None)
+    if sock:
+        statsd._sock = socket.socket(sock.family, sock.type)
+        sock.close()
+
+
+def _warm_validator():
+    """
+    Sets up each process of the runner's pool: run_validator uses the cache
+    and statsd, whose clients mustn't be shared with the parent, and the
+    validator is imported once.
+    """
+    _reset_clients()
+    import validator.validate  # NOQA
+
+
+def _validate_result(args):
+    """Validates the file of one result, without touching the database."""
+    result_id, file_path, app_guid, version = args
+    try:
+        return (result_id,
+                _run_bulk_validator(file_path, app_guid, version), None)
+    except Exception:
+        log.error(u'Bulk validation exception on file %s' % file_path,
+                  exc_info=True)
+        return result_id, None, traceback.format_exc()
+
+
+def run_validation_job(job_id, processes=None):
+    """
+    Validates every file of a job that hasn't been validated yet, with a
+    pool of BULK_VALIDATION_PROCESSES processes.
+
+    Results are saved, and their messages tallied, BULK_VALIDATION_BATCH
+    files at a time. The pool can't be started from a celery worker, this
+    is run by the run_validation_jobs cron.
+    """
+    job = ValidationJob.objects.get(pk=job_id)
+    target = job.target_version
+    app_guid = target.application.guid
+    processes = processes or settings.BULK_VALIDATION_PROCESSES
+
+    # Let the parent do whatever the validator would otherwise do against
+    # the database in each process.
+    if not os.path.exists(dump_apps.Command.JSON_PATH):
+        call_command('dump_apps')
+
+    pending = (ValidationResult.objects.no_cache()
+               .filter(validation_job=job, completed=None)
+               .select_related('file__version'))
+    args = [(res.id, res.file.file_path, app_guid, target.version)
+            for res in pending.iterator()]
+
+    if processes > 1:
+        # The forked processes mustn't share our connections.
+        _reset_clients()
+        pool = multiprocessing.Pool(processes, initializer=_warm_validator)
+        results = pool.imap_unordered(_validate_result, args)
+    else:
+        pool = None
+        results = itertools.imap(_validate_result, args)
+
+    done = 0
+    try:
+        for batch in chunked(results, settings.BULK_VALIDATION_BATCH):
+            save_validation_results(job, batch)
+            done += len(batch)
+            log.info('[%s@None] Saved validation results for job %s'
+                     % (len(batch), job.pk))
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+
+    log.info('Validated %s files for job %s' % (done, job.pk))
+    tally_job_results(job.pk)
+    return done
+
+
+def save_validation_results(job, results):
+    """
+    Saves a batch of (result_id, validation, task_error) tuples in one
+    statement and tallies their messages.
+    """
+    now = datetime.now()
+    rows, messages = [], []
+    for result_id, validation, task_error in results:
+        res = ValidationResult(validation=None, errors=0, warnings=0,
+                               notices=0, valid=False)
+        if validation:
+            res.apply_validation(validation)
+            messages.extend(json.loads(validation)['messages'])
+        rows.append((res.valid, res.errors, res.warnings, res.notices,
+                     res.validation, task_error, now, now, result_id))
+
+    cursor = connection.cursor()
+    cursor.executemany("""
+        UPDATE validation_result
+        SET valid=%s, errors=%s, warnings=%s, notices=%s, validation=%s,
+            task_error=%s, completed=%s, modified=%s
+        WHERE id=%s""", rows)
+    transaction.commit_unless_managed()
+    if messages:
+        ValidationJobTally(job.pk).add_messages(messages)
+
 
 def get_context(addon, version, job, results, fileob=None):
     result_links = (absolutify(reverse('devhub.bulk_compat_result',
@@ -32,9 +32,10 @@ from stats.models import UpdateCount
 from users.models import UserProfile
 from users.utils import get_task_user
 from versions.models import ApplicationsVersions, Version
-from zadmin import forms, tasks
+from zadmin import cron, forms, tasks
 from zadmin.forms import DevMailerForm
-from zadmin.models import EmailPreviewTopic, ValidationJob, ValidationResult
+from zadmin.models import (EmailPreviewTopic, ValidationJob, ValidationJobTally,
+                           ValidationResult)
 from zadmin.views import completed_versions_dirty, find_files
 
 
@@ -1066,6 +1067,107 @@ class TestBulkValidationTask(BulkValidationTest):
         eq_(len(ids), 0)
 
 
+class TestValidationRunner(BulkValidationTest):
+
+    def setUp(self):
+        super(TestValidationRunner, self).setUp()
+        self.create_switch('bulk-validation-runner')
+        self.data = dict(no_op_validation, errors=1, messages=[{
+            'message': 'message one',
+            'description': 'message one long',
+            'id': ['path', 'to', 'test_one'],
+            'type': 'error'}])
+
+    @mock.patch('zadmin.tasks.bulk_validate_file')
+    def test_start(self, bulk_validate_file):
+        self.start_validation()
+        job = ValidationJob.objects.get()
+        eq_(job.result_set.filter(completed=None).count(),
+            len(self.version.all_files))
+        assert not bulk_validate_file.delay.called
+
+    @mock.patch('zadmin.tasks.run_validator')
+    def test_run(self, run_validator):
+        run_validator.return_value = json.dumps(self.data)
+        self.start_validation()
+        job = ValidationJob.objects.get()
+        eq_(tasks.run_validation_job(job.pk, processes=1), 1)
+        eq_(run_validator.call_args[1]['for_appversions'],
+            {amo.FIREFOX.guid: [self.new_max.version]})
+        res = ValidationResult.objects.get()
+        self.assertCloseToNow(res.completed)
+        eq_(res.errors, 1)
+        eq_(res.valid, False)
+        eq_(res.task_error, None)
+        job = ValidationJob.objects.get()
+        self.assertCloseToNow(job.completed)
+        eq_(len(mail.outbox), 1)
+
+    @mock.patch('zadmin.tasks.run_validator')
+    def test_run_error(self, run_validator):
+        run_validator.side_effect = RuntimeError('validation error')
+        self.start_validation()
+        tasks.run_validation_job(ValidationJob.objects.get().pk, processes=1)
+        res = ValidationResult.objects.get()
+        assert res.task_error.strip().endswith(
+            'RuntimeError: validation error')
+        self.assertCloseToNow(res.completed)
+        eq_(res.validation_job.stats['errors'], 1)
+
+    @mock.patch('zadmin.tasks.run_validator')
+    def test_run_batches(self, run_validator):
+        run_validator.return_value = json.dumps(self.data)
+        job = self.create_job()
+        for i in range(3):
+            self.create_result(job, self.create_file(), completed=None)
+        with self.settings(BULK_VALIDATION_BATCH=2):
+            eq_(tasks.run_validation_job(job.pk, processes=1), 3)
+        eq_(job.result_set.filter(completed=None).count(), 0)
+        msg = list(ValidationJobTally(job.pk).get_messages())[0]
+        eq_(msg['addons_affected'], 3)
+        # Nothing left to do.
+        eq_(tasks.run_validation_job(job.pk, processes=1), 0)
+
+    @mock.patch('zadmin.tasks.run_validator')
+    def test_run_pool(self, run_validator):
+        job = self.create_job()
+        errors = {}
+        for i in range(6):
+            f = self.create_file()
+            errors[f.file_path] = i
+            self.create_result(job, f, completed=None)
+        run_validator.side_effect = lambda path, **kw: json.dumps(
+            dict(self.data, errors=errors[path]))
+        # The test's transaction would be lost with the connection.
+        with mock.patch.object(tasks.connection, 'close'):
+            with self.settings(BULK_VALIDATION_BATCH=4):
+                eq_(tasks.run_validation_job(job.pk, processes=3), 6)
+        for res in job.result_set.all():
+            eq_(res.errors, errors[res.file.file_path])
+            eq_(res.task_error, None)
+
+    @mock.patch('zadmin.tasks.cache')
+    def test_worker_cache_reset(self, cache):
+        tasks._warm_validator()
+        assert cache.close.called
+
+    @mock.patch('zadmin.cron.run_validation_job')
+    def test_cron(self, run_validation_job):
+        job = self.create_job()
+        self.create_result(job, self.create_file(), completed=None)
+        self.create_result(self.create_job(), self.create_file())
+        cron.run_validation_jobs()
+        run_validation_job.assert_called_once_with(job.pk)
+
+    @mock.patch('zadmin.cron.run_validation_job')
+    def test_cron_switch(self, run_validation_job):
+        self.create_switch('bulk-validation-runner', active=False)
+        job = self.create_job()
+        self.create_result(job, self.create_file(), completed=None)
+        cron.run_validation_jobs()
+        assert not run_validation_job.called
+
+
 class TestTallyValidationErrors(BulkValidationTest):
 
     def setUp(self):
@@ -1145,6 +1247,17 @@ class TestTallyValidationErrors(BulkValidationTest):
         # This was raising an exception. bug 733845
         tasks.tally_validation_results(job.pk, data_str)
 
+    def test_add_messages(self):
+        job = self.create_job()
+        tally = ValidationJobTally(job.pk)
+        tally.add_messages(self.data['messages'] * 2)
+        tally.add_messages(self.data['messages'][:1])
+        header, rows = self.csv(job.pk)
+        eq_(rows.pop(0), ['path.to.test_one',
+                          'message one', 'message one long', 'error', '3'])
+        eq_(rows.pop(0), ['path.to.test_two',
+                          'message two', 'message two long', 'error', '2'])
+
 
 class TestEmailPreview(amo.tests.TestCase):
     fixtures = ['base/addon_3615', 'base/users']
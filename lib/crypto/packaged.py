@@ -1,8 +1,11 @@
+from multiprocessing.pool import ThreadPool
 import os
 import shutil
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import default_storage as storage
+from django.db import connection
 
 from base64 import b64decode
 from celeryutils import task
@@ -13,6 +16,7 @@ from signing_clients.apps import JarExtractor
 import requests
 
 import amo
+from amo.utils import chunked
 from versions.models import Version
 
 log = commonware.log.getLogger('z.crypto')
@@ -22,10 +26,10 @@ class SigningError(Exception):
     pass
 
 
-def sign_app(src, dest, reviewer=False):
+def sign_app(src, dest, reviewer=False, session=None):
     """
     Generate a manifest and signature and send signature to signing server to
-    be signed.
+    be signed. If given, the requests `session` is used to talk to it.
     """
     active_endpoint = _get_endpoint(reviewer)
     timeout = settings.SIGNED_APPS_SERVER_TIMEOUT
@@ -46,9 +50,10 @@ def sign_app(src, dest, reviewer=False):
     log.info('App signature contents: %s' % jar.signatures)
 
     log.info('Calling service: %s' % active_endpoint)
+    post = session.post if session else requests.post
     try:
         with statsd.timer('services.sign.app'):
-            response = requests.post(active_endpoint, timeout=timeout,
+            response = post(active_endpoint, timeout=timeout,
                                      files={'file': ('zigbert.sf',
                                                      str(jar.signatures))})
     except requests.exceptions.HTTPError, error:
@@ -106,7 +111,7 @@ def _no_sign(src, dest):
 
 
 @task
-def sign(version_id, reviewer=False, resign=False, **kw):
+def sign(version_id, reviewer=False, resign=False, session=None, **kw):
     version = Version.objects.get(pk=version_id)
     app = version.addon
     log.info('Signing version: %s of app: %s' % (version_id, app))
@@ -138,10 +143,78 @@ def sign(version_id, reviewer=False, resign=False, **kw):
 
     with statsd.timer('services.sign.app'):
         try:
-            sign_app(file_obj.file_path, path, reviewer)
+            sign_app(file_obj.file_path, path, reviewer, session=session)
         except SigningError:
             if storage.exists(path):
                 storage.delete(path)
             raise
     log.info('Signing complete.')
     return path
+
+
+@task
+def sign_versions(version_ids, reviewer=False, resign=False, **kw):
+    """
+    Sign the apps of `version_ids`, with at most SIGNED_APPS_WORKERS of them
+    talking to the signing server at once over a shared session. Failures
+    are logged so that the other versions still get signed.
+
+    Returns a list of (version id, signed path or None) tuples.
+    """
+    session = requests.session()
+
+    def sign_one(version_id):
+        try:
+            return version_id, sign(version_id, reviewer=reviewer,
+                                    resign=resign, session=session)
+        except Exception:
+            log.error('Signing version %s failed.' % version_id,
+                      exc_info=True)
+            return version_id, None
+        finally:
+            cache.delete(sign_queued_key(version_id))
+
+    def sign_in_thread(version_id):
+        try:
+            return sign_one(version_id)
+        finally:
+            # Every thread has its own connection, don't leave them open.
+            connection.close()
+
+    workers = min(settings.SIGNED_APPS_WORKERS, len(version_ids))
+    if workers <= 1:
+        return map(sign_one, version_ids)
+    pool = ThreadPool(workers)
+    try:
+        return pool.map(sign_in_thread, version_ids)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def sign_queued_key(version_id):
+    return 'crypto:sign-queued:%s' % version_id
+
+
+def queue_sign(version_id):
+    """
+    Sign the app of `version_id` in the background, unless that's already
+    been asked for.
+    """
+    queue_signs([version_id])
+
+
+def queue_signs(version_ids, chunk_size=20):
+    """
+    Sign the apps of those `version_ids` whose signing hasn't already been
+    asked for in the background, `chunk_size` of them per task.
+
+    Returns the ids of the versions queued.
+    """
+    ids = [pk for pk in version_ids
+           if cache.add(sign_queued_key(pk), 1,
+                        settings.SIGNED_APPS_QUEUE_TIMEOUT)]
+    for chunk in chunked(ids, chunk_size):
+        log.info('Queueing the signing of versions: %s' % chunk)
+        sign_versions.delay(chunk)
+    return ids
@@ -176,3 +176,46 @@ class TestPackaged(PackagedApp, amo.tests.TestCase):
             endpoint = packaged._get_endpoint(reviewer=True)
         assert endpoint.startswith('http://review.me'), (
             'Unexpected endpoint returned.')
+
+
+class TestSignVersions(PackagedApp, amo.tests.TestCase):
+
+    def setUp(self):
+        super(TestSignVersions, self).setUp()
+        self.setup_files()
+
+    @mock.patch('lib.crypto.packaged.sign_app')
+    def test_sign(self, sign_app):
+        eq_(packaged.sign_versions([self.version.pk]),
+            [(self.version.pk, self.file.signed_file_path)])
+        eq_(sign_app.call_count, 1)
+        assert sign_app.call_args[1]['session']
+
+    @mock.patch('lib.crypto.packaged.sign_app')
+    def test_failure_logged(self, sign_app):
+        sign_app.side_effect = packaged.SigningError
+        eq_(packaged.sign_versions([self.version.pk, 0]),
+            [(self.version.pk, None), (0, None)])
+
+    @mock.patch('lib.crypto.packaged.sign_versions')
+    def test_queue_once(self, sign_versions):
+        packaged.queue_sign(self.version.pk)
+        packaged.queue_sign(self.version.pk)
+        sign_versions.delay.assert_called_once_with([self.version.pk])
+
+    @mock.patch('lib.crypto.packaged.sign_versions')
+    def test_queue_signs(self, sign_versions):
+        packaged.queue_sign(self.version.pk)
+        eq_(packaged.queue_signs([self.version.pk, 1, 2, 3], chunk_size=2),
+            [1, 2, 3])
+        sign_versions.delay.assert_has_calls([mock.call([self.version.pk]),
+                                              mock.call([1, 2]),
+                                              mock.call([3])])
+
+    @mock.patch('lib.crypto.packaged.sign_app')
+    def test_signed_requeues(self, sign_app):
+        with mock.patch('lib.crypto.packaged.sign_versions.delay') as delay:
+            packaged.queue_sign(self.version.pk)
+            packaged.sign_versions([self.version.pk])
+            packaged.queue_sign(self.version.pk)
+        eq_(delay.call_count, 2)
@@ -97,6 +97,23 @@ SERVICES_DATABASE = {
     'HOST': '',
 }
 
+# The connection pool shared by the services scripts, takes the arguments of
+# sqlalchemy's QueuePool.
+SERVICES_DATABASE_POOL = {
+    'max_overflow': 10,
+    'pool_size': 5,
+    'recycle': 300,
+    'timeout': 30,
+}
+# Pooled connections that have been idle for longer than this many seconds
+# are checked before being handed out again.
+SERVICES_DATABASE_PING = 30
+# How many update requests are served at once before the update service
+# starts answering with 503s, 0 for no limit. Clients are told to retry after
+# SERVICES_UPDATE_RETRY_AFTER seconds.
+SERVICES_UPDATE_MAX_PENDING = 0
+SERVICES_UPDATE_RETRY_AFTER = 60
+
 DATABASE_ROUTERS = ('multidb.PinningMasterSlaveRouter',)
 
 # For use django-mysql-pool backend.
@@ -250,6 +267,12 @@ SIGNED_APPS_REVIEWER_SERVER = ''
 SIGNED_APPS_SERVER_TIMEOUT = 10
 # Send the more terse manifest signatures to the app signing server.
 SIGNED_APPS_OMIT_PER_FILE_SIGS = True
+# How many apps a signing task sends to the signing server at once.
+SIGNED_APPS_WORKERS = 4
+# How long a queued signing stops downloads from queueing it again.
+SIGNED_APPS_QUEUE_TIMEOUT = 60 * 5
+# Seconds a download of an app that isn't signed yet asks clients to wait.
+SIGNED_APPS_RETRY_AFTER = 30
 
 # Absolute path to a writable directory shared by all servers. No trailing
 # slash.
@@ -259,6 +282,10 @@ UPLOADS_PATH = NETAPP_STORAGE + '/uploads'
 # File path for add-on files that get rsynced to mirrors.
 # /mnt/netapp_amo/addons.mozilla.org-remora/public-staging
 MIRROR_STAGE_PATH = NETAPP_STORAGE + '/public-staging'
+# How many files the mirror sync moves or copies at once, and at most how
+# many per second.
+MIRROR_SYNC_WORKERS = 4
+MIRROR_SYNC_RATE = 20
 
 # paths that don't require an app prefix
 SUPPORTED_NONAPPS = ('about', 'admin', 'apps', 'blocklist', 'credits',
@@ -917,6 +944,11 @@ FETCH_BY_ID = True
 # it's not possible to invalidate these queries.
 CACHE_COUNT_TIMEOUT = 60
 
+# Number of seconds translations fetched by the translations transformer are
+# cached, keyed by (translation id, locale). Set to 0 to always join them in
+# from the database instead.
+TRANSLATIONS_CACHE_TIMEOUT = 60 * 60
+
 # To enable pylibmc compression (in bytes)
 PYLIBMC_MIN_COMPRESS_LEN = 0  # disabled
 
@@ -975,6 +1007,8 @@ REDIRECT_URL = 'http://outgoing.mozilla.org/v1/'
 REDIRECT_SECRET_KEY = ''
 
 PFS_URL = 'https://pfs.mozilla.org/plugins/PluginFinderService.php'
+# How many distinct responses the plugin finder service keeps in memory.
+PFS_CACHE_SIZE = 10000
 # Allow URLs from these servers. Use full domain names.
 REDIRECT_URL_WHITELIST = ['addons.mozilla.org']
 
@@ -1074,6 +1108,7 @@ CELERY_ROUTES = {
 
     # Videos.
     'lib.video.tasks.resize_video': {'queue': 'devhub'},
+    'lib.video.tasks.resize_videos': {'queue': 'devhub'},
 
     # Images.
     'bandwagon.tasks.resize_icon': {'queue': 'images'},
@@ -1099,6 +1134,7 @@ CELERY_ROUTES = {
 # Otherwise your task will use the default settings.
 CELERY_TIME_LIMITS = {
     'lib.video.tasks.resize_video': {'soft': 360, 'hard': 600},
+    'lib.video.tasks.resize_videos': {'soft': 900, 'hard': 1200},
 }
 
 # When testing, we always want tasks to raise exceptions. Good for sanity.
@@ -1307,6 +1343,10 @@ EXPOSE_VALIDATOR_TRACEBACKS = False
 # limit.
 VALIDATOR_MESSAGE_LIMIT = 500
 
+# How long to keep the validation of a file, keyed by its contents and the
+# validator options. Set to 0 to always run the validator.
+VALIDATION_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
 # Feature flags
 UNLINK_SITE_STATS = True
 
@@ -1446,6 +1486,23 @@ FFMPEG_BINARY = 'ffmpeg'
 TOTEM_BINARIES = {'thumbnailer': 'totem-video-thumbnailer',
                   'indexer': 'totem-video-indexer'}
 VIDEO_LIBRARIES = ['lib.video.totem', 'lib.video.ffmpeg']
+# How long to keep the metadata of a probed video, keyed on its contents.
+VIDEO_META_CACHE_TIMEOUT = 60 * 60
+# How many videos resize_videos will encode at once.
+VIDEO_ENCODE_WORKERS = 2
+
+# The gc cron deletes old activity logs in windows of this many ids, halving
+# the window while the slaves are more than LOG_GC_MAX_LAG seconds behind,
+# and pausing for up to that long after each window.
+LOG_GC_BATCH_SIZE = 1000
+LOG_GC_MIN_BATCH_SIZE = 100
+LOG_GC_MAX_BATCH_SIZE = 10000
+LOG_GC_MAX_LAG = 5
+
+# Number of processes the bulk validation runner validates files with, and
+# how many of their results are saved at a time.
+BULK_VALIDATION_PROCESSES = 4
+BULK_VALIDATION_BATCH = 100
 
 # This is the metrics REST server for receiving data, should be a URL
 # including the protocol.
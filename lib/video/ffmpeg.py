@@ -1,4 +1,5 @@
 import logging
+import os
 import re
 import tempfile
 
@@ -105,6 +106,33 @@ class Video(VideoBase):
                    dest)
         return dest
 
+    def get_encoded_and_screenshot(self, size, screenshot_size):
+        """
+        Does get_encoded and get_screenshot with a single ffmpeg call, so
+        the video is only decoded once. Returns the locations of both
+        temporary files as a tuple.
+        """
+        assert self.is_valid()
+        assert self.meta.get('duration')
+        halfway = int(self.meta['duration'] / 2)
+        encoded = tempfile.mkstemp(suffix='.webm')[1]
+        screenshot = tempfile.mkstemp(suffix='.png')[1]
+        try:
+            # Options apply to the output file that follows them.
+            self._call('encode_screenshot',
+                       False,
+                       '-s', '%sx%s' % size,  # Size of video.
+                       encoded,
+                       '-vframes', '1',  # Only grab one frame.
+                       '-ss', str(halfway),  # Half way through.
+                       '-s', '%sx%s' % screenshot_size,  # Size of image.
+                       screenshot)
+        except:
+            os.remove(encoded)
+            os.remove(screenshot)
+            raise
+        return encoded, screenshot
+
     def is_valid(self):
         assert self.meta is not None
         self.errors = []
@@ -1,4 +1,5 @@
 import logging
+from multiprocessing.pool import ThreadPool
 import os
 import shutil
 
@@ -13,6 +14,7 @@ import waffle
 
 log = logging.getLogger('z.devhub.task')
 time_limits = settings.CELERY_TIME_LIMITS['lib.video.tasks.resize_video']
+many_time_limits = settings.CELERY_TIME_LIMITS['lib.video.tasks.resize_videos']
 
 
 # Video decoding can take a while, so let's increase these limits.
@@ -35,6 +37,39 @@ def resize_video(src, instance, user=None, **kw):
     return
 
 
+@task(time_limit=many_time_limits['hard'],
+      soft_time_limit=many_time_limits['soft'])
+@set_modified_on
+def resize_videos(videos, user=None, **kw):
+    """
+    Resize a list of (src, instance) videos, encoding up to
+    VIDEO_ENCODE_WORKERS of them at once.
+
+    Only the encoding happens in the worker pool; everything touching the
+    database is done here, one video at a time.
+    """
+    if not videos:
+        return
+    encode = waffle.switch_is_active('video-encode')
+    pool = ThreadPool(min(settings.VIDEO_ENCODE_WORKERS, len(videos)))
+    try:
+        results = pool.map(lambda (src, instance): _encode_video(
+                               src, instance.pk, encode), videos)
+    finally:
+        pool.close()
+        pool.join()
+
+    saved = False
+    for (src, instance), files in zip(videos, results):
+        if files and _save_video(src, instance, files):
+            log.info('Video resize complete.')
+            saved = True
+        else:
+            log.error('Error on processing video %s.' % instance.pk)
+            _resize_error(src, instance, user)
+    return saved
+
+
 def _resize_error(src, instance, user):
     """An error occurred in processing the video, deal with that approp."""
     amo.log(amo.LOG.VIDEO_ERROR, instance, user=user)
@@ -46,47 +81,65 @@ def _resize_video(src, instance, **kw):
     Given a preview object and a file somewhere: encode into the full
     preview size and generate a thumbnail.
     """
-    log.info('[1@None] Encoding video %s' % instance.pk)
+    files = _encode_video(src, instance.pk,
+                          waffle.switch_is_active('video-encode'))
+    if files:
+        return _save_video(src, instance, files)
+
+
+def _encode_video(src, pk, encode):
+    """
+    Encode the video at `src` into the full preview size if `encode` is
+    True, and generate a thumbnail. Returns a tuple of the locations of the
+    temporary (video, thumbnail) files, where video is None if we didn't
+    encode, or None if something went wrong.
+
+    This doesn't touch the database, so it's safe to run in a thread.
+    """
+    log.info('[1@None] Encoding video %s' % pk)
     lib = library
     if not lib:
-        log.info('Video library not available for %s' % instance.pk)
+        log.info('Video library not available for %s' % pk)
+        return
+
+    try:
+        video = lib(src)
+        video.get_meta_cached()
+    except Exception:
+        log.info('Error probing video for %s' % pk, exc_info=True)
         return
 
-    video = lib(src)
-    video.get_meta()
     if not video.is_valid():
-        log.info('Video is not valid for %s' % instance.pk)
+        log.info('Video is not valid for %s' % pk)
         return
 
-    if waffle.switch_is_active('video-encode'):
-        # Do the video encoding.
+    if encode:
+        # Encode the video and grab the thumbnail in one go. The thumbnail
+        # is the signal that the encoding has finished.
         try:
-            video_file = video.get_encoded(amo.ADDON_PREVIEW_SIZES[1])
+            return video.get_encoded_and_screenshot(
+                amo.ADDON_PREVIEW_SIZES[1], amo.ADDON_PREVIEW_SIZES[0])
         except Exception:
-            log.info('Error encoding video for %s, %s' %
-                     (instance.pk, video.meta), exc_info=True)
+            log.info('Error encoding video for %s, %s' % (pk, video.meta),
+                     exc_info=True)
             return
 
-    # Do the thumbnail next, this will be the signal that the
-    # encoding has finished.
     try:
-        thumbnail_file = video.get_screenshot(amo.ADDON_PREVIEW_SIZES[0])
+        return None, video.get_screenshot(amo.ADDON_PREVIEW_SIZES[0])
     except Exception:
-        # We'll have this file floating around because the video
-        # encoded successfully, or something has gone wrong in which case
-        # we don't want the file around anyway.
-        if waffle.switch_is_active('video-encode'):
-            os.remove(video_file)
-        log.info('Error making thumbnail for %s' % instance.pk)
+        log.info('Error making thumbnail for %s' % pk)
         return
 
+
+def _save_video(src, instance, files):
+    video_file, thumbnail_file = files
     for path in (instance.thumbnail_path, instance.image_path):
         dirs = os.path.dirname(path)
         if not os.path.exists(dirs):
             os.makedirs(dirs)
 
     shutil.move(thumbnail_file, instance.thumbnail_path)
-    if waffle.switch_is_active('video-encode'):
+    if video_file:
         # Move the file over, removing the temp file.
         shutil.move(video_file, instance.image_path)
     else:
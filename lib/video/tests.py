@@ -15,7 +15,8 @@ from amo.tests.test_helpers import get_image_path
 from devhub.models import UserLog
 from lib.video import get_library
 from lib.video import ffmpeg, totem
-from lib.video.tasks import resize_video
+from lib.video.tasks import resize_video, resize_videos
+from lib.video.utils import VideoBase
 from users.models import UserProfile
 
 files = {
@@ -101,6 +102,40 @@ class TestFFmpegVideo(amo.tests.TestCase):
         finally:
             os.remove(video)
 
+    def test_encoded_and_screenshot(self):
+        self.video.get_meta()
+        video, screenshot = self.video.get_encoded_and_screenshot(
+            amo.ADDON_PREVIEW_SIZES[1], amo.ADDON_PREVIEW_SIZES[0])
+        try:
+            eq_(self.video._call.call_count, 2)
+            args = self.video._call.call_args[0]
+            eq_(args[0], 'encode_screenshot')
+            eq_(args[2:], ('-s', '%sx%s' % amo.ADDON_PREVIEW_SIZES[1],
+                           video, '-vframes', '1', '-ss', '5',
+                           '-s', '%sx%s' % amo.ADDON_PREVIEW_SIZES[0],
+                           screenshot))
+        finally:
+            os.remove(video)
+            os.remove(screenshot)
+
+    def test_encoded_and_screenshot_error(self):
+        self.video.get_meta()
+        self.video._call.side_effect = ValueError
+        with patch('lib.video.ffmpeg.os.remove') as remove:
+            with self.assertRaises(ValueError):
+                self.video.get_encoded_and_screenshot(
+                    amo.ADDON_PREVIEW_SIZES[1], amo.ADDON_PREVIEW_SIZES[0])
+        eq_(remove.call_count, 2)
+
+    def test_meta_cached(self):
+        self.video.get_meta_cached()
+        eq_(self.video._call.call_count, 1)
+        video = ffmpeg.Video(files['good'])
+        video._call = Mock()
+        video.get_meta_cached()
+        assert not video._call.called
+        eq_(video.meta, self.video.meta)
+
 
 class TestBadFFmpegVideo(amo.tests.TestCase):
 
@@ -170,6 +205,27 @@ class TestTotemVideo(amo.tests.TestCase):
             os.remove(video)
 
 
+class TestVideoBase(amo.tests.TestCase):
+
+    def setUp(self):
+        self.video = VideoBase(files['good'])
+        self.video.get_encoded = Mock(return_value='video')
+        self.video.get_screenshot = Mock(return_value='screenshot')
+
+    def test_encoded_and_screenshot(self):
+        eq_(self.video.get_encoded_and_screenshot((2, 2), (1, 1)),
+            ('video', 'screenshot'))
+        self.video.get_encoded.assert_called_with((2, 2))
+        self.video.get_screenshot.assert_called_with((1, 1))
+
+    @patch('lib.video.utils.os.remove')
+    def test_encoded_and_screenshot_error(self, remove):
+        self.video.get_screenshot.side_effect = ValueError
+        with self.assertRaises(ValueError):
+            self.video.get_encoded_and_screenshot((2, 2), (1, 1))
+        remove.assert_called_with('video')
+
+
 @patch('lib.video.totem.Video.library_available')
 @patch('lib.video.ffmpeg.Video.library_available')
 @patch.object(settings, 'VIDEO_LIBRARIES',
@@ -232,3 +288,41 @@ class TestTask(amo.tests.TestCase):
         resize_video(files['bad'], self.mock)
         assert not isinstance(self.mock.sizes, dict)
         assert not self.mock.save.called
+
+    @patch('lib.video.tasks._save_video')
+    @patch('lib.video.tasks._encode_video')
+    def test_resize_videos(self, _encode_video, _save_video):
+        other = Mock()
+        other.pk = 2
+        _encode_video.side_effect = lambda src, pk, encode: (
+            ('video', 'thumbnail') if pk == 1 else None)
+        _save_video.return_value = True
+        resize_videos([(files['good'], self.mock), (files['good'], other)])
+        eq_(sorted(c[0][1] for c in _encode_video.call_args_list), [1, 2])
+        _save_video.assert_called_with(files['good'], self.mock,
+                                       ('video', 'thumbnail'))
+        assert not self.mock.delete.called
+        assert other.delete.called
+
+    @patch('lib.video.tasks._encode_video')
+    def test_resize_videos_no_encode(self, _encode_video):
+        waffle.models.Switch.objects.update(name='video-encode', active=False)
+        _encode_video.return_value = None
+        resize_videos([(files['good'], self.mock)])
+        eq_(_encode_video.call_args[0][2], False)
+
+    @patch('lib.video.tasks._save_video')
+    @patch('lib.video.tasks.library')
+    def test_resize_videos_probe_error(self, library, _save_video):
+        other = Mock()
+        other.pk = 2
+        bad, good = Mock(), Mock()
+        bad.get_meta_cached.side_effect = OSError
+        good.get_encoded_and_screenshot.return_value = ('video', 'thumbnail')
+        library.side_effect = lambda src: bad if src == files['bad'] else good
+        _save_video.return_value = True
+        resize_videos([(files['bad'], self.mock), (files['good'], other)])
+        assert self.mock.delete.called
+        _save_video.assert_called_with(files['good'], other,
+                                       ('video', 'thumbnail'))
+        assert not other.delete.called
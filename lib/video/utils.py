@@ -1,5 +1,10 @@
+import hashlib
+import os
 import subprocess
 
+from django.conf import settings
+from django.core.cache import cache
+
 
 def check_output(*popenargs, **kwargs):
     # Tell thee, check_output was from Python 2.7 untimely ripp'd.
@@ -20,6 +25,15 @@ def check_output(*popenargs, **kwargs):
     return output
 
 
+def content_hash(filename, block_size=2 ** 20):
+    """Returns the sha256 of a file's contents."""
+    hash_ = hashlib.sha256()
+    with open(filename, 'rb') as fp:
+        for data in iter(lambda: fp.read(block_size), ''):
+            hash_.update(data)
+    return hash_.hexdigest()
+
+
 class VideoBase(object):
 
     def __init__(self, filename):
@@ -39,6 +53,32 @@ class VideoBase(object):
     def get_meta(self):
         pass
 
+    def get_meta_cached(self):
+        """
+        Same as get_meta, but the result is cached against a hash of the
+        file's contents so the same video is only probed once.
+        """
+        key = 'video:meta:%s:%s' % (self.__class__.__module__,
+                                    content_hash(self.filename))
+        meta = cache.get(key)
+        if meta is None:
+            self.get_meta()
+            cache.set(key, self.meta, settings.VIDEO_META_CACHE_TIMEOUT)
+        else:
+            self.meta = meta
+
+    def get_encoded_and_screenshot(self, size, screenshot_size):
+        """
+        Returns the locations of the encoded video and of the screenshot as
+        a tuple. Libraries that can do both in one go should override this.
+        """
+        encoded = self.get_encoded(size)
+        try:
+            return encoded, self.get_screenshot(screenshot_size)
+        except:
+            os.remove(encoded)
+            raise
+
     @classmethod
     def library_available(cls):
         pass
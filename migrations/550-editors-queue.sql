@@ -0,0 +1,14 @@
+CREATE TABLE `editors_queue` (
+    `id` int(11) unsigned AUTO_INCREMENT NOT NULL PRIMARY KEY,
+    `addon_id` int(11) unsigned NOT NULL,
+    `queue` varchar(20) NOT NULL,
+    `waiting_since` datetime NOT NULL,
+    UNIQUE (`addon_id`, `queue`)
+) ENGINE=InnoDB CHARACTER SET utf8 COLLATE utf8_general_ci;
+ALTER TABLE `editors_queue` ADD CONSTRAINT `addon_id_refs_id_editors_queue`
+    FOREIGN KEY (`addon_id`) REFERENCES `addons` (`id`) ON DELETE CASCADE;
+CREATE INDEX `editors_queue_waiting` ON `editors_queue` (`queue`, `waiting_since`);
+
+INSERT INTO waffle_switch_amo (name, active, created, modified, note)
+    VALUES ('editors-queue-table', 0, NOW(), NOW(),
+            'Count the editor queues from the materialised editors_queue table');
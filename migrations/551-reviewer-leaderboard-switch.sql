@@ -0,0 +1,6 @@
+INSERT INTO waffle_switch_amo (name, active, created, modified, note)
+    VALUES ('reviewer-leaderboard-redis', 0, NOW(), NOW(),
+            'Serve the reviewer leaderboards from redis sorted sets');
+INSERT INTO waffle_switch_mkt (name, active, created, modified, note)
+    VALUES ('reviewer-leaderboard-redis', 0, NOW(), NOW(),
+            'Serve the reviewer leaderboards from redis sorted sets');
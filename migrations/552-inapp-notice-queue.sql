@@ -0,0 +1,19 @@
+CREATE TABLE `addon_inapp_notice_queue` (
+    `id` int(11) unsigned AUTO_INCREMENT NOT NULL PRIMARY KEY,
+    `created` datetime NOT NULL,
+    `modified` datetime NOT NULL,
+    `notice` int(11) unsigned NOT NULL,
+    `payment_id` int(11) unsigned NOT NULL,
+    `reason` varchar(20) NOT NULL,
+    `attempts` int(11) unsigned NOT NULL,
+    `next_attempt` datetime NOT NULL
+) ENGINE=InnoDB CHARACTER SET utf8 COLLATE utf8_general_ci;
+
+ALTER TABLE `addon_inapp_notice_queue` ADD CONSTRAINT `payment_id_refs_id_notice_queue`
+    FOREIGN KEY (`payment_id`) REFERENCES `addon_inapp_payment` (`id`)
+    ON DELETE CASCADE;
+CREATE INDEX `addon_inapp_notice_queue_next_attempt` ON `addon_inapp_notice_queue` (`next_attempt`);
+
+INSERT INTO waffle_switch_mkt (name, active, created, modified, note)
+    VALUES ('inapp-notice-queue', 0, NOW(), NOW(),
+            'Deliver in-app payment notices through the concurrent notice queue');
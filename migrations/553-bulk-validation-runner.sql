@@ -0,0 +1,3 @@
+INSERT INTO waffle_switch_amo (name, active, created, modified, note)
+    VALUES ('bulk-validation-runner', 0, NOW(), NOW(),
+            'Validate bulk validation jobs with the process pool runner');
@@ -0,0 +1,3 @@
+INSERT INTO waffle_switch_mkt (name, active, created, modified, note)
+    VALUES ('presign-packaged-apps', 0, NOW(), NOW(),
+            'Sign packaged apps when they are approved and only serve signed files');
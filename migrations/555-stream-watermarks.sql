@@ -0,0 +1,3 @@
+INSERT INTO waffle_switch_amo (name, active, created, modified, note)
+    VALUES ('stream-watermarks', 0, NOW(), NOW(),
+            'Stream watermarked add-ons to the response instead of writing copies');
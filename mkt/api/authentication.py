@@ -1,8 +1,10 @@
+import hashlib
 import json
 from urlparse import urljoin
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 
 import commonware.log
 import oauth2
@@ -12,7 +14,9 @@ from tastypie.authorization import Authorization
 
 from access import acl
 from access.middleware import ACLMiddleware
-from mkt.api.models import Access
+from users.models import RequestUser
+
+from mkt.api.models import Access, consumer_cache_key
 
 log = commonware.log.getLogger('z.api')
 
@@ -64,9 +68,54 @@ errors = {
     'headers': 'Error with OAuth headers',
     'roles': 'Cannot be a user with roles.',
     'terms': 'Terms of service not accepted.',
+    'replay': 'OAuth nonce has already been used.',
 }
 
 
+class Consumer(oauth2.Consumer):
+    """
+    An API consumer with everything authentication needs about its owner
+    resolved up front, so it can be cached as a whole.
+    """
+
+    def __init__(self, access, profile, groups):
+        super(Consumer, self).__init__(access.key, access.secret)
+        self.user = access.user
+        self.profile = profile
+        self.groups = groups
+
+
+def get_consumer(key):
+    """
+    Returns the Consumer for `key`, from the cache if we can. Raises
+    Access.DoesNotExist for unknown keys or keys without a profile.
+    """
+    cache_key = consumer_cache_key(key)
+    consumer = cache.get(cache_key)
+    if consumer is None:
+        access = Access.objects.select_related('user').get(key=key)
+        try:
+            profile = RequestUser.objects.get(pk=access.user_id)
+        except RequestUser.DoesNotExist:
+            log.info('No RequestUser found for: %s' % access.user_id)
+            raise Access.DoesNotExist
+        consumer = Consumer(access, profile, list(profile.groups.all()))
+        cache.set(cache_key, consumer, settings.API_CONSUMER_CACHE_TIMEOUT)
+    return consumer
+
+
+def check_nonce(key, oauth_request):
+    """
+    Returns False if this nonce and timestamp have been seen for `key`
+    before. Only needs to remember them for as long as oauth2 accepts the
+    timestamp.
+    """
+    nonce = '%s:%s:%s' % (key, oauth_request.get('oauth_nonce'),
+                          oauth_request.get('oauth_timestamp'))
+    return cache.add('api:nonce:%s' % hashlib.md5(nonce).hexdigest(), 1,
+                     oauth_server.timestamp_threshold)
+
+
 class MarketplaceAuthentication(Authentication):
     """
     This is based on https://github.com/amrox/django-tastypie-two-legged-oauth
@@ -95,8 +144,12 @@ class MarketplaceAuthentication(Authentication):
             if not key:
                 return None
 
-            consumer = Access.objects.get(key=key)
+            consumer = get_consumer(key)
             oauth_server.verify_request(oauth_request, consumer, None)
+            if not check_nonce(key, oauth_request):
+                log.info(u'Replayed OAuth request for key: %s' % key)
+                request.user = AnonymousUser()
+                return self._error('replay')
             # Set the current user to be the consumer owner.
             request.user = consumer.user
 
@@ -110,7 +163,7 @@ class MarketplaceAuthentication(Authentication):
             request.user = AnonymousUser()
             return self._error('headers')
 
-        ACLMiddleware().process_request(request)
+        ACLMiddleware().set_user(request, consumer.profile, consumer.groups)
 
         # Do not allow access without agreeing to the dev agreement.
         if not request.amo_user.read_dev_agreement:
@@ -120,7 +173,7 @@ class MarketplaceAuthentication(Authentication):
 
         # But you cannot have one of these roles.
         denied_groups = set(['Admins'])
-        roles = set(request.amo_user.groups.values_list('name', flat=True))
+        roles = set(group.name for group in consumer.groups)
         if roles and roles.intersection(denied_groups):
             log.info(u'Attempt to use API with denied role, user: %s'
                      % request.amo_user.pk)
@@ -146,6 +199,12 @@ class OptionalAuthentication(MarketplaceAuthentication):
                 .is_authenticated(request, **kw))
 
 
+# The server holds no per-request state, so one will do.
+oauth_server = oauth2.Server(signature_methods={
+    'HMAC-SHA1': oauth2.SignatureMethod_HMAC_SHA1()
+    })
+
+
 def initialize_oauth_server_request(request):
     """
     OAuth initialization.
@@ -175,9 +234,6 @@ def initialize_oauth_server_request(request):
     oauth_request = oauth2.Request.from_request(
             method, url, headers=auth_header,
             query_string=request.META['QUERY_STRING'])
-    oauth_server = oauth2.Server(signature_methods={
-        'HMAC-SHA1': oauth2.SignatureMethod_HMAC_SHA1()
-        })
     return oauth_server, oauth_request
 
 
@@ -1,8 +1,14 @@
+import hashlib
 import os
 
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 
+from access.models import Group, GroupUser
 from amo.models import ModelBase
+from users.models import RequestUser, UserProfile
 
 
 class Access(ModelBase):
@@ -16,3 +22,53 @@ class Access(ModelBase):
 
 def generate():
     return os.urandom(64).encode('hex')
+
+
+def consumer_cache_key(key):
+    return 'api:consumer:%s' % hashlib.md5(key).hexdigest()
+
+
+def invalidate_consumers(user_ids):
+    """Drop the cached API consumers belonging to any of `user_ids`."""
+    keys = Access.objects.filter(user__in=user_ids).values_list('key',
+                                                                flat=True)
+    cache.delete_many([consumer_cache_key(k) for k in keys])
+
+
+@receiver(pre_save, sender=Access, dispatch_uid='api_access_pre_save')
+def access_pre_save(sender, instance, **kw):
+    # The key may be changing, so forget whatever it was before.
+    if instance.pk:
+        keys = list(Access.objects.no_cache().filter(pk=instance.pk)
+                    .values_list('key', flat=True))
+        cache.delete_many([consumer_cache_key(k) for k in keys])
+
+
+@receiver(post_delete, sender=Access, dispatch_uid='api_access_post_delete')
+def access_post_delete(sender, instance, **kw):
+    cache.delete(consumer_cache_key(instance.key))
+
+
+def groupuser_changed(sender, instance, **kw):
+    # Profile ids and auth user ids are the same.
+    invalidate_consumers([instance.user_id])
+
+
+def group_changed(sender, instance, **kw):
+    invalidate_consumers(list(instance.users.values_list('id', flat=True)))
+
+
+def profile_changed(sender, instance, **kw):
+    invalidate_consumers([instance.pk])
+
+
+post_save.connect(groupuser_changed, sender=GroupUser,
+                  dispatch_uid='api_groupuser_post_save')
+post_delete.connect(groupuser_changed, sender=GroupUser,
+                    dispatch_uid='api_groupuser_post_delete')
+post_save.connect(group_changed, sender=Group,
+                  dispatch_uid='api_group_post_save')
+# RequestUser is a proxy, so its saves are sent with their own sender.
+for sender in (UserProfile, RequestUser):
+    post_save.connect(profile_changed, sender=sender,
+                      dispatch_uid='api_%s_post_save' % sender.__name__)
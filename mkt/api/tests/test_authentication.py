@@ -145,6 +145,44 @@ class TestMarketplaceAuthentication(TestCase):
         self.add_group_user(self.profile, 'App Reviewers')
         ok_(self.auth.is_authenticated(self.call()))
 
+    def test_consumer_cached(self):
+        ok_(self.auth.is_authenticated(self.call()))
+        req = self.call()
+        with self.assertNumQueries(0):
+            ok_(self.auth.is_authenticated(req))
+        eq_(req.amo_user.pk, self.profile.pk)
+
+    def test_cache_group_change(self):
+        ok_(self.auth.is_authenticated(self.call()))
+        self.add_group_user(self.profile, 'Admins')
+        res = self.auth.is_authenticated(self.call())
+        eq_(res.status_code, 401)
+        eq_(json.loads(res.content)['reason'], errors['roles'])
+
+    def test_cache_agreement_change(self):
+        ok_(self.auth.is_authenticated(self.call()))
+        self.profile.update(read_dev_agreement=None)
+        res = self.auth.is_authenticated(self.call())
+        eq_(res.status_code, 401)
+        eq_(json.loads(res.content)['reason'], errors['terms'])
+
+    def test_cache_key_change(self):
+        ok_(self.auth.is_authenticated(self.call()))
+        client = OAuthClient(Mock(key=self.access.key,
+                                  secret=self.access.secret))
+        self.access.key = 'bar'
+        self.access.save()
+        res = self.auth.is_authenticated(self.call(client=client))
+        eq_(res.status_code, 401)
+        eq_(json.loads(res.content)['reason'], errors['headers'])
+
+    def test_replay(self):
+        req = self.call()
+        ok_(self.auth.is_authenticated(req))
+        res = self.auth.is_authenticated(req)
+        eq_(res.status_code, 401)
+        eq_(json.loads(res.content)['reason'], errors['replay'])
+
     def test_session_auth(self):
         req = RequestFactory().get('/')
         req.user = self.profile.user
@@ -7,11 +7,18 @@ import amo
 import mkt
 from addons.models import Category
 
-from mkt.home.views import _add_mobile_filter
+from constants.applications import DEVICE_GAIA, DEVICE_MOBILE
 from mkt.search.views import _app_search
 from mkt.webapps.models import Webapp
 
 
+def _listing_device(request):
+    if request.GAIA:
+        return DEVICE_GAIA
+    elif request.MOBILE:
+        return DEVICE_MOBILE
+
+
 # Currently unused.
 def _landing(request, category=None):
     region = getattr(request, 'REGION', mkt.regions.WORLDWIDE)
@@ -20,11 +27,10 @@ def _landing(request, category=None):
             Category.objects.filter(type=amo.ADDON_WEBAPP, weight__gte=0),
             slug=category)
         featured = Webapp.featured(cat=category, region=region)
-        popular = _add_mobile_filter(request,
-            Webapp.popular(cat=category, region=region))
     else:
-        popular = _add_mobile_filter(request, Webapp.popular(region=region))
         featured = Webapp.featured(region=region)
+    popular = Webapp.listing('popular', cat=category, region=region,
+                             device=_listing_device(request))
 
     return jingo.render(request, 'browse/landing.html', {
         'category': category,
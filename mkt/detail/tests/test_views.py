@@ -5,6 +5,7 @@ import zipfile
 
 from django.conf import settings
 from django.core import mail
+from django.core.cache import cache
 from django.core.files.storage import default_storage as storage
 from django.utils.html import strip_tags
 
@@ -28,7 +29,8 @@ from versions.models import Version
 
 import mkt
 from mkt.site.fixtures import fixture
-from mkt.webapps.models import AddonExcludedRegion, Webapp
+from mkt.webapps.models import (AddonExcludedRegion, manifest_etag_key,
+                                Webapp)
 
 
 def get_clean(selection):
@@ -997,6 +999,41 @@ class TestPackagedManifest(DetailBase):
         eq_(res.content, '')
         eq_(res.status_code, 304)
 
+    @mock.patch('mkt.webapps.models.Webapp.get_cached_manifest')
+    def test_stored_etag(self, _mock):
+        _mock.return_value = self._mocked_json()
+        etag = self.client.get(self.url)['ETag']
+        with mock.patch('mkt.detail.views.get_object_or_404') as get:
+            res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            eq_(res.status_code, 304)
+            eq_(res['ETag'], etag)
+            assert not get.called
+
+    @mock.patch('mkt.webapps.models.Webapp.get_cached_manifest')
+    def test_stored_etag_forgotten(self, _mock):
+        _mock.return_value = self._mocked_json()
+        etag = self.client.get(self.url)['ETag']
+        self.app.update(disabled_by_user=True)
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        eq_(res.status_code, 404)
+
+    @mock.patch('mkt.webapps.models.Webapp.get_cached_manifest')
+    def test_stored_etag_new_file(self, _mock):
+        _mock.return_value = self._mocked_json()
+        etag = self.client.get(self.url)['ETag']
+        self.app.get_latest_file().update(hash='sha256:foo')
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        eq_(res.status_code, 200)
+        assert res['ETag'] != etag
+
+    @mock.patch('mkt.webapps.models.Webapp.get_cached_manifest')
+    def test_no_stored_etag_pending(self, _mock):
+        self.login_as_reviewer()
+        self.app.update(status=amo.STATUS_PENDING)
+        _mock.return_value = self._mocked_json()
+        self.client.get(self.url)
+        eq_(cache.get(manifest_etag_key(self.app.guid)), None)
+
     def test_app_pending(self):
         self.app.update(status=amo.STATUS_PENDING)
         res = self.client.get(self.url)
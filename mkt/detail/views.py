@@ -1,7 +1,7 @@
-import hashlib
-
 from django import http
+from django.core.cache import cache
 from django.shortcuts import get_object_or_404, redirect
+from django.utils.http import parse_etags, quote_etag
 from django.views.decorators.http import etag
 
 import commonware.log
@@ -21,7 +21,7 @@ from reviews.views import get_flags
 
 from mkt.site import messages
 from mkt.site.forms import AbuseForm
-from mkt.webapps.models import Webapp
+from mkt.webapps.models import manifest_etag_key, Webapp
 
 log = commonware.log.getLogger('z.detail')
 
@@ -64,29 +64,29 @@ def manifest(request, uuid):
     If not a packaged app, returns a 404.
 
     """
+    # Devices poll this for updates: public apps that haven't changed are
+    # answered from the stored ETag, without loading anything.
+    stored_etag = cache.get(manifest_etag_key(uuid))
+    if (stored_etag and request.method in ('GET', 'HEAD') and
+        stored_etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH',
+                                                    ''))):
+        response = http.HttpResponseNotModified()
+        response['ETag'] = quote_etag(stored_etag)
+        return response
+
     addon = get_object_or_404(Webapp, guid=uuid, is_packaged=True)
 
     is_reviewer = acl.check_reviewer(request)
     is_dev = addon.has_author(request.amo_user)
     is_avail = addon.status in [amo.STATUS_PUBLIC, amo.STATUS_BLOCKED]
 
-    package_etag = hashlib.md5()
-
     if (not addon.is_packaged or addon.disabled_by_user or
         not (is_avail or is_reviewer or is_dev)):
         raise http.Http404
 
-    else:
-        manifest_content = addon.get_cached_manifest()
-        package_etag.update(manifest_content)
-
-        if addon.is_packaged:
-            # Update the hash with the content of the package itself.
-            package_file = addon.get_latest_file()
-            if package_file:
-                package_etag.update(package_file.hash)
-
-    manifest_etag = package_etag.hexdigest()
+    manifest_content = addon.get_cached_manifest()
+    # The ETag also covers the content of the package itself.
+    manifest_etag = addon.update_manifest_etag(manifest_content)
 
     @etag(lambda r, a: manifest_etag)
     def _inner_view(request, addon):
@@ -206,7 +206,12 @@ class PreviewForm(happyforms.ModelForm):
     unsaved_image_type = forms.CharField(required=False,
                                          widget=forms.HiddenInput)
 
-    def save(self, addon, commit=True):
+    def save(self, addon, commit=True, videos=None):
+        """
+        Saves the preview and queues its resize. If a `videos` list is
+        passed, a video's (path, preview) is added to it instead, to be
+        resized with the others.
+        """
         if self.cleaned_data:
             self.instance.addon = addon
             if self.cleaned_data.get('DELETE'):
@@ -225,9 +230,12 @@ class PreviewForm(happyforms.ModelForm):
                                    .replace('-', '/'))
                 if filetype in amo.VIDEO_TYPES:
                     self.instance.update(filetype=filetype)
-                    vtasks.resize_video.delay(upload_path, self.instance,
-                                              user=amo.get_user(),
-                                              set_modified_on=[self.instance])
+                    if videos is not None:
+                        videos.append((upload_path, self.instance))
+                    else:
+                        vtasks.resize_video.delay(
+                            upload_path, self.instance, user=amo.get_user(),
+                            set_modified_on=[self.instance])
                 else:
                     self.instance.update(filetype='image/png')
                     tasks.resize_preview.delay(upload_path, self.instance,
@@ -387,6 +395,19 @@ class BasePreviewFormSet(BaseModelFormSet):
             raise forms.ValidationError(
                 _('You must upload at least one screenshot or video.'))
 
+    def save(self, addon):
+        """
+        Saves the previews, queueing the resize of all the new videos in one
+        task so they are encoded in parallel.
+        """
+        videos = []
+        for form in self.forms:
+            form.save(addon, videos=videos)
+        if videos:
+            vtasks.resize_videos.delay(
+                videos, user=amo.get_user(),
+                set_modified_on=[instance for src, instance in videos])
+
 
 PreviewFormSet = modelformset_factory(Preview, formset=BasePreviewFormSet,
                                       form=PreviewForm, can_delete=True,
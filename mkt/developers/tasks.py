@@ -17,6 +17,7 @@ from django.conf import settings
 from django.core.files.storage import default_storage as storage
 from django.utils.http import urlencode
 
+import appvalidator
 from appvalidator import validate_app, validate_packaged_app
 from celery_tasktree import task_with_callbacks
 from celeryutils import task
@@ -30,7 +31,7 @@ from amo.decorators import set_modified_on, write
 from amo.helpers import absolutify
 from amo.utils import remove_icons, resize_image, send_mail_jinja, strip_bom
 from files.models import FileUpload, File, FileValidation
-from files.utils import SafeUnzip
+from files.utils import cached_validation, package_revision, SafeUnzip
 
 from mkt.constants import APP_IMAGE_SIZES, APP_PREVIEW_SIZES
 from mkt.webapps.models import AddonExcludedRegion, ImageAsset, Webapp
@@ -101,7 +102,13 @@ def file_validator(file_id, **kw):
 
 def run_validator(file_path, url=None):
     """A pre-configured wrapper around the app validator."""
+    return cached_validation(file_path,
+                             lambda: _run_validator(file_path, url=url),
+                             'mkt', package_revision(appvalidator),
+                             settings.VALIDATOR_IAF_URLS, url)
 
+
+def _run_validator(file_path, url=None):
     with statsd.timer('mkt.developers.validator'):
         is_packaged = zipfile.is_zipfile(file_path)
         if is_packaged:
@@ -340,11 +347,20 @@ def get_preview_sizes(ids, **kw):
                           % (addon.pk, err))
 
 
-def _fetch_content(url):
+class NotModified(Exception):
+    """Raised when a conditional request was answered with a 304."""
+
+
+def _fetch_content(url, headers=None):
     with statsd.timer('developers.tasks.fetch_content'):
         try:
+            if headers:
+                return urllib2.urlopen(urllib2.Request(url, headers=headers),
+                                       timeout=30)
             return urllib2.urlopen(url, timeout=30)
         except urllib2.HTTPError, e:
+            if e.code == 304:
+                raise NotModified(url)
             raise Exception(
                 _('%s responded with %s (%s).') % (url, e.code, e.msg))
         except urllib2.URLError, e:
@@ -460,7 +476,14 @@ def failed_validation(*messages, **kwargs):
 
 
 CT_URL = 'https://developer.mozilla.org/en/Apps/Manifest#Serving_manifests'
-def _fetch_manifest(url, upload=None):
+def _fetch_manifest(url, upload=None, validators=None):
+    """
+    Fetch and sanity check the manifest at `url`.
+
+    If `validators` is a dict, its `etag` and `last_modified` values are sent
+    as a conditional request and `NotModified` is raised on a 304. On success
+    the dict is updated in place with the validators of the new response.
+    """
     def fail(message, upload=None):
         if upload is None:
             # If `upload` is None, that means we're using one of @washort's old
@@ -468,8 +491,17 @@ def _fetch_manifest(url, upload=None):
             raise Exception(message)
         upload.update(validation=failed_validation(message, upload=upload))
 
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
     try:
-        response = _fetch_content(url)
+        response = _fetch_content(url, headers=headers)
+    except NotModified:
+        raise
     except Exception, e:
         log.error('Failed to fetch manifest from %r: %s' % (url, e))
         fail(_('No manifest was found at that URL. Check the address and try '
@@ -511,6 +543,15 @@ def _fetch_manifest(url, upload=None):
                  upload=upload)
 
     content = strip_bom(content)
+
+    if validators is not None:
+        validators.clear()
+        for header, key in (('ETag', 'etag'),
+                            ('Last-Modified', 'last_modified')):
+            value = response.headers.get(header)
+            if value:
+                validators[key] = value
+
     return content
 
 
@@ -194,6 +194,46 @@ class TestValidator(amo.tests.TestCase):
         assert _mock.called
 
 
+class TestRunValidator(amo.tests.TestCase):
+
+    def setUp(self):
+        self.zip = os.path.join(settings.ROOT,
+                                'mkt/submit/tests/packaged/mozball.zip')
+        patcher = mock.patch('mkt.developers.tasks.validate_packaged_app')
+        self.validate = patcher.start()
+        self.validate.return_value = '{"errors": 0}'
+        self.addCleanup(patcher.stop)
+
+    def test_no_cache(self):
+        with self.settings(VALIDATION_CACHE_TIMEOUT=0):
+            tasks.run_validator(self.zip)
+            tasks.run_validator(self.zip)
+        eq_(self.validate.call_count, 2)
+
+    def test_cached(self):
+        with self.settings(VALIDATION_CACHE_TIMEOUT=60):
+            eq_(tasks.run_validator(self.zip), '{"errors": 0}')
+            eq_(tasks.run_validator(self.zip), '{"errors": 0}')
+        eq_(self.validate.call_count, 1)
+
+    def test_options_in_key(self):
+        with self.settings(VALIDATION_CACHE_TIMEOUT=60):
+            tasks.run_validator(self.zip)
+            tasks.run_validator(self.zip, url='http://example.com/')
+            with self.settings(VALIDATOR_IAF_URLS=['http://example.com']):
+                tasks.run_validator(self.zip)
+        eq_(self.validate.call_count, 3)
+
+    @mock.patch('mkt.developers.tasks.package_revision')
+    def test_revision_in_key(self, package_revision):
+        with self.settings(VALIDATION_CACHE_TIMEOUT=60):
+            package_revision.return_value = 'old'
+            tasks.run_validator(self.zip)
+            package_revision.return_value = 'new'
+            tasks.run_validator(self.zip)
+        eq_(self.validate.call_count, 2)
+
+
 storage_open = storage.open
 def _mock_hide_64px_icon(path, *args, **kwargs):
     """
@@ -409,6 +449,24 @@ class TestFetchManifest(amo.tests.TestCase):
             'No manifest was found at that URL. Check the address and try '
             'again.')
 
+    def test_conditional_request(self):
+        with self.patch_urlopen() as ur:
+            ur.read.return_value = 'woo'
+            ur.headers = {'Content-Type': self.content_type,
+                          'ETag': '"new"'}
+        validators = {'etag': '"old"', 'last_modified': 'yesterday'}
+        eq_(tasks._fetch_manifest('url', validators=validators), 'woo')
+        req = self.urlopen_mock.call_args[0][0]
+        eq_(req.get_header('If-none-match'), '"old"')
+        eq_(req.get_header('If-modified-since'), 'yesterday')
+        eq_(validators, {'etag': '"new"'})
+
+    def test_not_modified(self):
+        self.urlopen_mock.side_effect = urllib2.HTTPError(
+            'url', 304, 'Not Modified', [], None)
+        with self.assertRaises(tasks.NotModified):
+            tasks._fetch_manifest('url', validators={'etag': '"old"'})
+
     def test_strip_utf8_bom(self):
         with self.patch_urlopen() as ur:
             with open(self.file('utf8bom.webapp')) as fp:
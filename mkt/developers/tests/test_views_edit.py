@@ -780,12 +780,21 @@ class TestEditMedia(TestEdit):
         assert any(e.startswith('Please use') for e in res['errors']), (
                 res['errors'])
 
-    @mock.patch('lib.video.tasks.resize_video')
+    @mock.patch('lib.video.tasks.resize_videos')
     @mock.patch('mimetypes.guess_type', lambda *a: ('video/webm', 'webm'))
-    def test_edit_preview_video_add(self, resize_video):
+    def test_edit_preview_video_add(self, resize_videos):
         self.preview_video_add()
         eq_(str(self.get_webapp().previews.all()[0].caption), 'hi')
 
+    @mock.patch('lib.video.tasks.resize_videos')
+    @mock.patch('mimetypes.guess_type', lambda *a: ('video/webm', 'webm'))
+    def test_edit_preview_videos_resized_together(self, resize_videos):
+        self.preview_video_add(num=2)
+        eq_(resize_videos.delay.call_count, 1)
+        videos = resize_videos.delay.call_args[0][0]
+        eq_(sorted(instance.pk for src, instance in videos),
+            sorted(self.get_webapp().previews.values_list('pk', flat=True)))
+
     def test_edit_preview_add(self):
         self.preview_add()
         eq_(str(self.get_webapp().previews.all()[0].caption), 'hi')
@@ -616,8 +616,7 @@ def addons_section(request, addon_id, addon, section, editable=False,
                     update_manifests([addon.pk])
 
                 if previews:
-                    for preview in previews.forms:
-                        preview.save(addon)
+                    previews.save(addon)
 
                 if image_assets:
                     image_assets.save()
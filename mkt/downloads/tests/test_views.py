@@ -1,3 +1,5 @@
+from django.core.files.storage import default_storage as storage
+
 import mock
 from nose.tools import eq_
 
@@ -68,3 +70,23 @@ class TestDownload(BasePackagedAppTest):
         res = self.client.get(self.url)
         eq_(res.status_code, 200)
         assert 'x-sendfile' in res
+
+    @mock.patch('lib.crypto.packaged.sign')
+    def test_presigned(self, sign):
+        self.create_switch('presign-packaged-apps')
+        assert storage.exists(self.file.signed_file_path)
+        res = self.client.get(self.url)
+        eq_(res.status_code, 200)
+        assert 'x-sendfile' in res._headers
+        assert not sign.called
+
+    @mock.patch('lib.crypto.packaged.sign')
+    @mock.patch('lib.crypto.packaged.queue_sign')
+    def test_not_presigned(self, queue_sign, sign):
+        self.create_switch('presign-packaged-apps')
+        storage.delete(self.file.signed_file_path)
+        res = self.client.get(self.url)
+        eq_(res.status_code, 503)
+        eq_(res['Retry-After'], '30')
+        queue_sign.assert_called_with(self.file.version_id)
+        assert not sign.called
@@ -1,12 +1,16 @@
 from django import http
+from django.conf import settings
+from django.core.files.storage import default_storage as storage
 from django.shortcuts import get_object_or_404
 
 import commonware.log
+import waffle
 
 import amo
 from access import acl
 from amo.utils import HttpResponseSendFile
 from files.models import File
+from lib.crypto import packaged
 from mkt.webapps.models import Webapp
 
 log = commonware.log.getLogger('z.downloads')
@@ -24,7 +28,18 @@ def download_file(request, file_id, type=None):
 
     # We treat blocked files like public files so users get the update.
     if file.status in [amo.STATUS_PUBLIC, amo.STATUS_BLOCKED]:
-        path = webapp.sign_if_packaged(file.version_id)
+        if waffle.switch_is_active('presign-packaged-apps'):
+            # Apps are signed when they are approved, never while the
+            # client waits for the signing server.
+            path = file.signed_file_path
+            if not storage.exists(path):
+                log.info('Package of %s is not signed yet.' % webapp.id)
+                packaged.queue_sign(file.version_id)
+                response = http.HttpResponse(status=503)
+                response['Retry-After'] = settings.SIGNED_APPS_RETRY_AFTER
+                return response
+        else:
+            path = webapp.sign_if_packaged(file.version_id)
 
     else:
         # This is someone asking for an unsigned packaged app.
@@ -0,0 +1,17 @@
+import commonware.log
+import cronjobs
+
+from mkt.inapp_pay.tasks import deliver_notices
+
+log = commonware.log.getLogger('z.cron')
+
+
+@cronjobs.register
+def deliver_inapp_notices():
+    """
+    Deliver any queued in-app payment notices that are due.
+
+    Notices are normally delivered as soon as they're queued, this picks up
+    the retries and anything queued while a delivery was running.
+    """
+    deliver_notices()
@@ -4,7 +4,7 @@ from django.conf import settings
 from django.db import transaction
 from django.core.management.base import BaseCommand, CommandError
 
-from mkt.inapp_pay.models import InappConfig
+from mkt.inapp_pay.models import forget_private_keys, InappConfig
 
 
 class Command(BaseCommand):
@@ -41,6 +41,8 @@ class Command(BaseCommand):
                 num += 1
                 old_val = cfg.get_private_key()
                 cfg.set_private_key(old_val)
+        # Nothing cached under the old key is any use now.
+        forget_private_keys()
         print 'Values migrated to new encryption key: %s' % num
         print ('It is now safe to remove key %r from disk and settings'
                % options['old_timestamp'])
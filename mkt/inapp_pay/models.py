@@ -1,9 +1,12 @@
+from datetime import datetime
 import random
+import time
 import urlparse
 
 from django.conf import settings
 from django.db import connection, models
 from django.core.files.storage import default_storage as storage
+from django.dispatch import receiver
 
 from tower import ugettext_lazy as _lazy
 
@@ -55,6 +58,14 @@ class InappConfig(amo.models.ModelBase):
 
     def get_private_key(self):
         """Get the real private key from the database."""
+        # Only keys pinned to a timestamp can be cached, otherwise we
+        # wouldn't notice the latest key changing.
+        cache_key = (self.id, self.key_timestamp)
+        if self.key_timestamp:
+            secret, expires = _private_keys.get(cache_key, (None, 0))
+            if expires > time.time():
+                return secret
+
         timestamp, key = _get_key(timestamp=self.key_timestamp)
         cursor = connection.cursor()
         cursor.execute('select AES_DECRYPT(private_key, %s) '
@@ -63,7 +74,11 @@ class InappConfig(amo.models.ModelBase):
         if not secret:
             raise ValueError('Secret was empty! It either was not set or '
                              'the decryption key is wrong')
-        return str(secret)  # make sure it is in bytes
+        secret = str(secret)  # make sure it is in bytes
+        if self.key_timestamp and settings.INAPP_KEY_CACHE_TIMEOUT:
+            _private_keys[cache_key] = (
+                secret, time.time() + settings.INAPP_KEY_CACHE_TIMEOUT)
+        return secret
 
     def has_private_key(self):
         return bool(self._encrypted_private_key)
@@ -78,6 +93,7 @@ class InappConfig(amo.models.ModelBase):
                        'private_key = AES_ENCRYPT(%s, %s), '
                        'key_timestamp = %s WHERE id=%s',
                        [raw_value, key, timestamp, self.id])
+        forget_private_keys(self.id)
 
     @classmethod
     def any_active(cls, addon, exclude_config=None):
@@ -145,6 +161,28 @@ class InappConfig(amo.models.ModelBase):
             return InappImage.default_image_url()
 
 
+# Decrypted private keys for this process, as
+# {(config id, key timestamp): (secret, expiry time)}.
+_private_keys = {}
+
+
+def forget_private_keys(config_id=None):
+    """Drop the cached private keys of a config, or of all of them."""
+    if config_id is None:
+        _private_keys.clear()
+        return
+    for cache_key in _private_keys.keys():
+        if cache_key[0] == config_id:
+            _private_keys.pop(cache_key, None)
+
+
+@receiver(models.signals.post_save, sender=InappConfig,
+          dispatch_uid='inapp_config_forget_keys')
+def inapp_config_saved(sender, instance, **kw):
+    # Revoking or disabling payments must not leave a usable key behind.
+    forget_private_keys(instance.id)
+
+
 def limited_keygen(gen_key, max_tries):
     for try_ in range(max_tries):
         yield gen_key()
@@ -246,6 +284,19 @@ class InappPayNotice(amo.models.ModelBase):
         db_table = 'addon_inapp_notice'
 
 
+class InappNoticeQueue(amo.models.ModelBase):
+    """A notice waiting to be delivered to the app, see deliver_notices."""
+    notice = models.IntegerField(choices=amo.INAPP_NOTICE_CHOICES)
+    payment = models.ForeignKey(InappPayment)
+    # Chargeback reason, either 'reversal' or 'refund'.
+    reason = models.CharField(max_length=20, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt = models.DateTimeField(default=datetime.now, db_index=True)
+
+    class Meta:
+        db_table = 'addon_inapp_notice_queue'
+
+
 class InappImage(amo.models.ModelBase):
     config = models.ForeignKey(InappConfig, related_name='images')
     image_url = models.CharField(max_length=255, db_index=True)
@@ -1,29 +1,34 @@
-import calendar
 from datetime import datetime, timedelta
 import logging
 import os
 import tempfile
-import time
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import default_storage as storage
 from django.db import transaction
 
 from celeryutils import task
-import jwt
 import requests
+import waffle
 
 import amo
 from amo.decorators import write
 from amo.utils import ImageCheck, resize_image
 
-from .models import InappPayment, InappPayNotice, InappImage, InappConfig
-from .utils import send_pay_notice
+from . import utils
+from .models import (InappConfig, InappImage, InappNoticeQueue, InappPayment,
+                     InappPayNotice)
+from .utils import send_pay_notice, sign_notice
 
 log = logging.getLogger('z.inapp_pay.tasks')
 notify_kw = dict(default_retry_delay=15,  # seconds
                  max_tries=5)
 
+DELIVERY_LOCK = 'inapp:deliver-notices'
+# A run that takes longer than this is assumed dead.
+DELIVERY_LOCK_TIMEOUT = 60 * 10
+
 
 @task(**notify_kw)
 @write
@@ -32,6 +37,9 @@ def payment_notify(payment_id, **kw):
 
     payment_id: pk of InappPayment
     """
+    if waffle.switch_is_active('inapp-notice-queue'):
+        _queue_notice(payment_id, amo.INAPP_NOTICE_PAY)
+        return
     log.debug('sending payment notice for payment %s' % payment_id)
     _notify(payment_id, amo.INAPP_NOTICE_PAY, payment_notify)
 
@@ -44,6 +52,9 @@ def chargeback_notify(payment_id, reason, **kw):
     payment_id: pk of InappPayment
     reason: either 'reversal' or 'refund'
     """
+    if waffle.switch_is_active('inapp-notice-queue'):
+        _queue_notice(payment_id, amo.INAPP_NOTICE_CHARGEBACK, reason=reason)
+        return
     log.debug('sending chargeback notice for payment %s, reason %r'
               % (payment_id, reason))
     _notify(payment_id, amo.INAPP_NOTICE_CHARGEBACK,
@@ -55,28 +66,8 @@ def _notify(payment_id, notice_type, notifier_task, extra_response=None):
     payment = InappPayment.objects.get(pk=payment_id)
     config = payment.config
     contrib = payment.contribution
-    if notice_type == amo.INAPP_NOTICE_PAY:
-        typ = 'mozilla/payments/pay/postback/v1'
-    elif notice_type == amo.INAPP_NOTICE_CHARGEBACK:
-        typ = 'mozilla/payments/pay/chargeback/v1'
-    else:
-        raise NotImplementedError('Unknown type: %s' % notice_type)
-    response = {'transactionID': contrib.pk}
-    if extra_response:
-        response.update(extra_response)
-    issued_at = calendar.timegm(time.gmtime())
-    signed_notice = jwt.encode({'iss': settings.INAPP_MARKET_ID,
-                                'aud': config.public_key,  # app ID
-                                'typ': typ,
-                                'iat': issued_at,
-                                'exp': issued_at + 3600,  # expires in 1 hour
-                                'request': {'priceTier': contrib.price_tier.pk,
-                                            'name': payment.name,
-                                            'description': payment.description,
-                                            'productdata': payment.app_data},
-                                'response': response},
-                               config.get_private_key(),
-                               algorithm='HS256')
+    signed_notice = sign_notice(payment, notice_type,
+                                extra_response=extra_response)
     url, success, last_error = send_pay_notice(notice_type, signed_notice,
                                                config, contrib, notifier_task)
 
@@ -89,6 +80,45 @@ def _notify(payment_id, notice_type, notifier_task, extra_response=None):
                                   last_error=last_error)
 
 
+def _queue_notice(payment_id, notice_type, reason=''):
+    log.debug('queueing notice %s for payment %s' % (notice_type, payment_id))
+    InappNoticeQueue.objects.create(payment_id=payment_id, notice=notice_type,
+                                    reason=reason)
+    deliver_notices.delay()
+
+
+@task
+@write
+def deliver_notices(**kw):
+    """
+    Deliver all the queued notices that are due, a batch at a time.
+
+    Only one of these runs at once; a notice queued while a run is in
+    progress is picked up by that run or by the next cron.
+    """
+    if not cache.add(DELIVERY_LOCK, 1, DELIVERY_LOCK_TIMEOUT):
+        log.debug('notice delivery already running')
+        return
+    try:
+        while True:
+            due = list(InappNoticeQueue.objects.no_cache()
+                       .filter(next_attempt__lte=datetime.now())
+                       .select_related('payment__config__addon',
+                                       'payment__contribution__price_tier')
+                       .order_by('next_attempt')
+                       [:settings.INAPP_NOTICE_BATCH_SIZE])
+            if not due:
+                break
+            log.info('delivering %s in-app notices' % len(due))
+            results = utils.deliver_notices(due)
+            log.info('delivered %s of %s in-app notices'
+                     % (len([r for r in results if r[1]]), len(due)))
+            if len(due) < settings.INAPP_NOTICE_BATCH_SIZE:
+                break
+    finally:
+        cache.delete(DELIVERY_LOCK)
+
+
 @task
 @transaction.commit_on_success
 def fetch_product_image(config_id, app_req, read_size=100000, **kw):
@@ -9,8 +9,8 @@ from nose.tools import eq_, raises
 
 import amo
 import amo.tests
-from mkt.inapp_pay.models import (InappConfig, TooManyKeyGenAttempts,
-                                  InappPayLog)
+from mkt.inapp_pay.models import (_private_keys, InappConfig,
+                                  TooManyKeyGenAttempts, InappPayLog)
 from mkt.inapp_pay import verify
 from mkt.inapp_pay.tests import resource
 from mkt.inapp_pay.verify import InappPaymentError
@@ -138,6 +138,36 @@ class TestInapp(amo.tests.TestCase):
                                 '2012-05-10': goodkey}):
             eq_(self.inapp.get_private_key(), sk)
 
+    @mock.patch.object(settings, 'DEBUG', True)
+    def test_private_key_cached(self):
+        sk = 'your coat is hidden under the stairs'
+        self.inapp.set_private_key(sk)
+        cfg = InappConfig.uncached.get(pk=self.inapp.pk)
+        eq_(cfg.get_private_key(), sk)
+        with self.assertNumQueries(0):
+            eq_(cfg.get_private_key(), sk)
+
+    @mock.patch.object(settings, 'DEBUG', True)
+    def test_private_key_forgotten(self):
+        self.inapp.set_private_key('sekret')
+        cfg = InappConfig.uncached.get(pk=self.inapp.pk)
+        cfg.get_private_key()
+        assert (cfg.pk, cfg.key_timestamp) in _private_keys
+        cfg.update(status=amo.INAPP_STATUS_REVOKED)
+        assert (cfg.pk, cfg.key_timestamp) not in _private_keys
+
+        cfg.get_private_key()
+        cfg.set_private_key('new sekret')
+        eq_(cfg.get_private_key(), 'new sekret')
+
+    @mock.patch.object(settings, 'DEBUG', True)
+    @mock.patch.object(settings, 'INAPP_KEY_CACHE_TIMEOUT', 0)
+    def test_private_key_cache_disabled(self):
+        self.inapp.set_private_key('sekret')
+        cfg = InappConfig.uncached.get(pk=self.inapp.pk)
+        cfg.get_private_key()
+        assert (cfg.pk, cfg.key_timestamp) not in _private_keys
+
     @raises(IndexError)
     @mock.patch.object(settings, 'DEBUG', True)
     def test_missing_date_str(self):
@@ -7,6 +7,7 @@ import time
 import urllib2
 
 from django.conf import settings
+from django.core.cache import cache
 
 import fudge
 from fudge.inspector import arg
@@ -19,7 +20,7 @@ import amo
 from users.models import UserProfile
 
 from mkt.inapp_pay import tasks
-from mkt.inapp_pay.models import InappPayNotice, InappImage
+from mkt.inapp_pay.models import InappImage, InappNoticeQueue, InappPayNotice
 from mkt.inapp_pay.tests.test_views import PaymentTest
 
 
@@ -243,6 +244,104 @@ class TestNotifyApp(TalkToAppTest):
         self.notify()
 
 
+@mock.patch.object(settings, 'DEBUG', True)
+@mock.patch('mkt.inapp_pay.utils.requests.session')
+class TestDeliverNotices(TalkToAppTest):
+
+    def setUp(self):
+        super(TestDeliverNotices, self).setUp()
+        self.contrib = self.make_contrib()
+        self.inapp_config.update(postback_url='/postback',
+                                 chargeback_url='/chargeback')
+        self.payment = self.make_payment(contrib=self.contrib)
+
+    def queue(self, **kw):
+        kw.setdefault('notice', amo.INAPP_NOTICE_PAY)
+        return InappNoticeQueue.objects.create(payment=self.payment, **kw)
+
+    def respond(self, session, text=None, exc=None):
+        post = session.return_value.post
+        if exc:
+            post.side_effect = exc
+        else:
+            post.return_value = mock.Mock(text=text or str(self.contrib.pk))
+        return post
+
+    @mock.patch('mkt.inapp_pay.tasks.deliver_notices.delay')
+    def test_queued_when_active(self, delay, session):
+        self.create_switch('inapp-notice-queue')
+        tasks.chargeback_notify(self.payment.pk, 'refund')
+        entry = InappNoticeQueue.objects.get()
+        eq_(entry.notice, amo.INAPP_NOTICE_CHARGEBACK)
+        eq_(entry.reason, 'refund')
+        assert delay.called
+        assert not session.return_value.post.called
+
+    def test_deliver(self, session):
+        post = self.respond(session)
+        self.queue(notice=amo.INAPP_NOTICE_CHARGEBACK, reason='reversal')
+        tasks.deliver_notices()
+        url, signed = post.call_args[0]
+        eq_(url, self.url('/chargeback'))
+        data = jwt.decode(signed, self.inapp_config.get_private_key(),
+                          verify=True)
+        eq_(data['response']['reason'], 'reversal')
+
+        notice = InappPayNotice.objects.get()
+        eq_(notice.success, True)
+        eq_(notice.url, url)
+        eq_(InappNoticeQueue.objects.count(), 0)
+
+    def test_one_session_per_app(self, session):
+        self.respond(session)
+        for i in range(3):
+            self.queue()
+        tasks.deliver_notices()
+        eq_(session.call_count, 1)
+        eq_(InappPayNotice.objects.filter(success=True).count(), 3)
+
+    def test_backoff(self, session):
+        self.respond(session, exc=Timeout())
+        entry = self.queue(attempts=1)
+        tasks.deliver_notices()
+        notice = InappPayNotice.objects.get()
+        eq_(notice.success, False)
+        assert notice.last_error.startswith('Timeout:'), notice.last_error
+
+        entry = InappNoticeQueue.objects.get(pk=entry.pk)
+        eq_(entry.attempts, 2)
+        delay = entry.next_attempt - datetime.now()
+        assert timedelta(seconds=20) < delay <= timedelta(seconds=30), delay
+
+    def test_bad_response(self, session):
+        self.respond(session, text='<not a valid response>')
+        self.queue()
+        tasks.deliver_notices()
+        eq_(InappPayNotice.objects.get().success, False)
+        eq_(InappNoticeQueue.objects.get().attempts, 1)
+
+    @mock.patch.object(settings, 'INAPP_NOTICE_MAX_ATTEMPTS', 3)
+    def test_give_up(self, session):
+        self.respond(session, exc=Timeout())
+        self.queue(attempts=2)
+        tasks.deliver_notices()
+        eq_(InappNoticeQueue.objects.count(), 0)
+
+    def test_not_due(self, session):
+        post = self.respond(session)
+        self.queue(next_attempt=datetime.now() + timedelta(minutes=1))
+        tasks.deliver_notices()
+        assert not post.called
+
+    def test_already_running(self, session):
+        post = self.respond(session)
+        self.queue()
+        cache.add(tasks.DELIVERY_LOCK, 1)
+        tasks.deliver_notices()
+        assert not post.called
+        eq_(InappNoticeQueue.objects.count(), 1)
+
+
 class TestFetchProductImage(TalkToAppTest):
 
     def setUp(self):
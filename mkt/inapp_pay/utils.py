@@ -1,13 +1,98 @@
+import calendar
+from collections import defaultdict
+from datetime import datetime, timedelta
 import logging
+from multiprocessing.pool import ThreadPool
+import threading
+import time
 import urlparse
 
+from django.conf import settings
+
+import jwt
 import requests
 
 import amo
 
+from .models import InappNoticeQueue, InappPayNotice
+
 log = logging.getLogger('z.inapp_pay.utils')
 
 
+def sign_notice(payment, notice_type, extra_response=None):
+    """Returns the JWT to send the app about `payment`, as a string."""
+    config = payment.config
+    contrib = payment.contribution
+    if notice_type == amo.INAPP_NOTICE_PAY:
+        typ = 'mozilla/payments/pay/postback/v1'
+    elif notice_type == amo.INAPP_NOTICE_CHARGEBACK:
+        typ = 'mozilla/payments/pay/chargeback/v1'
+    else:
+        raise NotImplementedError('Unknown type: %s' % notice_type)
+    response = {'transactionID': contrib.pk}
+    if extra_response:
+        response.update(extra_response)
+    issued_at = calendar.timegm(time.gmtime())
+    return jwt.encode({'iss': settings.INAPP_MARKET_ID,
+                       'aud': config.public_key,  # app ID
+                       'typ': typ,
+                       'iat': issued_at,
+                       'exp': issued_at + 3600,  # expires in 1 hour
+                       'request': {'priceTier': contrib.price_tier.pk,
+                                   'name': payment.name,
+                                   'description': payment.description,
+                                   'productdata': payment.app_data},
+                       'response': response},
+                      config.get_private_key(),
+                      algorithm='HS256')
+
+
+def notice_url(notice_type, config):
+    """Absolute URL of the app that a notice of `notice_type` goes to."""
+    if notice_type == amo.INAPP_NOTICE_PAY:
+        uri = config.postback_url
+    elif notice_type == amo.INAPP_NOTICE_CHARGEBACK:
+        uri = config.chargeback_url
+    else:
+        raise NotImplementedError('Unknown type: %s' % notice_type)
+    return urlparse.urlunparse((config.app_protocol(),
+                                config.addon.parsed_app_domain.netloc, uri,
+                                '', '', ''))
+
+
+def post_notice(url, signed_notice, config, contrib, session=None):
+    """
+    Post a signed notice to the app and check its response.
+
+    Returns a tuple of (success, exception), where exception is whatever
+    was raised while talking to the app, or None.
+    """
+    post = session.post if session else requests.post
+    try:
+        res = post(url, signed_notice, timeout=5)
+        res.raise_for_status()  # raise exception for non-200s
+        res_content = res.text
+    except AssertionError:
+        raise  # Raise test-related exceptions.
+    except Exception, exception:
+        log.error('Notice for contrib %s raised exception in URL %s'
+                  % (contrib.pk, url), exc_info=True)
+        return False, exception
+    if res_content == str(contrib.pk):
+        log.debug('app config %s responded OK for contrib %s notification'
+                  % (config.pk, contrib.pk))
+        return True, None
+    log.error('app config %s did not respond with contribution ID %s '
+              'for notification' % (config.pk, contrib.pk))
+    return False, None
+
+
+def _last_error(exception):
+    if exception:
+        return u'%s: %s' % (exception.__class__.__name__, exception)
+    return ''
+
+
 def send_pay_notice(notice_type, signed_notice, config, contrib,
                     notifier_task):
     """
@@ -39,42 +124,96 @@ def send_pay_notice(notice_type, signed_notice, config, contrib,
     **last_error**
         String to indicate the last exception message in the case of failure.
     """
-    if notice_type == amo.INAPP_NOTICE_PAY:
-        uri = config.postback_url
-    elif notice_type == amo.INAPP_NOTICE_CHARGEBACK:
-        uri = config.chargeback_url
-    else:
-        raise NotImplementedError('Unknown type: %s' % notice_type)
-    url = urlparse.urlunparse((config.app_protocol(),
-                               config.addon.parsed_app_domain.netloc, uri, '',
-                               '', ''))
-    exception = None
-    success = False
-    try:
-        res = requests.post(url, signed_notice, timeout=5)
-        res.raise_for_status()  # raise exception for non-200s
-        res_content = res.text
-    except AssertionError:
-        raise  # Raise test-related exceptions.
-    except Exception, exception:
-        log.error('Notice for contrib %s raised exception in URL %s'
-                  % (contrib.pk, url), exc_info=True)
+    url = notice_url(notice_type, config)
+    success, exception = post_notice(url, signed_notice, config, contrib)
+    if exception:
         try:
             notifier_task.retry(exc=exception)
         except:
             log.exception('while retrying contrib %s notice; '
                           'notification URL: %s' % (contrib.pk, url))
-    else:
-        if res_content == str(contrib.pk):
-            success = True
-            log.debug('app config %s responded OK for contrib %s notification'
-                      % (config.pk, contrib.pk))
-        else:
-            log.error('app config %s did not respond with contribution ID %s '
-                      'for notification' % (config.pk, contrib.pk))
-    if exception:
-        last_error = u'%s: %s' % (exception.__class__.__name__, exception)
-    else:
-        last_error = ''
+    return url, success, _last_error(exception)
+
+
+def deliver_notices(queued):
+    """
+    Send the InappNoticeQueue entries in `queued` to their apps.
+
+    Notices are sent concurrently, with at most INAPP_NOTICE_PER_HOST
+    requests in flight to any one app and one keep-alive session per app.
+    Every attempt is logged as an InappPayNotice with a single insert.
+    Entries that were delivered are deleted; the others are pushed back
+    with an exponential backoff until INAPP_NOTICE_MAX_ATTEMPTS is reached.
+
+    Returns a list of (entry, success) tuples.
+    """
+    if not queued:
+        return []
+
+    jobs = []
+    for entry in queued:
+        payment = entry.payment
+        extra = {'reason': entry.reason} if entry.reason else None
+        try:
+            url = notice_url(entry.notice, payment.config)
+            signed = sign_notice(payment, entry.notice, extra_response=extra)
+        except Exception, exc:
+            log.error('Could not prepare notice %s' % entry.pk, exc_info=True)
+            jobs.append((entry, None, None, exc))
+            continue
+        jobs.append((entry, url, signed, None))
+
+    hosts = set(urlparse.urlparse(url).netloc for _, url, _, _ in jobs if url)
+    sessions = dict((host, requests.session()) for host in hosts)
+    limits = dict((host,
+                   threading.BoundedSemaphore(settings.INAPP_NOTICE_PER_HOST))
+                  for host in hosts)
+
+    def send(job):
+        entry, url, signed, exc = job
+        if exc:
+            return entry, url, False, exc
+        host = urlparse.urlparse(url).netloc
+        with limits[host]:
+            success, exc = post_notice(url, signed, entry.payment.config,
+                                       entry.payment.contribution,
+                                       session=sessions[host])
+        return entry, url, success, exc
+
+    pool = ThreadPool(min(settings.INAPP_NOTICE_THREADS, len(jobs)))
+    try:
+        results = pool.map(send, jobs)
+    finally:
+        pool.close()
+        pool.join()
+
+    field = InappPayNotice._meta.get_field_by_name('last_error')[0]
+    InappPayNotice.objects.bulk_create([
+        InappPayNotice(payment=entry.payment, notice=entry.notice,
+                       success=success, url=sent_to or '',
+                       last_error=_last_error(error)[:field.max_length])
+        for entry, sent_to, success, error in results])
+
+    delivered = [entry.pk for entry, _, success, _ in results if success]
+    if delivered:
+        InappNoticeQueue.objects.filter(pk__in=delivered).delete()
+
+    # Entries with the same number of attempts get the same backoff, so
+    # they can be rescheduled together.
+    failed = defaultdict(list)
+    for entry, _, success, _ in results:
+        if not success:
+            failed[entry.attempts + 1].append(entry.pk)
+    now = datetime.now()
+    for attempts, pks in failed.items():
+        qs = InappNoticeQueue.objects.filter(pk__in=pks)
+        if attempts >= settings.INAPP_NOTICE_MAX_ATTEMPTS:
+            log.error('Giving up on notices %s after %s attempts'
+                      % (pks, attempts))
+            qs.delete()
+            continue
+        delay = settings.INAPP_NOTICE_RETRY_DELAY * 2 ** (attempts - 1)
+        qs.update(attempts=attempts,
+                  next_attempt=now + timedelta(seconds=delay))
 
-    return url, success, last_error
+    return [(entry, success) for entry, _, success, _ in results]
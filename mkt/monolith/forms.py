@@ -0,0 +1,13 @@
+from django import forms
+from django.conf import settings
+
+import happyforms
+
+
+class CursorForm(happyforms.Form):
+    cursor = forms.IntegerField(min_value=0)
+    limit = forms.IntegerField(min_value=1, required=False)
+
+    def clean_limit(self):
+        limit = self.cleaned_data['limit'] or settings.MONOLITH_EXPORT_LIMIT
+        return min(limit, settings.MONOLITH_EXPORT_MAX_LIMIT)
@@ -1,9 +1,17 @@
+import atexit
 import datetime
 import hashlib
 import json
+import logging
+import threading
+import time
 
+from django.conf import settings
+from django.core.signals import request_finished
 from django.db import models
 
+log = logging.getLogger('z.monolith')
+
 
 class MonolithRecord(models.Model):
     """Data stored temporarily for monolith.
@@ -21,16 +29,73 @@ class MonolithRecord(models.Model):
         db_table = 'monolith_record'
 
 
+class RecordBuffer(object):
+    """Keeps MonolithRecords in memory so they can be saved in one insert.
+
+    The buffer is flushed once it holds MONOLITH_BUFFER_SIZE records, or at
+    the end of the first request after its oldest record is more than
+    MONOLITH_BUFFER_TIMEOUT seconds old. Records still in the buffer when
+    the process dies are lost.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.started = None
+        self.lock = threading.Lock()
+
+    def add(self, record):
+        with self.lock:
+            if not self.records:
+                self.started = time.time()
+            self.records.append(record)
+        if self.is_full():
+            self.flush()
+
+    def is_full(self):
+        if not self.records:
+            return False
+        return (len(self.records) >= settings.MONOLITH_BUFFER_SIZE or
+                time.time() - self.started >= settings.MONOLITH_BUFFER_TIMEOUT)
+
+    def flush(self):
+        """Save every record in the buffer, returns how many there were."""
+        with self.lock:
+            records, self.records = self.records, []
+        if records:
+            try:
+                MonolithRecord.objects.bulk_create(records)
+            except Exception:
+                log.error('Could not save %d monolith records'
+                          % len(records), exc_info=True)
+        return len(records)
+
+
+record_buffer = RecordBuffer()
+atexit.register(record_buffer.flush)
+
+
+def flush_if_full(sender, **kw):
+    if record_buffer.is_full():
+        record_buffer.flush()
+
+request_finished.connect(flush_if_full, dispatch_uid='monolith_flush')
+
+
 def get_user_hash(request):
     """Get a hash identifying an user.
 
-    It's a hash of session key, ip and user agent
+    It's a hash of session key, ip and user agent. The hash is kept on the
+    request, as one request can record several stats.
     """
+    if hasattr(request, '_monolith_user_hash'):
+        return request._monolith_user_hash
     ip = request.META.get('REMOTE_ADDR', '')
     ua = request.META.get('User-Agent', '')
     session_key = request.session.session_key or ''
 
-    return hashlib.sha1('-'.join(map(str, (ip, ua, session_key)))).hexdigest()
+    request._monolith_user_hash = hashlib.sha1(
+        '-'.join(map(str, (ip, ua, session_key)))).hexdigest()
+    return request._monolith_user_hash
 
 
 def record_stat(key, request, recorded=None, **data):
@@ -49,6 +114,9 @@ def record_stat(key, request, recorded=None, **data):
     :para: data:
         The data you want to store. You can pass the data to this function as
         named arguments.
+
+    If MONOLITH_BUFFER_SIZE is more than 1, the record is only saved when
+    the buffer is flushed.
     """
     if recorded is None:
         recorded = datetime.datetime.now()
@@ -58,5 +126,8 @@ def record_stat(key, request, recorded=None, **data):
 
     record = MonolithRecord(key=key, user_hash=get_user_hash(request),
                             recorded=recorded, value=json.dumps(data))
-    record.save()
+    if settings.MONOLITH_BUFFER_SIZE > 1:
+        record_buffer.add(record)
+    else:
+        record.save()
     return record
@@ -1,12 +1,16 @@
 import logging
 import json
+import urllib
 
+from django.conf import settings
 from django.db import transaction
+from django.db.models.sql import DeleteQuery
 
 from mkt.api.authentication import (MarketplaceAuthentication,
                                     PermissionAuthorization)
 from mkt.api.base import MarketplaceResource
 
+from .forms import CursorForm
 from .models import MonolithRecord
 
 logger = logging.getLogger('z.monolith')
@@ -24,12 +28,54 @@ class MonolithData(MarketplaceResource):
         authorization = PermissionAuthorization('Monolith', 'API')
         authentication = MarketplaceAuthentication()
 
+    def get_list(self, request=None, **kwargs):
+        """
+        When given a `cursor`, returns the `limit` records with an id above
+        it, in id order, without counting or offsetting through the table.
+        `meta.next` is the URL of the following page, or None once there are
+        no more records.
+        """
+        if 'cursor' not in request.GET:
+            return super(MonolithData, self).get_list(request, **kwargs)
+
+        form = CursorForm(request.GET)
+        if not form.is_valid():
+            raise self.form_errors(form)
+        cursor = form.cleaned_data['cursor']
+        limit = form.cleaned_data['limit']
+
+        qs = self.obj_get_list(request=request, **kwargs)
+        records = list(qs.filter(id__gt=cursor).order_by('id')[:limit])
+        objects = [self.full_dehydrate(self.build_bundle(obj=record,
+                                                         request=request))
+                   for record in records]
+
+        next_url = None
+        if len(records) == limit:
+            params = request.GET.copy()
+            params['cursor'] = records[-1].id
+            next_url = '%s?%s' % (self.get_resource_list_uri(),
+                                  urllib.urlencode(params.items()))
+        meta = {'cursor': cursor, 'limit': limit, 'next': next_url}
+        return self.create_response(request, {'meta': meta,
+                                              'objects': objects})
+
     @transaction.commit_on_success
     def obj_delete_list(self, request=None, **kwargs):
         filters = self.build_filters(request.GET)
-        qs = self.get_object_list(request).filter(**filters)
-        logger.info('deleting %d monolith resources' % qs.count())
-        qs.delete()
+        qs = (self.get_object_list(request).filter(**filters)
+              .order_by('id').values_list('id', flat=True))
+        # Delete by id windows rather than through qs.delete(), which loads
+        # every record it deletes.
+        deleted, last = 0, 0
+        while True:
+            ids = list(qs.filter(id__gt=last)[:settings.MONOLITH_DELETE_BATCH])
+            if not ids:
+                break
+            DeleteQuery(MonolithRecord).delete_batch(ids, qs.db)
+            deleted += len(ids)
+            last = ids[-1]
+        logger.info('deleted %d monolith resources' % deleted)
 
     def dehydrate_value(self, bundle):
         return json.loads(bundle.data['value'])
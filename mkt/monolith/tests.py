@@ -13,7 +13,7 @@ from amo.tests import TestCase
 from mkt.api.tests.test_oauth import BaseOAuth
 from mkt.site.fixtures import fixture
 
-from .models import record_stat, MonolithRecord
+from .models import get_user_hash, record_buffer, record_stat, MonolithRecord
 
 
 class RequestFactory(client.RequestFactory):
@@ -63,6 +63,45 @@ class TestModels(TestCase):
         with self.assertRaises(ValueError):
             record_stat('app.install', self.request)
 
+    def test_user_hash_kept_on_request(self):
+        with patch('mkt.monolith.models.hashlib.sha1') as sha1:
+            sha1.return_value.hexdigest.return_value = 'abc'
+            eq_(get_user_hash(self.request), 'abc')
+            eq_(get_user_hash(self.request), 'abc')
+        eq_(sha1.call_count, 1)
+
+
+@patch.object(settings, 'MONOLITH_BUFFER_SIZE', 3)
+@patch.object(settings, 'MONOLITH_BUFFER_TIMEOUT', 60)
+class TestRecordBuffer(TestCase):
+
+    def setUp(self):
+        self.request = RequestFactory()
+
+    def tearDown(self):
+        record_buffer.records = []
+
+    def test_flush_when_full(self):
+        record_stat('app.install', self.request, value=1)
+        record_stat('app.install', self.request, value=2)
+        eq_(MonolithRecord.objects.count(), 0)
+        record_stat('app.install', self.request, value=3)
+        eq_(sorted(json.loads(v)['value'] for v in
+                   MonolithRecord.objects.values_list('value', flat=True)),
+            [1, 2, 3])
+        eq_(record_buffer.records, [])
+
+    def test_flush_when_old(self):
+        record_stat('app.install', self.request, value=1)
+        record_buffer.started -= 60
+        assert record_buffer.is_full()
+        eq_(record_buffer.flush(), 1)
+        eq_(MonolithRecord.objects.count(), 1)
+
+    def test_flush_empty(self):
+        assert not record_buffer.is_full()
+        eq_(record_buffer.flush(), 0)
+
 
 @patch.object(settings, 'SITE_URL', 'http://api/')
 class TestMonolithResource(BaseOAuth):
@@ -160,3 +199,45 @@ class TestMonolithResource(BaseOAuth):
 
         eq_(res.status_code, 204)
         eq_(MonolithRecord.objects.count(), 0)
+
+    def test_cursor(self):
+        for value in range(3):
+            record_stat('app.install', self.request, recorded=self.now,
+                        value=value)
+        first = MonolithRecord.objects.order_by('id')[0].id
+        res = self.client.get(self.list_url,
+                              data={'cursor': first - 1, 'limit': 2})
+        eq_(res.status_code, 200)
+        data = json.loads(res.content)
+        eq_([o['value']['value'] for o in data['objects']], [0, 1])
+        assert 'cursor=%s' % (first + 1) in data['meta']['next']
+
+        res = self.client.get(self.list_url,
+                              data={'cursor': first + 1, 'limit': 2})
+        data = json.loads(res.content)
+        eq_([o['value']['value'] for o in data['objects']], [2])
+        eq_(data['meta']['next'], None)
+
+    def test_cursor_filtered(self):
+        record_stat('app.install', self.request, recorded=self.now, value=1)
+        record_stat('foo.bar', self.request, recorded=self.now, value=2)
+        res = self.client.get(self.list_url,
+                              data={'cursor': 0, 'key': 'foo.bar'})
+        data = json.loads(res.content)
+        eq_([o['value']['value'] for o in data['objects']], [2])
+
+    def test_cursor_invalid(self):
+        res = self.client.get(self.list_url, data={'cursor': 'nope'})
+        eq_(res.status_code, 400)
+
+    @patch.object(settings, 'MONOLITH_DELETE_BATCH', 2)
+    def test_deletion_in_batches(self):
+        for value in range(5):
+            record_stat('app.install', self.request, recorded=self.now,
+                        value=value)
+            record_stat('foo.bar', self.request, recorded=self.now,
+                        value=value)
+        res = self.client.delete(self.list_url, data={'key': 'app.install'})
+        eq_(res.status_code, 204)
+        eq_(list(MonolithRecord.objects.values_list('key', flat=True)
+                 .distinct()), ['foo.bar'])
@@ -14,6 +14,7 @@ from access import acl
 from amo.helpers import absolutify
 from amo.urlresolvers import reverse
 from amo.utils import JSONEncoder, send_mail_jinja
+from editors.helpers import get_viewing
 from editors.models import EscalationQueue, RereviewQueue, ReviewerScore
 from files.models import File
 
@@ -159,7 +160,7 @@ class ReviewApp(ReviewBase):
             self.set_addon(status=amo.STATUS_PUBLIC_WAITING,
                            highest_status=amo.STATUS_PUBLIC_WAITING)
 
-        self.addon.sign_if_packaged(self.version.pk)
+        self.addon.queue_sign_if_packaged(self.version.pk)
 
         self.log_action(amo.LOG.APPROVE_VERSION_WAITING)
         self.notify_email('pending_to_public_waiting',
@@ -179,7 +180,7 @@ class ReviewApp(ReviewBase):
         # Call update_version, so various other bits of data update.
         self.addon.update_version()
         self.addon.update_name_from_package_manifest()
-        self.addon.sign_if_packaged(self.version.pk)
+        self.addon.queue_sign_if_packaged(self.version.pk)
 
         self.log_action(amo.LOG.APPROVE_VERSION)
         self.notify_email('pending_to_public', u'App Approved: %s')
@@ -469,11 +470,9 @@ class AppsReviewing(object):
         ids = []
         my_apps = cache.get(self.key)
         if my_apps:
-            for id in my_apps.split(','):
-                valid = cache.get(
-                    '%s:review_viewing:%s' % (settings.CACHE_PREFIX, id))
-                if valid and valid == self.user_id:
-                    ids.append(id)
+            viewing = get_viewing(my_apps.split(','))
+            ids = [id for id, user_id in viewing.items()
+                   if user_id == self.user_id]
 
         apps = []
         for app in Webapp.objects.filter(id__in=ids):
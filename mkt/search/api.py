@@ -1,18 +1,26 @@
 import json
 
+from django.conf import settings
+from django.utils import translation
+
 from tastypie import http
 from tastypie.authorization import ReadOnlyAuthorization
 from tower import ugettext as _
 
 import amo
 from access import acl
+from addons.models import Preview
 from amo.helpers import absolutify
+from amo.urlresolvers import reverse
+from amo.utils import no_translation
+from constants.applications import DEVICE_TYPES
 
 import mkt
 from mkt.api.authentication import OptionalAuthentication
 from mkt.api.resources import AppResource
 from mkt.search.views import _get_query, _filter_search
 from mkt.search.forms import ApiSearchForm
+from mkt.webapps.models import Webapp
 
 
 class SearchResource(AppResource):
@@ -25,6 +33,10 @@ class SearchResource(AppResource):
         authorization = ReadOnlyAuthorization()
         authentication = OptionalAuthentication()
 
+    # Fields that aren't kept in the search index. These are looked up in
+    # bulk for each page of results by the matching `bulk_<field>` method.
+    expensive_fields = ['previews']
+
     def get_resource_uri(self, bundle):
         # At this time we don't have an API to the Webapp details.
         return None
@@ -59,19 +71,81 @@ class SearchResource(AppResource):
         qs = _get_query(region, gaia=request.GAIA, mobile=request.MOBILE,
                         tablet=request.TABLET, filters=base_filters)
         qs = _filter_search(request, qs, form.cleaned_data, region=region)
-        paginator = self._meta.paginator_class(request.GET, qs,
+        paginator = self._meta.paginator_class(request.GET, qs.values_dict(),
             resource_uri=self.get_resource_list_uri(),
             limit=self._meta.limit)
         page = paginator.page()
-
-        # Rehydrate the results as per tastypie.
-        objs = [self.build_bundle(obj=obj, request=request)
-                for obj in page['objects']]
-        page['objects'] = [self.full_dehydrate(bundle) for bundle in objs]
+        page['objects'] = self.dehydrate_sources(request, page['objects'])
         # This isn't as quite a full as a full TastyPie meta object,
         # but at least it's namespaced that way and ready to expand.
         return self.create_response(request, page)
 
+    def dehydrate_sources(self, request, sources):
+        """
+        Serialize a page of search results from their ES documents, only
+        going to the database for the `expensive_fields`.
+        """
+        ids = [source['id'] for source in sources]
+        expensive = dict((field, getattr(self, 'bulk_%s' % field)(ids))
+                         for field in self.expensive_fields)
+
+        # Documents indexed before the API fields were added to the index
+        # are rehydrated as per tastypie until the next reindex.
+        stale = [source['id'] for source in sources
+                 if 'api_translations' not in source]
+        objs = {}
+        if stale:
+            objs = dict((obj.id, obj) for obj in
+                        Webapp.objects.filter(id__in=stale))
+
+        data = []
+        for source in sources:
+            if source['id'] in objs:
+                bundle = self.build_bundle(obj=objs[source['id']],
+                                           request=request)
+                data.append(self.full_dehydrate(bundle))
+            elif source['id'] not in stale:
+                data.append(self.dehydrate_source(source, expensive))
+        return data
+
+    def dehydrate_source(self, source, expensive):
+        lang = translation.get_language().lower()
+        default = (source.get('default_locale') or
+                   settings.LANGUAGE_CODE).lower()
+        data = {
+            'id': unicode(source['id']),
+            'resource_uri': None,
+            'app_slug': source['app_slug'],
+            'status': source['status'],
+            'premium_type': amo.ADDON_PREMIUM_API[source['premium_type']],
+            'categories': source.get('category', []),
+            'app_type': amo.ADDON_WEBAPP_TYPES[source['app_type']],
+            'absolute_url': absolutify(reverse('detail',
+                                               args=[source['app_slug']])),
+        }
+        with no_translation():
+            data['device_types'] = [str(DEVICE_TYPES[d].name).lower()
+                                    for d in sorted(source.get('device', []))]
+        for field, strings in source['api_translations'].items():
+            data[field] = strings.get(lang, strings.get(default))
+        for size in amo.ADDON_ICON_SIZES:
+            data['icon_url_%s' % size] = source['icons'][str(size)]
+        for field, values in expensive.items():
+            data[field] = values.get(source['id'], [])
+        return data
+
+    def bulk_previews(self, ids):
+        """Preview URIs for all of the apps in `ids`, in one query."""
+        resource = self.fields['previews'].to_class(
+            api_name=self._meta.api_name)
+        previews = (Preview.objects.filter(addon__in=ids)
+                    .values_list('addon', 'id'))
+        rv = {}
+        for addon, preview in previews:
+            rv.setdefault(addon, []).append(
+                resource.get_resource_uri(Preview(pk=preview)))
+        return rv
+
     def dehydrate_slug(self, bundle):
         return bundle.obj.app_slug
 
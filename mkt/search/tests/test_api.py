@@ -3,15 +3,18 @@ from datetime import datetime
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.utils import translation
 
 from mock import patch
 from nose.tools import eq_
 
 import amo
-from addons.models import AddonCategory, AddonDeviceType, Category
+from addons.models import (AddonCategory, AddonDeviceType, Category,
+                           Preview)
 from amo.tests import ESTestCase
 from mkt.api.models import Access, generate
 from mkt.api.tests.test_oauth import BaseOAuth, OAuthClient
+from mkt.search.api import SearchResource
 from mkt.search.forms import DEVICE_CHOICES_IDS
 from mkt.site.fixtures import fixture
 from mkt.webapps.models import Webapp
@@ -80,6 +83,51 @@ class TestApi(BaseOAuth, ESTestCase):
         eq_(obj['absolute_url'], self.webapp.get_absolute_url())
         eq_(obj['resource_uri'], None)
 
+    def test_dehydrate_from_source(self):
+        self.create()
+        with patch.object(Webapp.objects, 'filter') as filter_:
+            res = self.client.get(self.list_url + ({'cat': self.category.pk},))
+            assert not filter_.called
+        eq_(res.status_code, 200)
+        obj = json.loads(res.content)['objects'][0]
+        eq_(obj['id'], unicode(self.webapp.pk))
+        eq_(obj['name'], unicode(self.webapp.name))
+        eq_(obj['categories'], [self.category.pk])
+        eq_(obj['premium_type'], 'free')
+        eq_(obj['app_type'], 'hosted')
+
+    def test_dehydrate_locale_fallback(self):
+        source = {'id': 1, 'app_slug': 'slug', 'status': amo.STATUS_PUBLIC,
+                  'premium_type': amo.ADDON_FREE,
+                  'app_type': amo.ADDON_WEBAPP_HOSTED,
+                  'default_locale': 'en-US',
+                  'icons': dict((str(size), 'icon')
+                                for size in amo.ADDON_ICON_SIZES),
+                  'api_translations': {'name': {'fr': 'Le nom',
+                                                'en-us': 'The name'},
+                                       'homepage': {}}}
+        resource = SearchResource()
+        with translation.override('fr'):
+            data = resource.dehydrate_source(source, {})
+        eq_(data['name'], 'Le nom')
+        eq_(data['homepage'], None)
+        with translation.override('de'):
+            data = resource.dehydrate_source(source, {})
+        eq_(data['name'], 'The name')
+
+    def test_dehydrate_previews(self):
+        preview = Preview.objects.create(addon=self.webapp)
+        res = self.client.get(self.list_url)
+        previews = json.loads(res.content)['objects'][0]['previews']
+        eq_(len(previews), 1)
+        assert previews[0].endswith('/preview/%s/' % preview.pk), previews
+
+    def test_dehydrate_stale_document(self):
+        # Documents indexed without the API fields still get served.
+        sources = [{'id': self.webapp.pk}]
+        objs = SearchResource().dehydrate_sources(None, sources)
+        eq_(objs[0].data['app_slug'], self.webapp.app_slug)
+
     def test_q(self):
         res = self.client.get(self.list_url + ({'q': 'something'},))
         eq_(res.status_code, 200)
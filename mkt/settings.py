@@ -196,6 +196,20 @@ INAPP_KEY_PATHS = {
                                'inapp-sample-pay.key')
 }
 
+# How long, in seconds, each process keeps decrypted in-app private keys
+# around for. Set to 0 to decrypt them on every request.
+INAPP_KEY_CACHE_TIMEOUT = 60 * 5
+
+# Number of in-app payment notices sent concurrently when delivering the
+# notice queue, and how many of them may go to the same app at once.
+INAPP_NOTICE_THREADS = 10
+INAPP_NOTICE_PER_HOST = 2
+# Notices pulled off the queue at a time.
+INAPP_NOTICE_BATCH_SIZE = 100
+# Failed notices are retried after 15s, 30s, 60s... up to the max attempts.
+INAPP_NOTICE_RETRY_DELAY = 15
+INAPP_NOTICE_MAX_ATTEMPTS = 5
+
 STATSD_RECORD_KEYS = [
     'window.performance.timing.domComplete',
     'window.performance.timing.domInteractive',
@@ -328,3 +342,35 @@ APP_PURCHASE_AUD = 'marketplace-dev.allizom.org'
 # It must match that of the pay server that processes nav.mozPay().
 # On B2G this must match a provider in the whitelist.
 APP_PURCHASE_TYP = 'mozilla/payments/pay/v1'
+
+# Number of manifests fetched concurrently by the daily hosted app manifest
+# refresh, and how hard we're allowed to hit a single host while doing it.
+MANIFEST_CRAWLER_THREADS = 10
+MANIFEST_CRAWLER_PER_HOST = 2
+# Minimum number of seconds between two requests to the same host.
+MANIFEST_CRAWLER_HOST_DELAY = 0.5
+
+# How long we keep the ETag/Last-Modified of a fetched manifest around for
+# conditional requests.
+MANIFEST_VALIDATORS_TIMEOUT = 60 * 60 * 24 * 30
+
+# How long an API consumer, along with its user and groups, is cached for.
+API_CONSUMER_CACHE_TIMEOUT = 60
+
+# Monolith records are kept in memory and saved this many at a time, or once
+# the oldest one is MONOLITH_BUFFER_TIMEOUT seconds old. 1 saves them as
+# they are recorded.
+MONOLITH_BUFFER_SIZE = 50
+MONOLITH_BUFFER_TIMEOUT = 10
+# Page size of the monolith export when paging with a cursor.
+MONOLITH_EXPORT_LIMIT = 100
+MONOLITH_EXPORT_MAX_LIMIT = 1000
+# How many records the monolith API deletes in one statement.
+MONOLITH_DELETE_BATCH = 1000
+
+# How long the ids of the apps in the featured, popular and latest listings
+# are cached for. The build_app_listings cron rebuilds the featured ones more
+# often.
+LISTING_CACHE_TIMEOUT = 60 * 60
+# How many apps the cached popular and latest listings hold.
+LISTING_SIZE = 60
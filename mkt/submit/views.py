@@ -161,8 +161,7 @@ def details(request, addon_id, addon):
         addon = form_basic.save(addon)
         form_cats.save()
         form_icon.save(addon)
-        for preview in form_previews.forms:
-            preview.save(addon)
+        form_previews.save(addon)
 
         # If this is an incomplete app from the legacy submission flow, it may
         # not have device types set yet - so assume it works everywhere.
@@ -5,17 +5,24 @@ import stat
 import time
 
 from django.conf import settings
+from django.core.files.storage import default_storage as storage
 from django.db.models import Count
 
 import commonware.log
 import cronjobs
+import waffle
 from celery.task.sets import TaskSet
+from lib.crypto.packaged import queue_signs
 from lib.es.utils import raise_if_reindex_in_progress
 
 import amo
+import mkt
+from addons.models import Category
 from amo.utils import chunked
+from files.models import File
 
-from .models import Installed
+from .listings import build_generation
+from .models import Installed, Webapp
 from .tasks import webapp_update_weekly_downloads
 
 log = commonware.log.getLogger('z.cron')
@@ -47,3 +54,49 @@ def clean_old_signed(seconds=60 * 60):
         if age > seconds:
             log.debug('Removing signed app: %s, %dsecs old.' % (full, age))
             shutil.rmtree(full)
+
+
+@cronjobs.register
+def build_app_listings():
+    """
+    Rebuild the cached featured listings of every region and category that
+    the home and browse pages show, so that they don't have to.
+    """
+    cats = [None] + list(Category.objects.filter(type=amo.ADDON_WEBAPP,
+                                                 weight__gte=0))
+    with build_generation():
+        for region in mkt.regions.ALL_REGIONS:
+            for cat in cats:
+                # The arguments used by the browse pages.
+                for mobile in (False, True):
+                    Webapp.featured(cat=cat, region=region, mobile=mobile)
+            # And by the home page.
+            for limit in (9, 12):
+                Webapp.featured(region=region, cat=None, mobile=False,
+                                limit=limit)
+    log.info('Rebuilt the app listings of %s regions and %s categories.'
+             % (len(mkt.regions.ALL_REGIONS), len(cats)))
+
+
+@cronjobs.register
+def presign_apps(hours=24):
+    """
+    Queue the signing of the packaged apps that went public or were blocked
+    in the last `hours` and aren't signed yet, so that downloads never have
+    to wait for the signing server. Older apps get signed by their first
+    download.
+    """
+    if not waffle.switch_is_active('presign-packaged-apps'):
+        return
+    since = datetime.now() - timedelta(hours=int(hours))
+    files = (File.objects.filter(version__addon__type=amo.ADDON_WEBAPP,
+                                 version__addon__is_packaged=True,
+                                 status__in=[amo.STATUS_PUBLIC,
+                                             amo.STATUS_BLOCKED],
+                                 datestatuschanged__gte=since)
+             .no_cache().select_related('version'))
+    ids = sorted(set(f.version_id for f in files
+                     if not storage.exists(f.signed_file_path)))
+    queued = queue_signs(ids)
+    if queued:
+        log.info('Queued the signing of %s versions.' % len(queued))
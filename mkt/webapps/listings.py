@@ -0,0 +1,96 @@
+"""
+Cached app listings.
+
+The featured, popular and latest listings only change when an app or a
+feature changes, so the ids of the apps in them are kept in the cache for
+each set of arguments they were built with. Every cached listing is
+invalidated at once by bumping a generation number, which is part of their
+keys.
+
+The build_app_listings cron fills a new generation while pages keep reading
+the current one, and only then switches them over.
+"""
+from contextlib import contextmanager
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+GENERATION_KEY = 'webapps:listings:generation'
+
+_building = threading.local()
+
+
+def generation():
+    if getattr(_building, 'generation', None):
+        return _building.generation
+    gen = cache.get(GENERATION_KEY)
+    if gen is None:
+        # Don't start back from a generation that may still be cached.
+        gen = int(time.time())
+        cache.add(GENERATION_KEY, gen, 0)
+    return gen
+
+
+def invalidate_listings():
+    """Forget every cached listing."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, int(time.time()), 0)
+
+
+@contextmanager
+def build_generation():
+    """
+    Listings fetched in this block are built and cached under a new
+    generation, which everyone switches to when the block is done. If the
+    listings were invalidated in the meantime, what was built may already
+    be stale, so the switch is skipped.
+    """
+    current = generation()
+    # Far past the numbers invalidate_listings() increments to.
+    gen = max(current + 1, int(time.time() * 1000))
+    _building.generation = gen
+    try:
+        yield gen
+    finally:
+        _building.generation = None
+    if cache.get(GENERATION_KEY) == current:
+        cache.set(GENERATION_KEY, gen, 0)
+
+
+def plain(value):
+    """Objects, or lists of them, are represented by their ids in keys."""
+    if isinstance(value, (list, tuple)):
+        return tuple(plain(v) for v in value)
+    return getattr(value, 'id', value)
+
+
+def listing_key(kind, args):
+    args = hashlib.md5(repr(plain(args))).hexdigest()
+    return 'webapps:listings:%s:%s:%s' % (generation(), kind, args)
+
+
+def listing_ids(kind, fetch, *args):
+    """
+    Returns the ids of the apps in the `kind` listing built with `args`,
+    calling `fetch()` to get them if they aren't cached.
+    """
+    timeout = settings.LISTING_CACHE_TIMEOUT
+    if not timeout:
+        return fetch()
+    key = listing_key(kind, args)
+    ids = cache.get(key)
+    if ids is None:
+        ids = list(fetch())
+        cache.set(key, ids, timeout)
+    return ids
+
+
+def hydrate(qs, ids):
+    """Returns the objects of `qs` with the given `ids`, in that order."""
+    objs = dict((obj.id, obj) for obj in qs.filter(id__in=ids))
+    return [objs[id_] for id_ in ids if id_ in objs]
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import datetime
+import hashlib
 import json
 import os
 import time
@@ -17,12 +18,13 @@ from django.utils.http import urlquote
 import commonware.log
 from elasticutils.contrib.django import F, S
 from tower import ugettext as _
+import waffle
 
 import amo
 import amo.models
 from access.acl import action_allowed, check_reviewer
 from addons import query
-from addons.models import (Addon, AddonDeviceType, Category,
+from addons.models import (Addon, AddonCategory, AddonDeviceType, Category,
                            update_search_index)
 from addons.signals import version_changed
 from amo.decorators import skip_cache
@@ -30,16 +32,19 @@ from amo.helpers import absolutify
 from amo.storage_utils import copy_stored_file
 from amo.urlresolvers import reverse
 from amo.utils import JSONEncoder, smart_path
-from constants.applications import DEVICE_TYPES
+from constants.applications import DEVICE_GAIA, DEVICE_MOBILE, DEVICE_TYPES
 from files.models import File, nfd_str, Platform
 from files.utils import parse_addon, WebAppParser
 from lib.crypto import packaged
 from versions.models import Version
-from mkt.zadmin.models import FeaturedApp
+from mkt.zadmin.models import (FeaturedApp, FeaturedAppCarrier,
+                               FeaturedAppRegion)
 
 import mkt
+from mkt.carriers import get_carrier
 from mkt.constants import apps
 from mkt.constants import APP_IMAGE_SIZES
+from mkt.webapps.listings import hydrate, invalidate_listings, listing_ids
 from mkt.webapps.utils import get_locale_properties
 
 
@@ -530,8 +535,15 @@ class Webapp(Addon):
     @classmethod
     def featured(cls, cat=None, region=None, limit=9, mobile=False,
                  gaia=False):
-        qs = FeaturedApp.objects.featured(cat, region, limit, mobile, gaia)
-        return [w.app for w in qs]
+        def fetch():
+            qs = FeaturedApp.objects.featured(cat, region, limit, mobile, gaia)
+            return [w.app_id for w in qs]
+
+        # Everything FeaturedApp.objects.featured() looks at is in the key.
+        ids = listing_ids('featured', fetch, cat, region, limit, mobile, gaia,
+                          get_carrier(),
+                          waffle.switch_is_active('disabled-payments'))
+        return hydrate(cls.objects.all(), ids)
 
     @classmethod
     def get_excluded_in(cls, region):
@@ -579,6 +591,23 @@ class Webapp(Addon):
         """Elastically grab the most recent apps."""
         return cls.from_search(cat, region, gaia=gaia).order_by('-created')
 
+    @classmethod
+    def listing(cls, kind, cat=None, region=None, device=None):
+        """
+        Returns the apps of the 'popular' or 'latest' listing for a device,
+        from the cached ids rather than from a new search.
+        """
+        def fetch():
+            qs = getattr(cls, kind)(cat, region, gaia=device == DEVICE_GAIA)
+            # Same as mkt.home.views._add_mobile_filter.
+            if device in (DEVICE_GAIA, DEVICE_MOBILE):
+                qs = qs.filter(device=device.id, uses_flash=False)
+            return [r['id'] for r in
+                    qs.values_dict('id')[:settings.LISTING_SIZE]]
+
+        ids = listing_ids(kind, fetch, cat, region, device)
+        return hydrate(cls.objects.all(), ids)
+
     @classmethod
     def category(cls, slug):
         try:
@@ -628,21 +657,61 @@ class Webapp(Addon):
                 'release_notes': version.releasenotes,
                 'package_path': package_path,
             }
-            for key in ['developer', 'icons', 'locales']:
-                if key in manifest:
-                    data[key] = manifest[key]
+            for field in ['developer', 'icons', 'locales']:
+                if field in manifest:
+                    data[field] = manifest[field]
 
         data = json.dumps(data, cls=JSONEncoder)
 
         cache.set(key, data, 0)
+        self.update_manifest_etag(data)
 
         return data
 
+    def get_manifest_etag(self, manifest):
+        """
+        The ETag of the "mini" manifest `manifest`, which also changes with
+        the package it points to.
+        """
+        etag = hashlib.md5()
+        etag.update(manifest)
+        package_file = self.get_latest_file()
+        if package_file:
+            etag.update(package_file.hash)
+        return etag.hexdigest()
+
+    def update_manifest_etag(self, manifest):
+        """
+        Computes the ETag of the "mini" manifest `manifest` and, if anyone
+        can get the manifest, stores it so that conditional requests can be
+        answered without loading the app.
+        """
+        etag = self.get_manifest_etag(manifest)
+        key = manifest_etag_key(self.guid)
+        if (self.status in (amo.STATUS_PUBLIC, amo.STATUS_BLOCKED) and
+            not self.disabled_by_user):
+            cache.set(key, etag, 0)
+        else:
+            cache.delete(key)
+        return etag
+
     def sign_if_packaged(self, version_pk, reviewer=False):
         if not self.is_packaged:
             return
         return packaged.sign(version_pk, reviewer=reviewer)
 
+    def queue_sign_if_packaged(self, version_pk):
+        """
+        Signs the version in the background if apps are signed ahead of
+        their downloads, else right away.
+        """
+        if not self.is_packaged:
+            return
+        if waffle.switch_is_active('presign-packaged-apps'):
+            packaged.queue_sign(version_pk)
+        else:
+            self.sign_if_packaged(version_pk)
+
     def assign_uuid(self):
         """Generates a UUID if self.guid is not already set."""
         if not self.guid:
@@ -772,6 +841,30 @@ def watch_status(old_attr={}, new_attr={}, instance=None, sender=None, **kw):
             pass
 
 
+def manifest_etag_key(guid):
+    return 'webapp:manifest-etag:%s' % guid
+
+
+@Webapp.on_change
+def watch_manifest_etag(old_attr={}, new_attr={}, instance=None, sender=None,
+                        **kw):
+    """Forget the stored manifest ETag when the app or its file changes."""
+    fields = ('status', 'disabled_by_user', 'is_packaged', 'guid',
+              '_current_version', '_current_version_id')
+    if any(old_attr.get(f) != new_attr.get(f) for f in fields):
+        cache.delete_many([manifest_etag_key(guid) for guid in
+                           set([old_attr.get('guid'), new_attr.get('guid')])
+                           if guid])
+
+
+@Webapp.on_change
+def watch_listed(old_attr={}, new_attr={}, instance=None, sender=None, **kw):
+    """Forget the cached listings when an app is listed or unlisted."""
+    fields = ('status', 'disabled_by_user', 'premium_type')
+    if any(old_attr.get(f) != new_attr.get(f) for f in fields):
+        invalidate_listings()
+
+
 class ImageAsset(amo.models.ModelBase):
     addon = models.ForeignKey(Addon, related_name='image_assets')
     filetype = models.CharField(max_length=25, default='image/png')
@@ -865,6 +958,42 @@ class AddonExcludedRegion(amo.models.ModelBase):
         return mkt.regions.REGIONS_CHOICES_ID_DICT.get(self.region)
 
 
+def listings_changed(sender, **kw):
+    if not kw.get('raw'):
+        invalidate_listings()
+
+
+@receiver(models.signals.post_save, sender=File,
+          dispatch_uid='webapps_file_manifest_etag_save')
+@receiver(models.signals.post_delete, sender=File,
+          dispatch_uid='webapps_file_manifest_etag_delete')
+def file_changed(sender, instance, **kw):
+    """The manifest ETag covers the hash of the app's latest file."""
+    if kw.get('raw'):
+        return
+    guids = (Webapp.objects.no_cache()
+             .filter(versions=instance.version_id, is_packaged=True)
+             .values_list('guid', flat=True))
+    cache.delete_many([manifest_etag_key(guid) for guid in guids if guid])
+
+
+@receiver(models.signals.post_delete, sender=Webapp,
+          dispatch_uid='webapps_manifest_etag_delete')
+def webapp_deleted(sender, instance, **kw):
+    """A hard deleted app doesn't go through on_change, or have files."""
+    if instance.guid:
+        cache.delete(manifest_etag_key(instance.guid))
+
+
+# Any of these change what the featured, popular or latest listings show.
+for sender in (AddonExcludedRegion, AddonCategory, AddonDeviceType,
+               FeaturedApp, FeaturedAppRegion, FeaturedAppCarrier):
+    for signal in (models.signals.post_save, models.signals.post_delete):
+        signal.connect(listings_changed, sender=sender,
+                       dispatch_uid='webapps_listings_%s_%s'
+                                    % (sender.__name__, id(signal)))
+
+
 class ContentRating(amo.models.ModelBase):
     """
     Ratings body information about an app.
@@ -2,10 +2,17 @@ import datetime
 import hashlib
 import json
 import logging
+import threading
+import time
+import urlparse
+from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 
 from celery.exceptions import RetryTaskError
 from celeryutils import task
 
+from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import default_storage as storage
 
 import amo
@@ -15,7 +22,7 @@ from amo.urlresolvers import reverse
 from amo.utils import chunked
 from editors.models import RereviewQueue
 from files.models import FileUpload
-from mkt.developers.tasks import _fetch_manifest, validator
+from mkt.developers.tasks import _fetch_manifest, NotModified, validator
 from mkt.webapps.models import Webapp
 from mkt.webapps.utils import get_locale_properties
 from users.utils import get_task_user
@@ -60,6 +67,99 @@ def _open_manifest(webapp, file_):
         _log(webapp, u'JSON decoding error', exc_info=True)
 
 
+def _validators_key(id):
+    return 'webapps:manifest-validators:%s' % id
+
+
+def _get_validators(id, file_):
+    """
+    Return the stored ETag/Last-Modified for the manifest `file_` was built
+    from, or an empty dict if we don't have any for that exact manifest.
+    """
+    validators = cache.get(_validators_key(id))
+    if validators and validators.get('hash') == file_.hash:
+        return dict(validators)
+    return {}
+
+
+def _set_validators(id, validators, hash_):
+    if validators.get('etag') or validators.get('last_modified'):
+        validators['hash'] = hash_
+        cache.set(_validators_key(id), validators,
+                  settings.MANIFEST_VALIDATORS_TIMEOUT)
+    else:
+        cache.delete(_validators_key(id))
+
+
+class HostThrottle(object):
+    """
+    Limits the number of concurrent requests to one host and spaces the
+    start of consecutive requests by at least `delay` seconds.
+    """
+
+    def __init__(self, concurrency, delay):
+        self.delay = delay
+        self._slots = defaultdict(lambda: threading.Semaphore(concurrency))
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host):
+        with self._lock:
+            slot = self._slots[host]
+        slot.acquire()
+        with self._lock:
+            wait = self._last.get(host, 0) + self.delay - time.time()
+            self._last[host] = time.time() + max(wait, 0)
+        if wait > 0:
+            time.sleep(wait)
+
+    def release(self, host):
+        self._slots[host].release()
+
+
+def _crawl_manifests(ids, check_hash):
+    """
+    Fetch the manifests of the given hosted apps concurrently.
+
+    Returns a dict of {id: (content, validators)}. Content is `None` when the
+    host answered a conditional request with a 304, and the value is the
+    exception instead of a tuple when the fetch failed.
+    """
+    jobs = []
+    for webapp in Webapp.objects.filter(pk__in=ids).no_transforms():
+        file_ = webapp.get_latest_file()
+        if not file_:
+            continue
+        validators = _get_validators(webapp.pk, file_) if check_hash else {}
+        jobs.append((webapp.pk, webapp.manifest_url, validators))
+    if not jobs:
+        return {}
+
+    throttle = HostThrottle(settings.MANIFEST_CRAWLER_PER_HOST,
+                            settings.MANIFEST_CRAWLER_HOST_DELAY)
+
+    def fetch(job):
+        id, url, validators = job
+        host = urlparse.urlparse(url).netloc
+        throttle.acquire(host)
+        try:
+            return id, (_fetch_manifest(url, validators=validators),
+                        validators)
+        except NotModified:
+            return id, (None, validators)
+        except Exception, e:
+            return id, e
+        finally:
+            throttle.release(host)
+
+    pool = ThreadPool(min(settings.MANIFEST_CRAWLER_THREADS, len(jobs)))
+    try:
+        return dict(pool.map(fetch, jobs))
+    finally:
+        pool.close()
+        pool.join()
+
+
 @task
 @write
 def update_manifests(ids, **kw):
@@ -72,8 +172,9 @@ def update_manifests(ids, **kw):
     # we'll need to log in as user.
     amo.set_user(get_task_user())
 
+    fetched = _crawl_manifests(ids, check_hash)
     for id in ids:
-        _update_manifest(id, check_hash, retries)
+        _update_manifest(id, check_hash, retries, fetched=fetched.get(id))
     if retries:
         try:
             update_manifests.retry(args=(retries.keys(),),
@@ -88,7 +189,12 @@ def update_manifests(ids, **kw):
     return retries
 
 
-def _update_manifest(id, check_hash, failed_fetches):
+def _update_manifest(id, check_hash, failed_fetches, fetched=None):
+    """
+    Refresh the manifest of a hosted app. `fetched` is the result of
+    `_crawl_manifests` for this app; the manifest is fetched here if it's
+    not given.
+    """
     webapp = Webapp.objects.get(pk=id)
     file_ = webapp.get_latest_file()
 
@@ -99,7 +205,17 @@ def _update_manifest(id, check_hash, failed_fetches):
 
     # Fetch manifest, catching and logging any exception.
     try:
-        content = _fetch_manifest(webapp.manifest_url)
+        if fetched is None:
+            validators = _get_validators(id, file_) if check_hash else {}
+            try:
+                content = _fetch_manifest(webapp.manifest_url,
+                                          validators=validators)
+            except NotModified:
+                content = None
+        elif isinstance(fetched, Exception):
+            raise fetched
+        else:
+            content, validators = fetched
     except Exception, e:
         msg = u'Failed to get manifest from %s. Error: %s' % (
             webapp.manifest_url, e)
@@ -114,9 +230,17 @@ def _update_manifest(id, check_hash, failed_fetches):
             _log(webapp, msg, rereview=False, exc_info=True)
         return
 
+    if content is None:
+        # Only conditional requests can get here, which we only send for the
+        # manifest we already have.
+        _log(webapp, u'Manifest not modified')
+        return
+
+    hash_ = _get_content_hash(content)
+    _set_validators(id, validators, hash_)
+
     # Check hash.
     if check_hash:
-        hash_ = _get_content_hash(content)
         if file_.hash == hash_:
             _log(webapp, u'Manifest the same')
             return
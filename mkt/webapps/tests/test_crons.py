@@ -16,7 +16,8 @@ from django.core.management.base import CommandError
 from lib.es.management.commands.reindex import flag_database, unflag_database
 from users.models import UserProfile
 from mkt.site.fixtures import fixture
-from mkt.webapps.cron import clean_old_signed, update_weekly_downloads
+from mkt.webapps.cron import (clean_old_signed, presign_apps,
+                              update_weekly_downloads)
 from mkt.webapps.models import Installed, Webapp
 
 
@@ -136,3 +137,26 @@ class TestSignApps(amo.tests.TestCase):
             mock.call(file2.file_path,
                       file2.signed_file_path, False)],
             any_order=True)
+
+
+@mock.patch('lib.crypto.packaged.sign_versions')
+class TestPresignApps(amo.tests.TestCase):
+    fixtures = fixture('webapp_337141')
+
+    def setUp(self):
+        self.create_switch('presign-packaged-apps')
+        self.app = Addon.objects.get(id=337141)
+        self.app.update(is_packaged=True)
+        self.version = self.app.current_version
+        self.file = self.version.all_files[0]
+        self.file.update(datestatuschanged=datetime.now())
+
+    def test_queued_once(self, sign_versions):
+        presign_apps()
+        presign_apps()
+        sign_versions.delay.assert_called_once_with([self.version.pk])
+
+    def test_old_skipped(self, sign_versions):
+        self.file.update(datestatuschanged=datetime.now() - timedelta(days=2))
+        presign_apps()
+        assert not sign_versions.delay.called
@@ -9,6 +9,7 @@ import zipfile
 from datetime import datetime, timedelta
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import default_storage as storage
 from django.db.models.signals import post_delete, post_save
 
@@ -36,7 +37,11 @@ from versions.models import update_status, Version
 import mkt
 from mkt.constants import apps
 from mkt.submit.tests.test_views import BasePackagedAppTest, BaseWebAppTest
-from mkt.webapps.models import AddonExcludedRegion, Installed, Webapp
+from mkt.webapps.listings import (build_generation, generation,
+                                  GENERATION_KEY, invalidate_listings,
+                                  listing_ids)
+from mkt.webapps.models import (AddonExcludedRegion, Installed,
+                                manifest_etag_key, Webapp)
 from mkt.zadmin.models import FeaturedApp, FeaturedAppRegion
 
 
@@ -83,6 +88,12 @@ class TestWebapp(amo.tests.TestCase):
         eq_(list(Webapp.objects.valid()), [w])
         eq_(sorted(Webapp.with_deleted.valid()), [w])
 
+    def test_hard_deleted_forgets_etag(self):
+        w = Webapp.objects.create(guid='abc-123')
+        cache.set(manifest_etag_key(w.guid), 'etag', 0)
+        w.delete()
+        eq_(cache.get(manifest_etag_key(w.guid)), None)
+
     def test_webapp_type(self):
         webapp = Webapp()
         webapp.save()
@@ -413,6 +424,88 @@ class TestWebapp(amo.tests.TestCase):
         self.assertCloseToNow(v.nomination)
 
 
+class TestListings(amo.tests.TestCase):
+
+    def setUp(self):
+        self.app = app_factory()
+        self.featured = self.make_featured(self.app, category=None,
+                                           region=mkt.regions.US)
+
+    def featured_ids(self):
+        with self.settings(LISTING_CACHE_TIMEOUT=60):
+            return [a.id for a in Webapp.featured(region=mkt.regions.US)]
+
+    def test_featured_cached(self):
+        eq_(self.featured_ids(), [self.app.id])
+        # A queryset update doesn't send any signal.
+        FeaturedApp.objects.update(end_date=datetime.now() - timedelta(days=1))
+        eq_(self.featured_ids(), [self.app.id])
+
+    def test_featured_invalidated(self):
+        eq_(self.featured_ids(), [self.app.id])
+        other = app_factory()
+        self.make_featured(other, category=None, region=mkt.regions.US)
+        self.assertSetEqual(self.featured_ids(), [self.app.id, other.id])
+
+    def test_excluded_region_invalidates(self):
+        eq_(self.featured_ids(), [self.app.id])
+        AddonExcludedRegion.objects.create(addon=self.app,
+                                           region=mkt.regions.US.id)
+        eq_(self.featured_ids(), [])
+
+    def test_status_change_invalidates(self):
+        eq_(self.featured_ids(), [self.app.id])
+        self.app.update(status=amo.STATUS_PENDING)
+        eq_(self.featured_ids(), [])
+
+    def test_other_change_keeps_listings(self):
+        fetch = mock.Mock(return_value=[self.app.id])
+        with self.settings(LISTING_CACHE_TIMEOUT=60):
+            listing_ids('featured', fetch, mkt.regions.US)
+            self.app.update(weekly_downloads=10)
+            listing_ids('featured', fetch, mkt.regions.US)
+        eq_(fetch.call_count, 1)
+
+    def test_build_generation(self):
+        fetch = mock.Mock(return_value=[self.app.id])
+        with self.settings(LISTING_CACHE_TIMEOUT=60):
+            listing_ids('featured', fetch, mkt.regions.US)
+            old = generation()
+            with build_generation() as gen:
+                listing_ids('featured', fetch, mkt.regions.US)
+                # Everyone else keeps reading the old listings meanwhile.
+                eq_(cache.get(GENERATION_KEY), old)
+            eq_(generation(), gen)
+            listing_ids('featured', fetch, mkt.regions.US)
+        eq_(fetch.call_count, 2)
+
+    def test_build_generation_invalidated(self):
+        old = generation()
+        with build_generation():
+            invalidate_listings()
+        eq_(generation(), old + 1)
+
+    @mock.patch.object(Webapp, 'popular')
+    def test_listing(self, popular):
+        other = app_factory()
+        popular.return_value.values_dict.return_value = [
+            {'id': other.id}, {'id': self.app.id}]
+        with self.settings(LISTING_CACHE_TIMEOUT=60):
+            for x in range(2):
+                eq_([a.id for a in Webapp.listing('popular',
+                                                  region=mkt.regions.US)],
+                    [other.id, self.app.id])
+        eq_(popular.call_count, 1)
+
+    @mock.patch.object(Webapp, 'latest')
+    def test_listing_device(self, latest):
+        qs = latest.return_value.filter.return_value
+        qs.values_dict.return_value = [{'id': self.app.id}]
+        eq_(Webapp.listing('latest', device=amo.DEVICE_GAIA), [self.app])
+        latest.return_value.filter.assert_called_with(
+            device=amo.DEVICE_GAIA.id, uses_flash=False)
+
+
 class TestPackagedAppManifestUpdates(amo.tests.TestCase):
     # Note: More extensive tests for `Addon.update_names` are in the Addon
     # model tests.
@@ -4,6 +4,7 @@ import json
 import os
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import default_storage as storage
 from django.core.management import call_command
 
@@ -19,6 +20,7 @@ from files.models import File, FileUpload
 from users.models import UserProfile
 from versions.models import Version
 
+from mkt.developers.tasks import NotModified
 from mkt.webapps.models import Webapp
 from mkt.webapps.tasks import update_manifests
 
@@ -237,6 +239,38 @@ class TestUpdateManifest(amo.tests.TestCase):
         assert not retry.called
         assert RereviewQueue.objects.filter(addon=self.addon).exists()
 
+    def test_stores_validators(self):
+        self.response_mock.headers['ETag'] = '"abc"'
+        self._run()
+        eq_(cache.get('webapps:manifest-validators:%s' % self.addon.pk),
+            {'etag': '"abc"', 'hash': nhash})
+
+    @mock.patch('mkt.webapps.tasks._fetch_manifest')
+    def test_conditional_request(self, fetch):
+        fetch.side_effect = NotModified
+        cache.set('webapps:manifest-validators:%s' % self.addon.pk,
+                  {'etag': '"abc"', 'hash': ohash})
+        self._run()
+        eq_(fetch.call_args[1]['validators'], {'etag': '"abc"',
+                                               'hash': ohash})
+        eq_(ActivityLog.objects.for_apps(self.addon).count(), 0)
+
+    @mock.patch('mkt.webapps.tasks._fetch_manifest')
+    def test_no_conditional_request_for_stale_validators(self, fetch):
+        fetch.return_value = self._data()
+        cache.set('webapps:manifest-validators:%s' % self.addon.pk,
+                  {'etag': '"abc"', 'hash': 'sha256:stale'})
+        self._run()
+        eq_(fetch.call_args[1]['validators'], {})
+
+    @mock.patch('mkt.webapps.tasks._fetch_manifest')
+    def test_no_conditional_request_without_check_hash(self, fetch):
+        fetch.return_value = self._data()
+        cache.set('webapps:manifest-validators:%s' % self.addon.pk,
+                  {'etag': '"abc"', 'hash': ohash})
+        self._run(check_hash=False)
+        eq_(fetch.call_args[1]['validators'], {})
+
     @mock.patch('mkt.webapps.tasks._open_manifest')
     def test_manifest_name_change_rereview(self, open_manifest):
         # Mock original manifest file lookup.
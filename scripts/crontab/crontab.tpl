@@ -5,20 +5,27 @@ HOME=/tmp
 # Every minute!
 * * * * * %(z_cron)s fast_current_version
 * * * * * %(z_cron)s migrate_collection_users
+* * * * * %(z_cron)s deliver_inapp_notices --settings=settings_local_mkt
+
+# Every 5 minutes.
+*/5 * * * * %(z_cron)s run_validation_jobs
+*/5 * * * * %(z_cron)s presign_apps --settings=settings_local_mkt
 
 # Every 30 minutes.
 */30 * * * * %(z_cron)s tag_jetpacks
 */30 * * * * %(z_cron)s update_addons_current_version
 */30 * * * * %(z_cron)s cleanup_watermarked_file
+*/30 * * * * %(z_cron)s build_app_listings --settings=settings_local_mkt
 
 #once per hour
 5 * * * * %(z_cron)s update_collections_subscribers
 10 * * * * %(z_cron)s update_blog_posts
 20 * * * * %(z_cron)s addon_last_updated
 25 * * * * %(z_cron)s update_collections_votes
+35 * * * * %(z_cron)s rebuild_review_queues
 45 * * * * %(z_cron)s update_addon_appsupport
 50 * * * * %(z_cron)s cleanup_extracted_file
-55 * * * * %(z_cron)s unhide_disabled_files
+55 * * * * %(z_cron)s sync_mirrors
 
 
 #every 3 hours
@@ -44,6 +51,8 @@ HOME=/tmp
 40 1 * * * %(z_cron)s update_weekly_downloads
 50 1 * * * %(z_cron)s gc
 45 1 * * * %(z_cron)s mkt_gc --settings=settings_local_mkt
+55 1 * * * %(z_cron)s rebuild_reviewer_leaderboards
+55 1 * * * %(z_cron)s rebuild_reviewer_leaderboards --settings=settings_local_mkt
 45 2 * * * %(django)s process_addons --task=update_manifests --settings=settings_local_mkt
 30 3 * * * %(django)s cleanup
 30 4 * * * %(z_cron)s cleanup_synced_collections
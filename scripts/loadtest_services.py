@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Load tests running services, to compare how they serve under concurrency.
+
+Requests the paths in a file, one per line (e.g. update pings taken from the
+access logs), from each server given, keeping `--concurrency` requests in
+flight for `--requests` requests, then reports the throughput and latency
+percentiles of each. For example, to compare the update service under
+mod_wsgi with its gevent mode (services/wsgi/versioncheck_gevent.py):
+
+$ python scripts/loadtest_services.py -c 200 -n 20000 pings.txt \\
+    http://localhost:8001 http://localhost:8002
+
+"""
+import httplib
+import itertools
+import optparse
+import sys
+import threading
+import time
+import urlparse
+from multiprocessing.pool import ThreadPool
+
+
+def percentile(values, pct):
+    """The `pct` percentile of the sorted list `values`."""
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * pct / 100.0))]
+
+
+def run(base, paths, concurrency, requests, timeout):
+    """
+    Requests `paths` in turn from the server at `base`, `concurrency` at a
+    time, until `requests` have been made.
+
+    Returns a dict of the results.
+    """
+    url = urlparse.urlparse(base)
+    local = threading.local()
+    paths = itertools.cycle(paths)
+    lock = threading.Lock()
+
+    def fetch(i):
+        with lock:
+            path = next(paths)
+        if not hasattr(local, 'conn'):
+            local.conn = httplib.HTTPConnection(url.netloc, timeout=timeout)
+        start = time.time()
+        try:
+            local.conn.request('GET', url.path.rstrip('/') + path)
+            res = local.conn.getresponse()
+            res.read()
+            status = res.status
+        except Exception:
+            local.conn.close()
+            del local.conn
+            status = None
+        return status, time.time() - start
+
+    pool = ThreadPool(concurrency)
+    start = time.time()
+    try:
+        results = pool.map(fetch, xrange(requests), chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+    elapsed = time.time() - start
+
+    times = sorted(t for status, t in results if status == 200)
+    return {
+        'base': base,
+        'requests': requests,
+        'ok': len(times),
+        'rejected': sum(1 for status, t in results if status == 503),
+        'errors': sum(1 for status, t in results if status not in (200, 503)),
+        'rps': len(times) / elapsed,
+        'p50': percentile(times, 50) * 1000,
+        'p90': percentile(times, 90) * 1000,
+        'p99': percentile(times, 99) * 1000,
+    }
+
+
+def report(results):
+    print('%-30s %8s %8s %8s %8s %8s %8s' % ('server', 'req/s', 'p50 ms',
+                                             'p90 ms', 'p99 ms', '503s',
+                                             'errors'))
+    for r in results:
+        print('%(base)-30s %(rps)8.1f %(p50)8.1f %(p90)8.1f %(p99)8.1f '
+              '%(rejected)8d %(errors)8d' % r)
+
+
+def main():
+    parser = optparse.OptionParser(
+        usage='%prog [options] PATHS_FILE BASE_URL [BASE_URL ...]')
+    parser.add_option('-c', '--concurrency', type='int', default=50,
+                      help='Requests in flight at once. [default: %default]')
+    parser.add_option('-n', '--requests', type='int', default=5000,
+                      help='Requests made to each server. '
+                           '[default: %default]')
+    parser.add_option('-t', '--timeout', type='float', default=30,
+                      help='Seconds before a request fails. '
+                           '[default: %default]')
+    opts, args = parser.parse_args()
+    if len(args) < 2:
+        parser.error('A file of paths and at least one server are needed.')
+
+    with open(args[0]) as fp:
+        paths = [line.strip() for line in fp if line.strip()]
+    if not paths:
+        parser.error('No paths in %s.' % args[0])
+
+    report([run(base, paths, opts.concurrency, opts.requests, opts.timeout)
+            for base in args[1:]])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -63,12 +63,48 @@ quicktime_re = re.compile(r'^(application/(sdp|x-(mpeg|rtsp|sdp))|audio/(3gpp(2)
 java_re = re.compile(r'^application/x-java-((applet|bean)(;jpi-version=1\.5|;version=(1\.(1(\.[1-3])?|(2|4)(\.[1-2])?|3(\.1)?|5)))?|vm)$')
 wmp_re = re.compile(r'^(application/(asx|x-(mplayer2|ms-wmp))|video/x-ms-(asf(-plugin)?|wm(p|v|x)?|wvx)|audio/x-ms-w(ax|ma))$')
 
+output = Template(xml_template)
+
+required = ['mimetype', 'appID', 'appVersion', 'clientOS', 'chromeLocale']
+
+# Rendered responses by normalised query, shared by all the requests this
+# process serves. Emptied once it holds PFS_CACHE_SIZE of them.
+responses = {}
+cache_stats = {'hits': 0, 'misses': 0}
+
+
+def cache_key(data):
+    """
+    The plugin found only depends on the mimetype, clientOS and chromeLocale;
+    the other arguments just have to be there.
+    """
+    if any(s not in data for s in required):
+        return (data.get('mimetype'),)
+    return (data['mimetype'], data['clientOS'], data['chromeLocale'])
+
 
 def get_output(data):
+    key = cache_key(data)
+    result = responses.get(key)
+    if result is not None:
+        cache_stats['hits'] += 1
+        statsd.incr('services.pfs.cache.hit')
+        return result
+
+    cache_stats['misses'] += 1
+    statsd.incr('services.pfs.cache.miss')
+    result = output.substitute(get_plugin(data))
+    size = settings.PFS_CACHE_SIZE
+    if size:
+        if len(responses) >= size:
+            responses.clear()
+        responses[key] = result
+    return result
+
+
+def get_plugin(data):
     g = defaultdict(str, [(k, jinja2.escape(v)) for k, v in data.iteritems()])
 
-    required = ['mimetype', 'appID', 'appVersion', 'clientOS', 'chromeLocale']
-
     # Some defaults we override depending on what we find below.
     plugin = dict(mimetype='-1', name='-1', guid='-1', version='',
                   iconUrl='', XPILocation='', InstallerLocation='',
@@ -79,12 +115,10 @@ def get_output(data):
     # Special case for mimetype if they are provided.
     plugin['mimetype'] = g['mimetype'] or '-1'
 
-    output = Template(xml_template)
-
     for s in required:
         if s not in data:
             # A sort of 404, matching what was returned in the original PHP.
-            return output.substitute(plugin)
+            return plugin
 
     # Figure out what plugins we've got, and what plugins we know where
     # to get.
@@ -328,7 +362,7 @@ def get_output(data):
             manualInstallationURL='http://go.divx.com/plugin/download/')
 
     # End ridiculously huge and embarrassing if-else block.
-    return output.substitute(plugin)
+    return plugin
 
 
 def format_date(secs):
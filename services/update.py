@@ -2,15 +2,14 @@ from email.Utils import formatdate
 from email.mime.text import MIMEText
 import smtplib
 import sys
+import threading
 from time import time
 import traceback
 from urlparse import parse_qsl
 
-import MySQLdb as mysql
-import sqlalchemy.pool as pool
-
 import commonware.log
 from django.core.management import setup_environ
+from sqlalchemy import exc
 from django.utils.http import urlencode
 
 import settings_local as settings
@@ -24,7 +23,7 @@ except ImportError:
     from apps.versions.compare import version_int
 
 from constants import applications, base
-from utils import (get_mirror, log_configure, APP_GUIDS, PLATFORMS,
+from utils import (connect, get_mirror, log_configure, APP_GUIDS, PLATFORMS,
                    STATUSES_PUBLIC)
 
 # Go configure the log.
@@ -79,13 +78,14 @@ timing_log = commonware.log.getLogger('z.timer')
 error_log = commonware.log.getLogger('z.services')
 
 
-def getconn():
-    db = settings.SERVICES_DATABASE
-    return mysql.connect(host=db['HOST'], user=db['USER'],
-                         passwd=db['PASSWORD'], db=db['NAME'])
-
+# The update queries, by the shape of the request they were built for.
+update_sql = {}
 
-mypool = pool.QueuePool(getconn, max_overflow=10, pool_size=5, recycle=300)
+# Bounds the requests being served at once, so that when MySQL is slow the
+# ones over the limit are turned away instead of queuing for connections.
+pending = None
+if settings.SERVICES_UPDATE_MAX_PENDING:
+    pending = threading.BoundedSemaphore(settings.SERVICES_UPDATE_MAX_PENDING)
 
 
 class Update(object):
@@ -103,7 +103,7 @@ class Update(object):
         # If you accessing this from unit tests, then before calling
         # is valid, you can assign your own cursor.
         if not self.cursor:
-            self.conn = mypool.connect()
+            self.conn = connect()
             self.cursor = self.conn.cursor()
 
         data = self.data
@@ -181,6 +181,49 @@ class Update(object):
         self.get_beta()
         data = self.data
 
+        d2c_max = None
+        if self.compat_mode == 'normal':
+            d2c_max = applications.D2C_MAX_VERSIONS.get(data['app_id'])
+            if d2c_max:
+                data['d2c_max_version'] = version_int(d2c_max)
+
+        self.cursor.execute(self.get_update_sql(bool(d2c_max)), data)
+        result = self.cursor.fetchone()
+
+        if result:
+            row = dict(zip([
+                'guid', 'type', 'disabled_by_user', 'appguid', 'min', 'max',
+                'file_id', 'file_status', 'hash', 'filename', 'version_id',
+                'datestatuschanged', 'strict_compat', 'releasenotes',
+                'version', 'premium_type'],
+                list(result)))
+            row['type'] = base.ADDON_SLUGS_UPDATE[row['type']]
+            if row['premium_type'] in base.ADDON_PREMIUMS:
+                qs = urlencode(dict((k, data.get(k, ''))
+                               for k in base.WATERMARK_KEYS))
+                row['url'] = (u'%s/downloads/watermarked/%s?%s' %
+                              (settings.SITE_URL, row['file_id'], qs))
+            else:
+                row['url'] = get_mirror(self.data['addon_status'],
+                                        self.data['id'], row)
+            data['row'] = row
+            return True
+
+        return False
+
+    def get_update_sql(self, d2c_max):
+        """
+        The query for the update, which only depends on the shape of the
+        request, so it is built once per shape and reused.
+        """
+        compat_mode = self.compat_mode
+        if compat_mode not in ('ignore', 'normal'):
+            compat_mode = 'strict'
+        key = (bool(self.data.get('appOS')), self.flags['use_version'],
+               self.flags['multiple_status'], compat_mode, d2c_max)
+        if key in update_sql:
+            return update_sql[key]
+
         sql = ["""
             SELECT
                 addons.guid as guid, addons.addontype_id as type,
@@ -208,7 +251,7 @@ class Update(object):
             INNER JOIN files
                 ON files.version_id = versions.id AND (files.platform_id = 1
             """]
-        if data.get('appOS'):
+        if self.data.get('appOS'):
             sql.append(' OR files.platform_id = %(appOS)s')
 
         if self.flags['use_version']:
@@ -225,10 +268,10 @@ class Update(object):
 
         sql.append('AND appmin.version_int <= %(version_int)s ')
 
-        if self.compat_mode == 'ignore':
+        if compat_mode == 'ignore':
             pass  # no further SQL modification required.
 
-        elif self.compat_mode == 'normal':
+        elif compat_mode == 'normal':
             # When file has strict_compatibility enabled, or file has binary
             # components, default to compatible is disabled.
             sql.append("""AND
@@ -238,9 +281,7 @@ class Update(object):
             """)
             # Filter out versions that don't have the minimum maxVersion
             # requirement to qualify for default-to-compatible.
-            d2c_max = applications.D2C_MAX_VERSIONS.get(data['app_id'])
             if d2c_max:
-                data['d2c_max_version'] = version_int(d2c_max)
                 sql.append("AND appmax.version_int >= %(d2c_max_version)s ")
 
             # Filter out versions found in compat overrides
@@ -259,30 +300,8 @@ class Update(object):
             sql.append('AND appmax.version_int >= %(version_int)s ')
 
         sql.append('ORDER BY versions.id DESC LIMIT 1;')
-
-        self.cursor.execute(''.join(sql), data)
-        result = self.cursor.fetchone()
-
-        if result:
-            row = dict(zip([
-                'guid', 'type', 'disabled_by_user', 'appguid', 'min', 'max',
-                'file_id', 'file_status', 'hash', 'filename', 'version_id',
-                'datestatuschanged', 'strict_compat', 'releasenotes',
-                'version', 'premium_type'],
-                list(result)))
-            row['type'] = base.ADDON_SLUGS_UPDATE[row['type']]
-            if row['premium_type'] in base.ADDON_PREMIUMS:
-                qs = urlencode(dict((k, data.get(k, ''))
-                               for k in base.WATERMARK_KEYS))
-                row['url'] = (u'%s/downloads/watermarked/%s?%s' %
-                              (settings.SITE_URL, row['file_id'], qs))
-            else:
-                row['url'] = get_mirror(self.data['addon_status'],
-                                        self.data['id'], row)
-            data['row'] = row
-            return True
-
-        return False
+        update_sql[key] = ''.join(sql)
+        return update_sql[key]
 
     def get_bad_rdf(self):
         return bad_rdf
@@ -352,7 +371,25 @@ def log_exception(data):
     error_log.error(u'Type: %s, %s. Query: %s' % (typ, value, data))
 
 
+def unavailable(start_response):
+    start_response('503 Service Unavailable',
+                   [('Content-Type', 'text/plain'), ('Content-Length', '0'),
+                    ('Retry-After', str(settings.SERVICES_UPDATE_RETRY_AFTER))])
+    return ['']
+
+
 def application(environ, start_response):
+    if pending and not pending.acquire(False):
+        statsd.incr('services.update.rejected')
+        return unavailable(start_response)
+    try:
+        return serve(environ, start_response)
+    finally:
+        if pending:
+            pending.release()
+
+
+def serve(environ, start_response):
     status = '200 OK'
     with statsd.timer('services.update'):
         data = dict(parse_qsl(environ['QUERY_STRING']))
@@ -361,6 +398,10 @@ def application(environ, start_response):
             update = Update(data, compat_mode)
             output = update.get_rdf()
             start_response(status, update.get_headers(len(output)))
+        except exc.TimeoutError:
+            # No connection came free in time.
+            statsd.incr('services.update.rejected')
+            return unavailable(start_response)
         except:
             #mail_exception(data)
             log_exception(data)
@@ -15,9 +15,11 @@ if settingmodule.startswith(('zamboni',  # typical git clone destination
 import posixpath
 import re
 import sys
+import time
 
 from cef import log_cef as _log_cef
 import MySQLdb as mysql
+from sqlalchemy import event, exc
 import sqlalchemy.pool as pool
 
 from django.core.management import setup_environ
@@ -29,6 +31,8 @@ settings = importlib.import_module(settingmodule)
 # Pyflakes will complain about these, but they are required for setup.
 setup_environ(settings)
 from lib.log_settings_base import formatters, handlers, loggers
+# This has to be imported after the settings so statsd knows where to log to.
+from django_statsd.clients import statsd
 
 # Ugh. But this avoids any zamboni or django imports at all.
 # Perhaps we can import these without any problems and we can
@@ -96,7 +100,51 @@ def getconn():
                          passwd=db['PASSWORD'], db=db['NAME'])
 
 
-mypool = pool.QueuePool(getconn, max_overflow=10, pool_size=5, recycle=300)
+mypool = pool.QueuePool(getconn, **settings.SERVICES_DATABASE_POOL)
+
+
+def on_checkin(dbapi_conn, record):
+    if dbapi_conn is not None:
+        record.info['checkin'] = time.time()
+
+
+def on_checkout(dbapi_conn, record, proxy):
+    """
+    Pings connections that have been idle for a while, since MySQL may have
+    dropped them. Raising DisconnectionError makes the pool retry with a
+    new connection.
+    """
+    idle = time.time() - record.info.get('checkin', time.time())
+    if idle < settings.SERVICES_DATABASE_PING:
+        return
+    cursor = dbapi_conn.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    except mysql.OperationalError:
+        statsd.incr('services.pool.stale')
+        raise exc.DisconnectionError()
+    finally:
+        cursor.close()
+
+
+event.listen(mypool, 'checkin', on_checkin)
+event.listen(mypool, 'checkout', on_checkout)
+
+
+def connect():
+    """
+    Checks a connection out of the shared pool, recording how long that took
+    and how many connections are in use.
+    """
+    try:
+        with statsd.timer('services.pool.checkout'):
+            conn = mypool.connect()
+    except exc.TimeoutError:
+        statsd.incr('services.pool.exhausted')
+        raise
+    statsd.gauge('services.pool.checkedout', mypool.checkedout())
+    statsd.gauge('services.pool.overflow', max(mypool.overflow(), 0))
+    return conn
 
 
 def log_configure():
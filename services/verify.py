@@ -7,7 +7,7 @@ from wsgiref.handlers import format_date_time
 
 from django.core.management import setup_environ
 
-from utils import (log_configure, log_exception, log_info, mypool,
+from utils import (connect, log_configure, log_exception, log_info,
                    ADDON_PREMIUM, CONTRIB_CHARGEBACK,
                    CONTRIB_PURCHASE, CONTRIB_REFUND)
 
@@ -52,7 +52,7 @@ class Verify:
 
     def __call__(self, check_purchase=True):
         if not self.cursor:
-            self.conn = mypool.connect()
+            self.conn = connect()
             self.cursor = self.conn.cursor()
 
         # Try and decode the receipt data.
@@ -208,9 +208,11 @@ def status_check(environ):
     # fast. Anything that fails here, connecting to db, accessing table
     # will be an error we need to know about.
     try:
-        conn = mypool.connect()
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT id FROM users_install ORDER BY id DESC LIMIT 1')
+        cursor.close()
+        conn.close()
     except Exception, err:
         return 500, str(err)
 
@@ -0,0 +1,28 @@
+"""
+The update service for an event loop, such as gunicorn's gevent workers.
+
+MySQLdb blocks the whole process while it waits on MySQL, so PyMySQL is used
+in its place. It is pure python and cooperates with gevent once the standard
+library is patched, letting many requests share the few connections of the
+pool. Set SERVICES_DATABASE_POOL to a small pool and
+SERVICES_UPDATE_MAX_PENDING to how many requests may wait for it.
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import pymysql
+pymysql.install_as_MySQLdb()
+
+import os
+import site
+
+wsgidir = os.path.dirname(__file__)
+for path in ['../',
+             '../..',
+             '../../..',
+             '../../lib',
+             '../../vendor/lib/python',
+             '../../apps']:
+    site.addsitedir(os.path.abspath(os.path.join(wsgidir, path)))
+
+from update import application
@@ -126,3 +126,16 @@ PASSWORD_HASHERS = (
 )
 
 SQL_RESET_SEQUENCES = False
+
+# Tests count the translation queries; the cached transformer has its own
+# tests.
+TRANSLATIONS_CACHE_TIMEOUT = 0
+
+# Save monolith records as they are recorded.
+MONOLITH_BUFFER_SIZE = 1
+
+# Build the app listings on every call; the cache has its own tests.
+LISTING_CACHE_TIMEOUT = 0
+
+# Run the validator every time; the validation cache has its own tests.
+VALIDATION_CACHE_TIMEOUT = 0